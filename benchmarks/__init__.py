@@ -0,0 +1,16 @@
+"""Benchmarks for the performance-sensitive parts of PyManifold."""
+
+from __future__ import annotations
+
+from timeit import Timer
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Callable
+
+
+def best_time(func: Callable[[], object], repeat: int = 5) -> float:
+    """Get the best per-call time of `func`, in seconds."""
+    timer = Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
@@ -0,0 +1,130 @@
+"""Measure the throughput, latency and memory of the client's hot paths against a local stand-in API server.
+
+The server (see `benchmarks.server`) runs in its own process, so it competes with the client for neither the GIL
+nor the memory measurements. Run with ``python -m benchmarks.bench_client`` from the repository root; pass
+``--latency`` (seconds per response) or ``--error-rate`` to see how the client behaves against a slower or flakier
+API. To measure against a server that's already running, such as one started with ``python -m benchmarks.server``,
+pass its address with ``--url``; the other options then have no effect, since they configure the server.
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from pymanifold import ManifoldClient, Transport
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Callable, List, Tuple
+
+
+def scenarios(client: ManifoldClient) -> List[Tuple[str, int, int, Callable[[int], object]]]:
+    """Get the (name, calls, threads, function of the call number) of each hot path to measure."""
+    def bet(i: int) -> object:
+        return client.create_bet("contract%d" % (i % 1000), 10, "YES" if i % 2 else "NO")
+
+    return [
+        ("get_market_by_id, lite", 2000, 8, lambda i: client.get_market_by_id("contract%d" % (i % 1000), lite=True)),
+        ("get_market_by_id", 2000, 8, lambda i: client.get_market_by_id("contract%d" % (i % 1000))),
+        ("get_user", 2000, 8, lambda i: client.get_user("user%04d" % (i % 500))),
+        ("get_markets (1000)", 50, 4, lambda i: client.list_markets()),
+        ("get_bets (1000)", 50, 4, lambda i: client.list_bets(limit=1000)),
+        ("get_bets (1000), streamed", 50, 4, lambda i: list(client.get_bets(limit=1000, stream=True))),
+        ("get_bet_frame (10000)", 10, 1, lambda i: client.get_bet_frame(max_items=10_000)),
+        ("create_bet", 1000, 8, bet),
+        ("create_bets (100)", 10, 1, lambda i: client.create_bets(
+            [("contract%d" % j, 10, "YES") for j in range(100)], max_in_flight=8
+        )),
+    ]
+
+
+def run(func: Callable[[int], object], calls: int, threads: int) -> Tuple[float, np.ndarray, int]:
+    """Make `calls` calls on `threads` threads. Returns the total time, each call's latency, and how many raised."""
+    latencies = np.empty(calls)
+    errors = [0]
+
+    def call(i: int) -> None:
+        start = perf_counter()
+        try:
+            func(i)
+        except Exception:
+            errors[0] += 1
+        latencies[i] = perf_counter() - start
+
+    start = perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(call, range(calls)))
+    return perf_counter() - start, latencies, errors[0]
+
+
+def peak_memory(func: Callable[[int], object], calls: int, threads: int) -> int:
+    """Get the peak memory traced while making `calls` calls on `threads` threads.
+
+    Tracing allocations slows everything down, so this is kept apart from the timed calls.
+    """
+    tracemalloc.start()
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(func, range(calls)))
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--bets", type=int, default=20_000)
+    parser.add_argument(
+        "--url", help="the base URI an already running server printed, such as http://127.0.0.1:8765/api/v0"
+    )
+    args = parser.parse_args()
+    server = None
+    if args.url is None:
+        server = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.server", "--bets", str(args.bets), "--latency", str(args.latency),
+             "--error-rate", str(args.error_rate)],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+    try:
+        if server is not None:
+            assert server.stdout is not None
+            base_uri = server.stdout.readline().strip()
+        else:
+            base_uri = args.url
+        with Transport(base_uri=base_uri, pool_maxsize=16) as transport:
+            responses = [0]
+
+            def count_response(response: Any, *args: Any, **kwargs: Any) -> None:
+                responses[0] += 1
+
+            transport.session.hooks["response"].append(count_response)
+            client = ManifoldClient("stand-in", transport=transport)
+            print(f"{'scenario':>28} {'calls/s':>9} {'requests/s':>11} {'p50':>10} {'p99':>10} {'peak mem':>10} "
+                  f"{'errors':>7}")
+            for name, calls, threads, func in scenarios(client):
+                func(0)  # warm up connections and caches
+                before = responses[0]
+                elapsed, latencies, errors = run(func, calls, threads)
+                sent = responses[0] - before
+                peak = peak_memory(func, min(calls, 4 * threads), threads)
+                p50, p99 = np.percentile(latencies, [50, 99]) * 1e3
+                print(f"{name:>28} {calls / elapsed:>9.0f} {sent / elapsed:>11.0f} "
+                      f"{p50:>8.2f}ms {p99:>8.2f}ms {peak / 2 ** 20:>7.1f}MiB {errors:>7}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
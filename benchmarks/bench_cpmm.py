@@ -0,0 +1,49 @@
+"""Compare pricing bets with the vectorized Maniswap engine against pricing them one at a time.
+
+Run with ``python -m benchmarks.bench_cpmm`` from the repository root.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from pymanifold.utils import cpmm
+from pymanifold.utils.kelly import shares_bought
+
+from . import best_time
+from .synthetic import make_market
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    print(f"{'bets':>10} {'buy':>12} {'loop':>12} {'speedup':>9}")
+    for size in (100, 10_000, 1_000_000):
+        y, n, p = rng.uniform(5, 5000, size), rng.uniform(5, 5000, size), rng.uniform(0.05, 0.95, size)
+        amount, outcome = rng.uniform(1, 1000, size), rng.choice(["YES", "NO"], size)
+        vectorized = best_time(lambda: cpmm.buy(y, n, p, amount, outcome))
+        sample = min(size, 10_000)
+        markets = [make_market(*args) for args in zip(y[:sample], n[:sample], p[:sample])]
+        loop = best_time(lambda: [shares_bought(*args) for args in zip(markets, amount, outcome)], repeat=1)
+        loop *= size / sample
+        print(f"{size:>10} {vectorized * 1e3:>10.2f}ms {loop * 1e3:>10.2f}ms {loop / vectorized:>8.0f}x")
+
+    print()
+    print(f"{'bets':>10} {'simulate':>12} {'loop':>12} {'speedup':>9}")
+    for size in (100, 10_000, 100_000):
+        amount = rng.uniform(1, 100, size)
+        # Traders tend to pile in on one side for a while, so outcomes come in runs
+        outcome = np.repeat(["YES", "NO"] * (size // 20), 10)
+
+        def sequential() -> None:
+            y, n = 1000.0, 800.0
+            for a, o in zip(amount, outcome):
+                trade = cpmm.buy(y, n, 0.5, a, o)
+                y, n = float(trade.pool_yes), float(trade.pool_no)
+
+        simulated = best_time(lambda: cpmm.simulate(1000.0, 800.0, 0.5, amount, outcome))
+        loop = best_time(sequential, repeat=1)
+        print(f"{size:>10} {simulated * 1e3:>10.2f}ms {loop * 1e3:>10.2f}ms {loop / simulated:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
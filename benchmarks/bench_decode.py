@@ -0,0 +1,72 @@
+"""Compare decoding recorded API responses with `json` + `from_dict` against the msgspec backend.
+
+Reads the response bodies out of the test suite's VCR cassettes. Run with ``python -m benchmarks.bench_decode``
+from the repository root, with the ``fast`` extra installed.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import yaml
+
+from pymanifold import decoding
+from pymanifold.types import Bet, Group, LiteMarket, LiteUser, Market, MarketMetadata
+
+from . import best_time
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Callable, Dict, List, Tuple
+
+CASSETTES = Path(__file__).parent.parent / "tests" / "fixtures" / "cassettes"
+
+# (label, cassette, URI suffix, type, whether the body is a list)
+CASES: List[Tuple[str, str, str, type, bool]] = [
+    ("bets (45)", "test_list_bet/none.yaml", "/bets?limit=45", Bet, True),
+    ("markets (1000)", "test_list_markets", "/markets", LiteMarket, True),
+    ("groups", "test_list_groups", "/groups", Group, True),
+    ("user", "test_get_user", "/user/v", LiteUser, False),
+    ("market", "test_get_market_by_url", "/slug/will-bitcoins-price-fall-below-25k", Market, False),
+    ("market, lite", "test_get_market_by_url", "/slug/will-bitcoins-price-fall-below-25k", LiteMarket, False),
+    ("market, metadata", "test_get_market_by_url", "/slug/will-bitcoins-price-fall-below-25k", MarketMetadata, False),
+]
+
+
+def response_bodies(cassette: str) -> Dict[str, bytes]:
+    """Get the decompressed response body recorded for each URI in a cassette."""
+    bodies = {}
+    for interaction in yaml.safe_load((CASSETTES / cassette).read_text())["interactions"]:
+        body = interaction["response"]["body"]["string"]
+        body = body.encode() if isinstance(body, str) else body
+        bodies[interaction["request"]["uri"]] = gzip.decompress(body) if body[:2] == b"\x1f\x8b" else body
+    return bodies
+
+
+def main() -> None:
+    if not decoding.AVAILABLE:
+        raise SystemExit("msgspec isn't installed; install the 'fast' extra")
+    print(f"{'payload':>18} {'size':>9} {'json':>10} {'msgspec':>10} {'speedup':>9}")
+    for label, cassette, suffix, cls, many in CASES:
+        (data,) = [body for uri, body in response_bodies(cassette).items() if uri.endswith(suffix) and len(body) > 100]
+        fast: Callable[[], object] = (
+            (lambda: decoding.decode_list(data, cls)) if many else (lambda: decoding.decode(data, cls))
+        )
+        if many:
+            def slow() -> object:
+                return [cls.from_dict(env) for env in json.loads(data)]  # type: ignore[attr-defined]
+        else:
+            def slow() -> object:
+                obj = cls.from_dict(json.loads(data))  # type: ignore[attr-defined]
+                if cls is Market:
+                    obj.bets, obj.comments  # count the lazily decoded fields too
+                return obj
+        before, after = best_time(slow, repeat=3), best_time(fast, repeat=3)
+        size = f"{len(data) / 1024:>6.0f}KiB"
+        print(f"{label:>18} {size} {before * 1e3:>8.2f}ms {after * 1e3:>8.2f}ms {before / after:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
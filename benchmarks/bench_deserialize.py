@@ -0,0 +1,57 @@
+"""Measure the per-object cost of deserializing API payloads into dataclasses.
+
+Run with ``python -m benchmarks.bench_deserialize`` from the repository root.
+"""
+
+from __future__ import annotations
+
+from inspect import signature
+from typing import TYPE_CHECKING
+
+from pymanifold.types import Bet, Comment, Group, LiteMarket, Market
+
+from . import best_time
+from .synthetic import bet_payload, comment_payload, lite_market_payload, market_payload
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Type, TypeVar
+
+    from pymanifold.types import JSONDict
+
+    T = TypeVar("T")
+
+
+def uncached_from_dict(cls: Type[T], env: JSONDict) -> T:
+    """Deserialize the way `DictDeserializable.from_dict` used to, introspecting the class once per key."""
+    return cls(**{k: v for k, v in env.items() if k in signature(cls).parameters})  # type: ignore
+
+
+def main() -> None:
+    group = {"id": "group0", "name": "Synthetic", "slug": "synthetic", "contractIds": ["contract0"] * 10}
+    cases = [
+        (Bet, bet_payload(0)),
+        (Comment, comment_payload(0)),
+        (LiteMarket, lite_market_payload(0)),
+        (Group, group),
+    ]
+    print(f"{'type':>22} {'uncached':>10} {'cached':>10} {'speedup':>9}")
+    for cls, env in cases:
+        before = best_time(lambda: uncached_from_dict(cls, env))
+        after = best_time(lambda: cls.from_dict(env))  # type: ignore[attr-defined]
+        print(f"{cls.__name__:>22} {before * 1e6:>8.2f}us {after * 1e6:>8.2f}us {before / after:>8.1f}x")
+
+    env = market_payload(0, bets=1000, comments=100)
+
+    def uncached_market() -> None:
+        market = uncached_from_dict(Market, env)
+        market.bets = [uncached_from_dict(Bet, bet) for bet in env["bets"]]  # type: ignore[union-attr]
+        market.comments = [uncached_from_dict(Comment, c) for c in env["comments"]]  # type: ignore[union-attr]
+
+    before = best_time(uncached_market, repeat=3)
+    after = best_time(lambda: Market.from_dict(env), repeat=3)
+    name = "Market (1000 bets)"
+    print(f"{name:>22} {before * 1e3:>8.2f}ms {after * 1e3:>8.2f}ms {before / after:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
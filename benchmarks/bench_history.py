@@ -0,0 +1,45 @@
+"""Compare probability lookups on a `ProbabilityHistory` against walking the bets in Python.
+
+Run with ``python -m benchmarks.bench_history`` from the repository root.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from pymanifold import ProbabilityHistory
+from pymanifold.types import BetFrame
+
+from . import best_time
+from .synthetic import START_TIME, bet_payload
+
+
+def walk(bets: list, times: np.ndarray) -> list:
+    """Find the probability at each time the way it used to be done, replaying bets oldest first."""
+    ordered = sorted(bets, key=lambda bet: bet.createdTime)
+    probs, i, prob = [], 0, ordered[0].probBefore
+    for t in sorted(times):
+        while i < len(ordered) and ordered[i].createdTime <= t:
+            prob = ordered[i].probAfter
+            i += 1
+        probs.append(prob)
+    return probs
+
+
+def main() -> None:
+    print(f"{'bets':>10} {'build':>10} {'1k lookups':>12} {'walk':>12} {'resample':>10}")
+    for size in (1_000, 100_000, 1_000_000):
+        frame = BetFrame.from_dicts(bet_payload(i, "c%d" % (i % 10)) for i in range(size))
+        times = np.linspace(START_TIME, START_TIME + 1000 * size, 1000).astype(np.int64)
+        build = best_time(lambda: ProbabilityHistory.from_frame(frame))
+        history = ProbabilityHistory.from_frame(frame)["c0"]
+        lookups = best_time(lambda: history.at(times))
+        bets = frame[frame.isin("contractId", ["c0"])].to_bets()
+        slow = best_time(lambda: walk(bets, times), repeat=1)
+        resample = best_time(lambda: history.resample(3_600_000))
+        print(f"{size:>10} {build * 1e3:>8.2f}ms {lookups * 1e6:>10.1f}us {slow * 1e3:>10.2f}ms "
+              f"{resample * 1e3:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
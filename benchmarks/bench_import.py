@@ -0,0 +1,75 @@
+"""Measure how long importing PyManifold takes, and which heavy modules each import pulls in.
+
+Each import runs in a fresh interpreter with ``-X importtime``, so nothing is already cached in ``sys.modules``.
+Run with ``python -m benchmarks.bench_import`` from the repository root.
+"""
+
+from __future__ import annotations
+
+import re
+import subprocess
+import sys
+from importlib.util import find_spec
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Iterable, List, Set, Tuple
+
+# Third-party modules the package imports up front (msgspec only with the `fast` extra), imported before timing so
+# only PyManifold's own cost is measured
+PRELOADED = tuple(name for name in ("requests", "msgspec") if find_spec(name) is not None)
+
+# Modules too slow to import for a client that only makes HTTP requests to need
+HEAVY_MODULES = ("numpy", "aiohttp", "asyncio")
+
+# The (name, statement) of each import to measure
+IMPORTS = (
+    ("import pymanifold", "import pymanifold"),
+    ("ManifoldClient", "from pymanifold import ManifoldClient"),
+    ("BetFrame", "from pymanifold import BetFrame"),
+    ("kelly_calc", "from pymanifold.utils import kelly_calc"),
+    ("AsyncManifoldClient", "from pymanifold import AsyncManifoldClient"),
+)
+
+# Written to stderr just before the statement runs, so only the imports after it are counted
+_START = "-- start --\n"
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def import_time(statement: str, preload: Iterable[str] = PRELOADED) -> Tuple[float, Set[str]]:
+    """Run `statement` in a fresh interpreter. Returns the seconds spent importing, and the top-level modules loaded.
+
+    Modules in `preload` are imported first, and neither timed nor returned.
+    """
+    preamble = "".join("import %s\n" % name for name in preload)
+    code = preamble + "import sys\nbefore = set(sys.modules)\nsys.stderr.write(%r)\n" % _START + statement + "\n"
+    code += "print(' '.join(sorted({m.split('.')[0] for m in set(sys.modules) - before})))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+    total = 0
+    for match in _IMPORTTIME_LINE.finditer(result.stderr.split(_START, 1)[1]):
+        cumulative, indent, _ = match.groups()
+        # Only count the statement's own imports, whose times include everything they imported in turn
+        if not indent:
+            total += int(cumulative)
+    return total / 1e6, set(result.stdout.split())
+
+
+def best_import_time(statement: str, repeat: int = 5) -> Tuple[float, Set[str]]:
+    """Get the fastest of `repeat` runs of `import_time`, to cut out noise from the machine."""
+    runs: List[Tuple[float, Set[str]]] = [import_time(statement) for _ in range(repeat)]
+    return min(runs, key=lambda run: run[0])
+
+
+def main() -> None:
+    print(f"{'import':>22} {'time':>10}  heavy modules loaded")
+    for name, statement in IMPORTS:
+        seconds, modules = best_import_time(statement)
+        heavy = ", ".join(sorted(modules.intersection(HEAVY_MODULES))) or "-"
+        print(f"{name:>22} {seconds * 1e3:>8.1f}ms  {heavy}")
+
+
+if __name__ == "__main__":
+    main()
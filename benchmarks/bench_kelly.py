@@ -0,0 +1,39 @@
+"""Compare the bracketed kelly solver against the brute-force scan over every bet, and batch sizing against a loop.
+
+Run with ``python -m benchmarks.bench_kelly`` from the repository root.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from pymanifold.utils.kelly import _kelly_calc_brute_force, kelly_calc, kelly_calc_batch
+
+from . import best_time
+from .synthetic import make_market
+
+
+def main() -> None:
+    market = make_market(1000, 800, 0.5)
+    print(f"{'balance':>10} {'bracketed':>12} {'brute force':>12} {'speedup':>9}")
+    for balance in (100, 1_000, 10_000, 100_000):
+        assert kelly_calc(market, 0.8, balance) == _kelly_calc_brute_force(market, 0.8, balance)
+        fast = best_time(lambda: kelly_calc(market, 0.8, balance))
+        slow = best_time(lambda: _kelly_calc_brute_force(market, 0.8, balance), repeat=1)
+        print(f"{balance:>10} {fast * 1e6:>10.1f}us {slow * 1e6:>10.0f}us {slow / fast:>8.0f}x")
+
+    print()
+    print(f"{'markets':>10} {'batch':>12} {'loop':>12} {'speedup':>9}")
+    rng = np.random.default_rng(0)
+    for size in (10, 100, 2_000):
+        pool_yes, pool_no = rng.uniform(5, 5000, size), rng.uniform(5, 5000, size)
+        p, subjective_prob = rng.uniform(0.05, 0.95, size), rng.random(size)
+        markets = [make_market(*args) for args in zip(pool_yes, pool_no, p)]
+        probability = np.array([m.probability for m in markets])
+        batch = best_time(lambda: kelly_calc_batch(pool_yes, pool_no, p, probability, subjective_prob, 10_000))
+        loop = best_time(lambda: [kelly_calc(m, q, 10_000) for m, q in zip(markets, subjective_prob)], repeat=1)
+        print(f"{size:>10} {batch * 1e3:>10.2f}ms {loop * 1e3:>10.2f}ms {loop / batch:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Compare screening the whole market list with a `MarketFrame` against looping over `LiteMarket` objects.
+
+The screen keeps open binary markets with some liquidity whose volume is picking up, and ranks them by turnover.
+Run with ``python -m benchmarks.bench_scan`` from the repository root.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from pymanifold import MarketFrame
+from pymanifold.types import LiteMarket
+
+from . import best_time
+from .synthetic import START_TIME, lite_market_payload
+
+
+def scan_objects(markets: list, now: float) -> list:
+    """Screen and rank markets one object at a time, recomputing each metric in Python. Returns (turnover, market)."""
+    found = []
+    for market in markets:
+        if market.isResolved or (market.closeTime is not None and market.closeTime <= now):
+            continue
+        if market.outcomeType != "BINARY" or market.p is None or not isinstance(market.pool, dict):
+            continue
+        liquidity = market.pool["YES"] ** market.p * market.pool["NO"] ** (1 - market.p)
+        if liquidity < 200 or not market.volume7Days:
+            continue
+        if 7 * market.volume24Hours / market.volume7Days < 1:
+            continue
+        found.append((market.volume24Hours / liquidity, market))
+    found.sort(key=lambda item: -item[0])
+    return found[:100]
+
+
+def scan_frame(frame: MarketFrame) -> MarketFrame:
+    """Screen and rank markets on the frame's columns."""
+    found = frame.filter(isOpen=True, outcomeType="BINARY", liquidity=(200, None), volumeRatio=(1, None))
+    return found.rank("turnover", n=100)
+
+
+def main() -> None:
+    print(f"{'markets':>10} {'build':>10} {'frame scan':>12} {'object scan':>12}")
+    for size in (1_000, 10_000, 100_000):
+        payloads = [lite_market_payload(i) for i in range(size)]
+        # A month in, when about nine in ten of the synthetic markets are still open
+        now = START_TIME + 30 * 86_400_000
+        build = best_time(lambda: MarketFrame.from_dicts(payloads, now), repeat=3)
+        frame = MarketFrame.from_dicts(payloads, now)
+        markets = [LiteMarket.from_dict(env) for env in payloads]
+        # Markets tied on turnover may come in either order, so only the turnovers are compared
+        expected = [turnover for turnover, _ in scan_objects(markets, now)]
+        assert np.allclose(scan_frame(frame)["turnover"], expected) and len(expected) == 100
+        fast = best_time(lambda: scan_frame(frame))
+        slow = best_time(lambda: scan_objects(markets, now), repeat=3)
+        print(f"{size:>10} {build * 1e3:>8.2f}ms {fast * 1e3:>10.3f}ms {slow * 1e3:>10.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Compare the peak memory and time of decoding a page of bets buffered versus streamed.
+
+Run with ``python -m benchmarks.bench_stream`` from the repository root.
+"""
+
+from __future__ import annotations
+
+import json
+import tracemalloc
+from typing import TYPE_CHECKING
+
+from pymanifold.lib import STREAM_CHUNK_SIZE
+from pymanifold.types import Bet
+from pymanifold.utils.jsonstream import iter_json_array
+
+from . import best_time
+from .synthetic import bet_payload
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Callable, Iterator
+
+
+def chunks(data: bytes) -> Iterator[bytes]:
+    return (data[i:i + STREAM_CHUNK_SIZE] for i in range(0, len(data), STREAM_CHUNK_SIZE))
+
+
+def peak_memory(func: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main() -> None:
+    print(f"{'bets':>8} {'body':>9} {'buffered':>19} {'streamed':>19}")
+    for count in (1_000, 10_000, 100_000):
+        data = json.dumps([dict(bet_payload(i), fills=[{"amount": 1.0}] * 3) for i in range(count)]).encode()
+
+        def buffered() -> None:
+            for env in json.loads(data):
+                Bet.from_dict(env)
+
+        def streamed() -> None:
+            for env in iter_json_array(chunks(data)):
+                Bet.from_dict(env)
+
+        cells = [
+            f"{best_time(func, repeat=3) * 1e3:>8.1f}ms {peak_memory(func) / 2 ** 20:>7.1f}MiB"
+            for func in (buffered, streamed)
+        ]
+        print(f"{count:>8} {len(data) / 2 ** 20:>6.1f}MiB {cells[0]:>19} {cells[1]:>19}")
+
+
+if __name__ == "__main__":
+    main()
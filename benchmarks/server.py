@@ -0,0 +1,443 @@
+"""A local stand-in for the Manifold API, serving synthetic or recorded data with configurable latency, errors and
+rate limits, for load-testing the clients.
+
+Run with ``python -m benchmarks.server`` from the repository root to serve synthetic data until interrupted; see
+``--help`` for the options. The first line printed is the base URI to give a `Transport`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import math
+import random
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import count
+from pathlib import Path
+from threading import Lock, Thread
+from time import sleep, time
+from typing import TYPE_CHECKING, Any, Dict, List
+from urllib.parse import parse_qs, urlsplit
+
+from pymanifold.ratelimit import TokenBucket
+from pymanifold.utils import cpmm
+
+from .synthetic import START_TIME, bet_payload, comment_payload, lite_market_payload
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Iterable, Optional, Tuple
+
+    from pymanifold.types import JSONDict
+
+    Response = Tuple[int, Any]
+
+CASSETTES = Path(__file__).parent.parent / "tests" / "fixtures" / "cassettes"
+
+# The fields of a market that only the single-market endpoints return
+_FULL_MARKET_FIELDS = ("bets", "comments", "answers")
+
+
+class Feed:
+    """A list of API objects served newest first, paged with an id cursor like `/markets` and `/bets`."""
+
+    def __init__(self) -> None:
+        # Oldest first, so that adding an item doesn't move the others
+        self.items: List[JSONDict] = []
+        self.positions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def add(self, item: JSONDict) -> None:
+        self.positions[str(item["id"])] = len(self.items)
+        self.items.append(item)
+
+    def page(self, before: Optional[str], limit: int) -> Optional[List[JSONDict]]:
+        """Get up to `limit` items older than the one with id `before`, newest first, or None if it isn't here."""
+        end = len(self.items) if before is None else self.positions.get(before)
+        if end is None:
+            return None
+        return self.items[max(0, end - limit):end][::-1]
+
+
+class Dataset:
+    """The markets, bets, comments, users and groups a `StandInServer` serves, indexed like the API looks them up."""
+
+    def __init__(self) -> None:
+        self.markets = Feed()
+        self.bets = Feed()
+        self.markets_by_slug: Dict[str, JSONDict] = {}
+        self.bets_by_contract: Dict[str, Feed] = {}
+        self.bets_by_user: Dict[str, Feed] = {}
+        self.comments: Dict[str, List[JSONDict]] = {}
+        self.users: Dict[str, JSONDict] = {}
+        self.groups: Dict[str, JSONDict] = {}
+
+    @classmethod
+    def synthetic(cls, markets: int = 1000, bets: int = 10_000, comments: int = 1000, groups: int = 10) -> Dataset:
+        """Build a dataset from the payloads in `synthetic`, spreading bets and comments over the markets."""
+        data = cls()
+        for i in range(markets):
+            data.add_market(lite_market_payload(i))
+        for j in range(bets):
+            data.add_bet(bet_payload(j, "contract%d" % (j % markets)))
+        for j in range(comments):
+            data.add_comment(comment_payload(j, "contract%d" % (j % markets)))
+        for j in range(500):
+            data.add_user({
+                "id": "user%04d" % j,
+                "createdTime": START_TIME,
+                "name": "User %d" % j,
+                "username": "user%04d" % j,
+                "url": "https://manifold.markets/user%04d" % j,
+            })
+        for j in range(groups):
+            data.add_group({
+                "id": "group%d" % j,
+                "slug": "synthetic-group-%d" % j,
+                "name": "Synthetic group %d" % j,
+                "creatorId": "user0000",
+                "createdTime": START_TIME,
+                "contractIds": ["contract%d" % i for i in range(j, markets, groups)],
+                "memberIds": ["user%04d" % i for i in range(j, 500, groups)],
+            })
+        return data
+
+    @classmethod
+    def from_cassettes(cls, directory: Path = CASSETTES) -> Dataset:
+        """Build a dataset from the responses recorded in VCR cassettes, such as the test suite's."""
+        import yaml
+
+        data = cls()
+        markets: Dict[str, JSONDict] = {}
+        bets: Dict[str, JSONDict] = {}
+        for path in sorted(p for p in directory.rglob("*") if p.is_file()):
+            for interaction in yaml.safe_load(path.read_text())["interactions"]:
+                if interaction["request"]["method"] != "GET" or interaction["response"]["status"]["code"] != 200:
+                    continue
+                body = interaction["response"]["body"]["string"]
+                body = body.encode() if isinstance(body, str) else body
+                try:
+                    value = json.loads(gzip.decompress(body) if body[:2] == b"\x1f\x8b" else body)
+                except ValueError:
+                    continue
+                endpoint = urlsplit(interaction["request"]["uri"]).path.split("/v0/", 1)[-1].split("/")[0]
+                if endpoint == "markets":
+                    for market in value:
+                        markets.setdefault(market["id"], market)
+                elif endpoint in ("market", "slug"):
+                    for bet in value.get("bets") or []:
+                        bets[bet["id"]] = bet
+                    for comment in value.get("comments") or []:
+                        data.add_comment(comment)
+                    markets[value["id"]] = {k: v for k, v in value.items() if k not in ("bets", "comments")}
+                elif endpoint == "bets":
+                    bets.update((bet["id"], bet) for bet in value)
+                elif endpoint == "user":
+                    data.add_user(value)
+                elif endpoint == "groups":
+                    for group in value:
+                        data.add_group(group)
+                elif endpoint == "group":
+                    data.add_group(value)
+        for market in sorted(markets.values(), key=lambda market: market["createdTime"]):
+            data.add_market(market)
+        for bet in sorted(bets.values(), key=lambda bet: bet["createdTime"]):
+            data.add_bet(bet)
+        return data
+
+    def add_market(self, market: JSONDict) -> None:
+        self.markets.add(market)
+        if market.get("url"):
+            self.markets_by_slug[str(market["url"]).split("/")[-1]] = market
+
+    def add_bet(self, bet: JSONDict) -> None:
+        self.bets.add(bet)
+        self.bets_by_contract.setdefault(str(bet["contractId"]), Feed()).add(bet)
+        if bet.get("userUsername"):
+            self.bets_by_user.setdefault(str(bet["userUsername"]), Feed()).add(bet)
+
+    def add_comment(self, comment: JSONDict) -> None:
+        self.comments.setdefault(str(comment["contractId"]), []).append(comment)
+
+    def add_user(self, user: JSONDict) -> None:
+        self.users[str(user["username"])] = user
+
+    def add_group(self, group: JSONDict) -> None:
+        self.groups[str(group["id"])] = group
+
+    def market(self, market_id: str) -> Optional[JSONDict]:
+        position = self.markets.positions.get(market_id)
+        return None if position is None else self.markets.items[position]
+
+    def full_market(self, market: JSONDict) -> JSONDict:
+        """Get a market with its bets, newest first, and comments, as `/market/{id}` returns it."""
+        bets = self.bets_by_contract.get(str(market["id"]))
+        return {
+            **market,
+            "bets": bets.page(None, len(bets)) if bets is not None else [],
+            "comments": self.comments.get(str(market["id"]), []),
+        }
+
+
+class StandInServer:
+    """Serves a `Dataset` over HTTP on a local port the way the Manifold API would, from a background thread.
+
+    Every request first waits `latency` seconds, plus up to `jitter` more. With `rate_limit` set, requests beyond
+    that many per second (after a burst of `burst`) are answered with a 429 and a ``Retry-After`` header. Of the
+    rest, a random `error_rate` fraction fail with a 500, and the others are answered from the data. Placing a bet
+    moves its market's pool and probability as Maniswap would.
+    """
+
+    def __init__(
+        self,
+        data: Optional[Dataset] = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit: Optional[float] = None,
+        burst: Optional[float] = None,
+        port: int = 0,
+        seed: int = 0,
+    ):
+        """Start serving, on `port` or else any free one, synthetic data unless given some."""
+        self.data = data if data is not None else Dataset.synthetic()
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.bucket = TokenBucket(rate_limit, burst) if rate_limit is not None else None
+        self.statuses: Dict[int, int] = {}
+        self._random = random.Random(seed)
+        self._ids = count()
+        self._lock = Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Otherwise the headers and body go out in separate packets, and each response waits on a delayed ACK
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _handle(self) -> None:
+                url = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length)) if length else None
+                except ValueError:
+                    body = None
+                status, payload, headers = server.respond(
+                    self.command, url.path, parse_qs(url.query), body, self.headers.get("Authorization")
+                )
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = _handle
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+        self.thread.start()
+
+    @property
+    def base_uri(self) -> str:
+        """Get the URI to give a `Transport` to talk to this server."""
+        return "http://127.0.0.1:%d/api/v0" % self.httpd.server_address[1]
+
+    @property
+    def requests(self) -> int:
+        """Get how many requests have been answered."""
+        return sum(self.statuses.values())
+
+    def close(self) -> None:
+        """Stop serving."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> StandInServer:
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def respond(
+        self, method: str, path: str, query: Dict[str, List[str]], body: Any, authorization: Optional[str]
+    ) -> Tuple[int, Any, Dict[str, str]]:
+        """Answer a request, waiting, throttling and failing it as configured."""
+        if self.latency or self.jitter:
+            sleep(self.latency + self.jitter * self._random.random())
+        headers: Dict[str, str] = {}
+        wait = self.bucket.try_acquire() if self.bucket is not None else 0.0
+        if wait:
+            status, payload = 429, {"message": "Too many requests"}
+            headers["Retry-After"] = str(math.ceil(wait))
+        elif self.error_rate and self._random.random() < self.error_rate:
+            status, payload = 500, {"message": "Internal error"}
+        else:
+            status, payload = self._route(method, path.split("/api/v0", 1)[-1], query, body, authorization)
+        with self._lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+        return status, payload, headers
+
+    def _route(
+        self, method: str, path: str, query: Dict[str, List[str]], body: Any, authorization: Optional[str]
+    ) -> Response:
+        parts = path.strip("/").split("/")
+        params = {name: values[0] for name, values in query.items()}
+        if method == "POST":
+            if not authorization:
+                return 401, {"message": "Missing API key"}
+            if path == "/bet":
+                return self._place_bet(body or {})
+            if path == "/comment":
+                return self._comment(body or {})
+            return 404, {"message": "Not found"}
+        if method != "GET":
+            return 405, {"message": "Method not allowed"}
+
+        data = self.data
+        if path == "/markets":
+            return _page(data.markets, params)
+        if path == "/bets":
+            feed: Optional[Feed] = data.bets
+            if "market" in params:
+                market = data.markets_by_slug.get(params["market"])
+                feed = data.bets_by_contract.get(str(market["id"])) if market is not None else None
+            if "username" in params:
+                user_feed = data.bets_by_user.get(params["username"])
+                feed = user_feed if "market" not in params else _intersect(feed, user_feed)
+            return _page(feed, params)
+        if path == "/groups":
+            return 200, list(data.groups.values())
+        if path == "/me":
+            if not authorization or not data.users:
+                return 401, {"message": "Missing API key"}
+            return 200, next(iter(data.users.values()))
+        if len(parts) == 2 and parts[0] in ("market", "slug"):
+            market = data.market(parts[1]) if parts[0] == "market" else data.markets_by_slug.get(parts[1])
+            if market is None:
+                return 404, {"message": "Market not found"}
+            return 200, data.full_market(market)
+        if len(parts) == 2 and parts[0] == "user":
+            user = data.users.get(parts[1])
+            return (200, user) if user is not None else (404, {"message": "User not found"})
+        if parts[0] == "group" and len(parts) in (2, 3):
+            if len(parts) == 3 and parts[1] == "by-id":
+                group = data.groups.get(parts[2])
+            else:
+                group = next((g for g in data.groups.values() if g.get("slug") == parts[-1]), None)
+            return (200, group) if group is not None else (404, {"message": "Group not found"})
+        return 404, {"message": "Not found"}
+
+    def _place_bet(self, body: JSONDict) -> Response:
+        with self._lock:
+            market = self.data.market(str(body.get("contractId")))
+            amount, outcome = body.get("amount"), body.get("outcome")
+            if market is None:
+                return 404, {"message": "Market not found"}
+            if not isinstance(amount, (int, float)) or amount <= 0 or outcome not in ("YES", "NO"):
+                return 400, {"message": "Invalid bet"}
+            if market.get("isResolved"):
+                return 403, {"message": "Market is resolved"}
+            now = int(time() * 1000)
+            prob_before = market.get("probability")
+            pool, p = market.get("pool"), market.get("p")
+            if isinstance(pool, dict) and p is not None:
+                trade = cpmm.buy(pool["YES"], pool["NO"], p, amount, outcome)
+                market["pool"] = {"YES": float(trade.pool_yes), "NO": float(trade.pool_no)}
+                market["probability"] = float(trade.probability)
+                shares = float(trade.shares)
+            else:
+                shares = float(amount)
+            market["lastUpdatedTime"] = now
+            bet: JSONDict = {
+                "id": "standin-bet-%d" % next(self._ids),
+                "contractId": market["id"],
+                "createdTime": now,
+                "amount": amount,
+                "outcome": outcome,
+                "shares": shares,
+                "probBefore": prob_before,
+                "probAfter": market.get("probability"),
+                "userId": "standin",
+                "userUsername": "standin",
+                "isFilled": True,
+                "isCancelled": False,
+            }
+            if body.get("limitProb") is not None:
+                bet["limitProb"] = body["limitProb"]
+            self.data.add_bet(bet)
+            return 200, {"betId": bet["id"]}
+
+    def _comment(self, body: JSONDict) -> Response:
+        with self._lock:
+            market = self.data.market(str(body.get("contractId")))
+            if market is None:
+                return 404, {"message": "Market not found"}
+            comment = {
+                "id": "standin-comment-%d" % next(self._ids),
+                "contractId": market["id"],
+                "createdTime": int(time() * 1000),
+                "text": body.get("markdown") or body.get("html") or "",
+                "content": body.get("content"),
+                "userId": "standin",
+                "userUsername": "standin",
+            }
+            self.data.add_comment(comment)
+            return 200, comment
+
+
+def _page(feed: Optional[Feed], params: Dict[str, str]) -> Response:
+    """Answer a list endpoint from a feed, the way the API pages it."""
+    try:
+        limit = min(int(params.get("limit", 1000)), 1000)
+    except ValueError:
+        return 400, {"message": "Invalid limit"}
+    if feed is None:
+        return 200, []
+    page = feed.page(params.get("before"), limit)
+    if page is None:
+        return 404, {"message": "Cursor not found"}
+    return 200, [{k: v for k, v in item.items() if k not in _FULL_MARKET_FIELDS} for item in page]
+
+
+def _intersect(feed: Optional[Feed], other: Optional[Feed]) -> Optional[Feed]:
+    if feed is None or other is None:
+        return None
+    merged = Feed()
+    for item in feed.items:
+        if str(item["id"]) in other.positions:
+            merged.add(item)
+    return merged
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--markets", type=int, default=1000)
+    parser.add_argument("--bets", type=int, default=10_000)
+    parser.add_argument("--cassettes", action="store_true", help="serve the test suite's recorded responses")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra seconds to wait, at most, chosen randomly")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests to fail with a 500")
+    parser.add_argument("--rate-limit", type=float, help="requests per second to allow before answering 429")
+    args = parser.parse_args(None if argv is None else list(argv))
+    data = Dataset.from_cassettes() if args.cassettes else Dataset.synthetic(args.markets, args.bets)
+    server = StandInServer(data, args.latency, args.jitter, args.error_rate, args.rate_limit, port=args.port)
+    print(server.base_uri, flush=True)
+    try:
+        server.thread.join()
+    except KeyboardInterrupt:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""A micro-benchmark suite for the CPU-bound parts of PyManifold, checked against tracked baselines.
+
+Each case is timed over synthetic inputs scaled by powers of ten, from 1 up to its largest size (at most 1M), and
+reported per object. Times are divided by that of a fixed calibration workload before being compared with
+``baselines.json``, so that baselines recorded on one machine stay meaningful on another. Any case that got slower
+than its baseline by more than the threshold makes the run fail.
+
+Run with ``python -m benchmarks.suite`` from the repository root; ``--update`` records the results as the new
+baselines, and ``--max-size`` or ``-k`` make quicker runs.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from collections import deque
+from pathlib import Path
+from timeit import Timer
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+from pymanifold.frame import MarketFrame
+from pymanifold.types import Bet, Comment, LiteMarket, Market
+from pymanifold.utils import cpmm, kelly_calc, kelly_calc_batch, number_to_prob_cpmm1
+from pymanifold.utils.kelly import _expected_log_wealth_array, expected_log_wealth, shares_bought
+
+from .synthetic import START_TIME, bet_payload, comment_payload, lite_market_payload, make_market, market_payload
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Callable, Dict, Iterable, List, Optional
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+# How much slower than its baseline a case may get before the run fails, as a fraction
+THRESHOLD = 0.3
+
+# The sizes cases are run at, up to their own largest
+SIZES = tuple(10 ** i for i in range(7))
+
+# How long each timed batch of calls takes at least, in seconds
+MIN_TIME = 0.05
+
+# How many distinct payloads are generated per case; larger inputs repeat them, to bound memory
+DISTINCT_PAYLOADS = 10_000
+
+
+class Case(NamedTuple):
+    """A benchmark: given a size, build its input and return the function to time."""
+
+    name: str
+    setup: Callable[[int], Callable[[], object]]
+    max_size: int = SIZES[-1]
+
+
+class Result(NamedTuple):
+    case: str
+    size: int
+    # Seconds per object, and the same divided by the calibration time
+    seconds: float
+    relative: float
+
+
+def _payloads(make: Callable[[int], object], size: int) -> List[object]:
+    distinct = [make(i) for i in range(min(size, DISTINCT_PAYLOADS))]
+    return [distinct[i % len(distinct)] for i in range(size)]
+
+
+def _consume(results: Iterable[object]) -> None:
+    """Run through results without keeping them, so only the work itself is timed."""
+    deque(results, maxlen=0)
+
+
+def _from_dict(cls: type, make: Callable[[int], object]) -> Callable[[int], Callable[[], object]]:
+    def setup(size: int) -> Callable[[], object]:
+        payloads = _payloads(make, size)
+        return lambda: _consume(map(cls.from_dict, payloads))  # type: ignore[attr-defined]
+    return setup
+
+
+def _market_with_bets(size: int) -> Callable[[], object]:
+    env = market_payload(0)
+    env["bets"] = _payloads(bet_payload, size)
+
+    def decode() -> object:
+        return Market.from_dict(env).bets
+    return decode
+
+
+def _market_frame(size: int) -> Callable[[], object]:
+    payloads = _payloads(lite_market_payload, size)
+    return lambda: MarketFrame.from_dicts(payloads, START_TIME)  # type: ignore[arg-type]
+
+
+def _scan(size: int) -> Callable[[], object]:
+    frame = MarketFrame.from_dicts([lite_market_payload(i) for i in range(size)], START_TIME + 30 * 86_400_000)
+    return lambda: frame.filter(isOpen=True, liquidity=(200, None), volumeRatio=(1, None)).rank("turnover", n=100)
+
+
+def _random_markets(size: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    return np.column_stack([
+        rng.uniform(5, 5000, size), rng.uniform(5, 5000, size), rng.uniform(0.05, 0.95, size), rng.random(size)
+    ])
+
+
+def _per_market(func: Callable[..., object], extra: Callable[[int], tuple]) -> Callable[[int], Callable[[], object]]:
+    """Call `func` once per object, with a market, a subjective probability, and then `extra(i)`."""
+    def setup(size: int) -> Callable[[], object]:
+        distinct = [(make_market(y, n, p), q) for y, n, p, q in _random_markets(min(size, DISTINCT_PAYLOADS))]
+        calls = [(distinct[i % len(distinct)], extra(i)) for i in range(size)]
+        return lambda: _consume(func(*market, *rest) for market, rest in calls)
+    return setup
+
+
+def _kelly_batch(size: int) -> Callable[[], object]:
+    y, n, p, q = _random_markets(size).T
+    prob = cpmm.probability(y, n, p)
+    return lambda: kelly_calc_batch(y, n, p, prob, q, 1000)
+
+
+def _cpmm_buy(size: int) -> Callable[[], object]:
+    y, n, p, q = _random_markets(size).T
+    outcome = np.where(q > 0.5, "YES", "NO")
+    return lambda: cpmm.buy(y, n, p, np.full(size, 50.0), outcome)
+
+
+def _log_wealth_array(size: int) -> Callable[[], object]:
+    y, n, p, q = _random_markets(size).T
+    bets = np.arange(size) % 999
+    return lambda: _expected_log_wealth_array(y, n, p, q, bets, "YES", 1000)
+
+
+def _kelly_by_balance(size: int) -> Callable[[], object]:
+    market = make_market(1000, 800, 0.5)
+    # Per object here means per unit of balance; one call covers them all
+    return lambda: kelly_calc(market, 0.8, size)
+
+
+def _number_to_prob(size: int) -> Callable[[], object]:
+    values = [(i % 1000, i % 2 == 0) for i in range(size)]
+    return lambda: _consume(number_to_prob_cpmm1(v, 0, 1000, log) for v, log in values)
+
+
+CASES = (
+    Case("Bet.from_dict", _from_dict(Bet, bet_payload)),
+    Case("Comment.from_dict", _from_dict(Comment, comment_payload)),
+    Case("LiteMarket.from_dict", _from_dict(LiteMarket, lite_market_payload)),
+    Case("Market.from_dict (bets)", _market_with_bets, max_size=100_000),
+    Case("MarketFrame.from_dicts", _market_frame, max_size=100_000),
+    Case("MarketFrame scan", _scan, max_size=100_000),
+    Case("shares_bought", _per_market(
+        lambda market, q, bet, outcome: shares_bought(market, bet, outcome),
+        lambda i: (i % 999 + 1, "YES" if i % 2 else "NO"),
+    ), max_size=100_000),
+    Case("expected_log_wealth", _per_market(expected_log_wealth, lambda i: (i % 999, "YES", 1000)), max_size=100_000),
+    Case("kelly_calc (balance)", _kelly_by_balance),
+    Case("kelly_calc", _per_market(kelly_calc, lambda i: (1000,)), max_size=10_000),
+    Case("kelly_calc_batch", _kelly_batch),
+    Case("cpmm.buy", _cpmm_buy),
+    Case("_expected_log_wealth_array", _log_wealth_array),
+    Case("number_to_prob_cpmm1", _number_to_prob),
+)
+
+
+def calibrate() -> float:
+    """Time a fixed mix of interpreter and NumPy work, to scale results by the speed of the machine."""
+    values = np.linspace(0.01, 0.99, 10_000)
+
+    def work() -> None:
+        sum(i * i for i in range(10_000))
+        {str(i): i for i in range(1000)}
+        np.log(values).sum()
+
+    return _best(work)
+
+
+def _best(func: Callable[[], object], repeat: int = 3) -> float:
+    """Get the best time of one call of `func`, over `repeat` batches of calls that each take at least MIN_TIME."""
+    timer = Timer(func)
+    number = 1
+    elapsed = timer.timeit(number)
+    while elapsed < MIN_TIME:
+        number *= 10
+        elapsed = timer.timeit(number)
+    return min([elapsed, *timer.repeat(repeat - 1, number)]) / number
+
+
+def run(cases: Iterable[Case], max_size: int = SIZES[-1], calibration: Optional[float] = None) -> List[Result]:
+    """Time each case at each size up to `max_size`."""
+    calibration = calibration if calibration is not None else calibrate()
+    results = []
+    for case in cases:
+        for size in SIZES:
+            if size > min(max_size, case.max_size):
+                break
+            seconds = _best(case.setup(size)) / size
+            results.append(Result(case.name, size, seconds, seconds / calibration))
+    return results
+
+
+def compare(results: Iterable[Result], baselines: Dict[str, Dict[str, float]], threshold: float) -> List[str]:
+    """Describe each result that's more than `threshold` slower than its baseline. Results with no baseline pass."""
+    regressions = []
+    for result in results:
+        baseline = baselines.get(result.case, {}).get(str(result.size))
+        if baseline is not None and result.relative > baseline * (1 + threshold):
+            slower = 100 * (result.relative / baseline - 1)
+            regressions.append("%s at %d: %.0f%% slower than baseline" % (result.case, result.size, slower))
+    return regressions
+
+
+def load_baselines(path: Path = BASELINES) -> Dict[str, Dict[str, float]]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())  # type: ignore[no-any-return]
+
+
+def save_baselines(results: Iterable[Result], path: Path = BASELINES) -> None:
+    """Record results as baselines, keeping those of cases and sizes that weren't run."""
+    baselines = load_baselines(path)
+    for result in results:
+        baselines.setdefault(result.case, {})[str(result.size)] = float("%.4g" % result.relative)
+    path.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--update", action="store_true", help="record the results as the new baselines")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="the slowdown allowed, as a fraction")
+    parser.add_argument("--max-size", type=int, default=SIZES[-1], help="the largest input size to run")
+    parser.add_argument("-k", dest="pattern", help="only run cases whose name contains this")
+    args = parser.parse_args(argv)
+
+    cases = [case for case in CASES if args.pattern is None or args.pattern in case.name]
+    baselines = load_baselines()
+    calibration = calibrate()
+    print(f"calibration: {calibration * 1e3:.2f}ms")
+    print(f"{'case':>28} {'size':>8} {'per object':>12} {'vs baseline':>12}")
+    results = []
+    for case in cases:
+        for result in run([case], args.max_size, calibration):
+            results.append(result)
+            baseline = baselines.get(result.case, {}).get(str(result.size))
+            change = f"{100 * (result.relative / baseline - 1):>+11.0f}%" if baseline else f"{'-':>12}"
+            print(f"{result.case:>28} {result.size:>8} {result.seconds * 1e6:>10.3f}us {change}")
+
+    if args.update:
+        save_baselines(results)
+        print(f"Updated {BASELINES.name}")
+        return 0
+    regressions = compare(results, baselines, args.threshold)
+    for regression in regressions:
+        print("REGRESSION:", regression)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,8 @@
+"""Synthetic API payloads, shaped like the ones Manifold returns, for benchmarks.
+
+The builders are defined with the tests' payloads, so that the tests don't depend on the benchmarks.
+"""
+
+from tests.payloads import (  # noqa: F401
+    START_TIME, bet_payload, comment_payload, lite_market_payload, make_market, market_payload
+)
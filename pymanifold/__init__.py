@@ -1,7 +1,50 @@
 """Python bindings for the Manifold Markets API."""
 
+from typing import TYPE_CHECKING
+
+from .cache import ResponseCache
+from .instrument import MetricsRecorder, RequestRecord
 from .lib import ManifoldClient
-from .types import Bet, Comment, LiteMarket, Market
+from .ratelimit import RateLimiter
+from .store import ManifoldStore
+from .transport import Transport
+from .types import Bet, BetResult, Comment, LiteMarket, Market, MarketMetadata
+from .utils.lazy import lazy_attributes
+from .watch import MarketChange, MarketWatcher
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .aio import AsyncManifoldClient
+    from .frame import BetFrame, MarketFrame
+    from .history import ProbabilityHistory
 
 __version__ = "0.2.0"
-__all__ = ("Bet", "Comment", "LiteMarket", "ManifoldClient", "Market")
+__all__ = (
+    "AsyncManifoldClient",
+    "Bet",
+    "BetFrame",
+    "BetResult",
+    "Comment",
+    "LiteMarket",
+    "ManifoldClient",
+    "ManifoldStore",
+    "Market",
+    "MarketChange",
+    "MarketFrame",
+    "MarketMetadata",
+    "MarketWatcher",
+    "MetricsRecorder",
+    "ProbabilityHistory",
+    "RateLimiter",
+    "RequestRecord",
+    "ResponseCache",
+    "Transport",
+)
+
+# These need NumPy or aiohttp, which take longer to import than the rest of the package, so they're only imported when
+# first used. A job that only needs the HTTP client never pays for them.
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    "AsyncManifoldClient": ".aio",
+    "BetFrame": ".frame",
+    "MarketFrame": ".frame",
+    "ProbabilityHistory": ".history",
+})
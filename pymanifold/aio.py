@@ -0,0 +1,543 @@
+"""Contains the asyncio client interface."""
+
+from __future__ import annotations
+
+import asyncio
+from time import time
+from typing import TYPE_CHECKING, Any, cast, overload
+
+from .lib import (
+    MAX_PAGE_SIZE,
+    METADATA_CACHE_SIZE,
+    RECOVERY_ATTEMPTS,
+    RECOVERY_CLOCK_SKEW,
+    RECOVERY_DELAY,
+    RECOVERY_PAGE_SIZE,
+    _bet_payload,
+    _comment_payload,
+    _indices_by_market,
+    _is_created_market,
+    _market_from_dict,
+    _market_payload,
+    _resolution_payload,
+)
+from .cache import ResponseCache
+from .transport import BASE_URI, DEFAULT_TIMEOUT
+from .types import Bet, BetResult, Group, JSONDict, LiteMarket, LiteUser, Market, MarketMetadata
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    aiohttp = None
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import (
+        AsyncGenerator, AsyncIterator, Container, Iterable, List, Literal, Optional, Sequence, Tuple, Type, TypeVar,
+        Union,
+    )
+
+    from .ratelimit import RateLimiter
+
+    T = TypeVar("T")
+
+
+class AsyncManifoldClient:
+    """An asyncio client for interacting with the website manifold.markets.
+
+    Mirrors `ManifoldClient`, with every network call returned as an awaitable. At most `max_concurrency` requests
+    are in flight at once, no matter how many coroutines share the client. Write endpoints return the decoded JSON
+    body of the response rather than the response itself.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        base_uri: str = BASE_URI,
+        max_concurrency: int = 100,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+        session: Optional[aiohttp.ClientSession] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        """Initialize an asyncio Manifold client, optionally with an API key and a (possibly shared) rate limiter."""
+        if aiohttp is None:  # pragma: no cover
+            raise ImportError("AsyncManifoldClient requires aiohttp, available as the 'async' extra")
+        self.api_key = api_key
+        self.base_uri = base_uri.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self._session = session
+        self._owns_session = session is None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._username: Optional[str] = None
+        self._metadata = ResponseCache(maxsize=METADATA_CACHE_SIZE, default_ttl=float("inf"))
+
+    async def __aenter__(self) -> AsyncManifoldClient:
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying session, if this client created it."""
+        if self._session is not None and self._owns_session:
+            await self._session.close()
+            self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Both of these bind to the running event loop, so they can't be made in __init__
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[JSONDict] = None,
+        json: Optional[JSONDict] = None,
+        raise_statuses: Container[int] = (),
+        auth: bool = False,
+    ) -> Tuple[int, Any]:
+        session = self._get_session()
+        headers = self._auth_headers() if auth or method == "POST" else None
+        if params is not None:
+            params = {k: v for k, v in params.items() if v is not None}
+        semaphore = self._semaphore
+        assert semaphore is not None
+
+        async def send() -> Tuple[aiohttp.ClientResponse, Any]:
+            async with semaphore:
+                async with session.request(
+                    method, self.base_uri + path, params=params, json=json, headers=headers
+                ) as response:
+                    if response.status in raise_statuses:
+                        return response, None
+                    return response, await response.json(content_type=None)
+
+        if self.rate_limiter is None:
+            response, body = await send()
+        else:
+            response, body = await self.rate_limiter.send_async(method, send, _status)
+        if response.status in raise_statuses:
+            response.raise_for_status()
+        return response.status, body
+
+    async def _get(self, path: str, params: Optional[JSONDict] = None) -> Any:
+        return (await self._request("GET", path, params=params))[1]
+
+    async def _post(self, path: str, json: JSONDict) -> Any:
+        return (await self._request("POST", path, json=json, raise_statuses=range(400, 600)))[1]
+
+    async def _own_username(self) -> Optional[str]:
+        """Get the username the API key belongs to, or None if it can't be looked up right now."""
+        if self._username is None:
+            try:
+                status, body = await self._request("GET", "/me", auth=True)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                return None
+            if status < 400:
+                self._username = cast(str, body["username"])
+        return self._username
+
+    def _auth_headers(self) -> dict[str, str]:
+        if self.api_key:
+            return {"Authorization": "Key " + self.api_key}
+        else:
+            raise RuntimeError("No API key provided")
+
+    async def list_markets(self, limit: Optional[int] = None, before: Optional[str] = None) -> List[LiteMarket]:
+        """List all markets."""
+        return await self.get_markets(limit, before)
+
+    async def get_markets(self, limit: Optional[int] = None, before: Optional[str] = None) -> List[LiteMarket]:
+        """Get a page of markets."""
+        data = await self._get("/markets", params={"limit": limit, "before": before})
+        return [LiteMarket.from_dict(market) for market in data]
+
+    def iter_markets(
+        self,
+        before: Optional[str] = None,
+        max_items: Optional[int] = None,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: bool = True,
+    ) -> AsyncIterator[LiteMarket]:
+        """Iterate over every market, following the `before` cursor from page to page.
+
+        Stops after `max_items` markets, if given. With `prefetch` set, the next page is requested in the background
+        while the current one is being consumed.
+        """
+        return self._iter_items(LiteMarket, "/markets", {}, before, max_items, page_size, prefetch)
+
+    async def list_groups(self, availableToUserId: Optional[str] = None) -> List[Group]:
+        """List all groups."""
+        return await self.get_groups(availableToUserId)
+
+    async def get_groups(self, availableToUserId: Optional[str] = None) -> List[Group]:
+        """Get all groups."""
+        data = await self._get("/groups", params={"availableToUserId": availableToUserId})
+        return [Group.from_dict(group) for group in data]
+
+    async def get_group(self, slug: Optional[str] = None, id_: Optional[str] = None) -> Group:
+        """Get a group by slug or id."""
+        if id_ is not None:
+            data = await self._get("/group/by-id/" + id_)
+        elif slug is not None:
+            data = await self._get("/group/" + slug)
+        else:
+            raise ValueError("Requires one or more of (slug, id_)")
+        return Group.from_dict(data)
+
+    async def list_bets(
+        self,
+        limit: Optional[int] = None,
+        before: Optional[str] = None,
+        username: Optional[str] = None,
+        market: Optional[str] = None,
+    ) -> List[Bet]:
+        """List all bets."""
+        return await self.get_bets(limit, before, username, market)
+
+    async def get_bets(
+        self,
+        limit: Optional[int] = None,
+        before: Optional[str] = None,
+        username: Optional[str] = None,
+        market: Optional[str] = None,
+    ) -> List[Bet]:
+        """Get a page of bets."""
+        data = await self._get(
+            "/bets", params={"limit": limit, "before": before, "username": username, "market": market}
+        )
+        return [Bet.from_dict(bet) for bet in data]
+
+    def iter_bets(
+        self,
+        before: Optional[str] = None,
+        username: Optional[str] = None,
+        market: Optional[str] = None,
+        max_items: Optional[int] = None,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: bool = True,
+    ) -> AsyncIterator[Bet]:
+        """Iterate over every bet, following the `before` cursor from page to page.
+
+        Stops after `max_items` bets, if given. With `prefetch` set, the next page is requested in the background
+        while the current one is being consumed.
+        """
+        params: JSONDict = {"username": username, "market": market}
+        return self._iter_items(Bet, "/bets", params, before, max_items, page_size, prefetch)
+
+    async def _iter_items(
+        self,
+        cls: Type[T],
+        path: str,
+        params: JSONDict,
+        before: Optional[str],
+        max_items: Optional[int],
+        page_size: int,
+        prefetch: bool,
+    ) -> AsyncIterator[T]:
+        async for page in self._paginate(path, params, before, max_items, page_size, prefetch):
+            for item in page:
+                yield cls.from_dict(item)  # type: ignore[attr-defined]
+
+    async def _paginate(
+        self,
+        path: str,
+        params: JSONDict,
+        before: Optional[str],
+        max_items: Optional[int],
+        page_size: int,
+        prefetch: bool,
+    ) -> AsyncGenerator[List[JSONDict], None]:
+        """Yield raw pages from a list endpoint until it runs dry or `max_items` have been seen."""
+        async def fetch(cursor: Optional[str], limit: int) -> List[JSONDict]:
+            _, page = await self._request(
+                "GET", path, params={**params, "limit": limit, "before": cursor}, raise_statuses=range(400, 600)
+            )
+            return cast("List[JSONDict]", page)
+
+        remaining = max_items if max_items is not None else float("inf")
+        limit = int(min(page_size, remaining))
+        if limit <= 0:
+            return
+        pending: Optional[asyncio.Task[List[JSONDict]]] = None
+        try:
+            page = await fetch(before, limit)
+            while True:
+                remaining -= len(page)
+                more = len(page) == limit and remaining > 0
+                if more:
+                    cursor, limit = cast(str, page[-1]["id"]), int(min(page_size, remaining))
+                    if prefetch:
+                        pending = asyncio.ensure_future(fetch(cursor, limit))
+                yield page
+                if not more:
+                    return
+                page = await pending if pending is not None else await fetch(cursor, limit)
+                pending = None
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    @overload
+    async def get_market_by_id(self, market_id: str, lite: Literal[False] = False) -> Market:
+        ...
+
+    @overload
+    async def get_market_by_id(self, market_id: str, lite: Literal[True]) -> LiteMarket:
+        ...
+
+    async def get_market_by_id(self, market_id: str, lite: bool = False) -> LiteMarket:
+        """Get a market by id.
+
+        With `lite` set, the market's bets and comments are never decoded, and a `LiteMarket` is returned.
+        """
+        return _market_from_dict(await self._get("/market/" + market_id), lite)
+
+    async def get_market_metadata(self, market_id: str) -> MarketMetadata:
+        """Get the attributes of a market that never change, fetching them at most once per market."""
+        entry, _ = self._metadata.lookup("metadata", market_id)
+        if entry is not None:
+            return cast(MarketMetadata, entry.value)
+        metadata = MarketMetadata.from_dict(await self._get("/market/" + market_id))
+        self._metadata.store("metadata", market_id, metadata)
+        return metadata
+
+    @overload
+    async def get_market_by_slug(self, slug: str, lite: Literal[False] = False) -> Market:
+        ...
+
+    @overload
+    async def get_market_by_slug(self, slug: str, lite: Literal[True]) -> LiteMarket:
+        ...
+
+    async def get_market_by_slug(self, slug: str, lite: bool = False) -> LiteMarket:
+        """Get a market by slug.
+
+        With `lite` set, the market's bets and comments are never decoded, and a `LiteMarket` is returned.
+        """
+        return _market_from_dict(await self._get("/slug/" + slug), lite)
+
+    @overload
+    async def get_market_by_url(self, url: str, lite: Literal[False] = False) -> Market:
+        ...
+
+    @overload
+    async def get_market_by_url(self, url: str, lite: Literal[True]) -> LiteMarket:
+        ...
+
+    async def get_market_by_url(self, url: str, lite: bool = False) -> LiteMarket:
+        """Get a market by url.
+
+        With `lite` set, the market's bets and comments are never decoded, and a `LiteMarket` is returned.
+        """
+        return await self.get_market_by_slug(url.split("/")[-1].split("#")[0], lite)
+
+    async def get_user(self, handle: str) -> LiteUser:
+        """Get a user by handle."""
+        return LiteUser.from_dict(await self._get("/user/" + handle))
+
+    async def cancel_market(self, market: Union[LiteMarket, str]) -> JSONDict:
+        """Cancel a market, resolving it N/A."""
+        marketId = market.id if isinstance(market, LiteMarket) else market
+        return cast(JSONDict, await self._post("/market/" + marketId + "/resolve", json={"outcome": "CANCEL"}))
+
+    async def create_bet(
+        self, contractId: str, amount: int, outcome: str, limitProb: Optional[float] = None
+    ) -> str:
+        """Place a bet.
+
+        Returns the ID of the created bet.
+        """
+        data = await self._post("/bet", json=_bet_payload(contractId, amount, outcome, limitProb))
+        return cast(str, data["betId"])
+
+    async def create_bets(
+        self, bets: Iterable[Sequence[Any]], max_in_flight: int = 8, ordered_per_market: bool = False
+    ) -> List[BetResult]:
+        """Place many bets at once, each given as the `(contractId, amount, outcome[, limitProb])` for `create_bet`.
+
+        See `ManifoldClient.create_bets`.
+        """
+        orders = [tuple(order) for order in bets]
+        in_flight = asyncio.Semaphore(max_in_flight)
+
+        async def place(order: Tuple[Any, ...]) -> BetResult:
+            async with in_flight:
+                try:
+                    return BetResult(*order, betId=await self.create_bet(*order))
+                except Exception as e:
+                    return BetResult(*order, error=e)
+
+        if not ordered_per_market:
+            return list(await asyncio.gather(*(place(order) for order in orders)))
+
+        results: List[Optional[BetResult]] = [None] * len(orders)
+
+        async def place_in_order(indices: List[int]) -> None:
+            for i in indices:
+                results[i] = await place(orders[i])
+
+        await asyncio.gather(*(place_in_order(indices) for indices in _indices_by_market(orders)))
+        return cast("List[BetResult]", results)
+
+    async def create_free_response_market(
+        self,
+        question: str,
+        description: str,
+        closeTime: int,
+        tags: Optional[List[str]] = None,
+    ) -> LiteMarket:
+        """Create a free response market."""
+        return await self._create_market("FREE_RESPONSE", question, description, closeTime, tags)
+
+    async def create_multiple_choice_market(
+        self,
+        question: str,
+        description: str,
+        closeTime: int,
+        answers: List[str],
+        tags: Optional[List[str]] = None,
+    ) -> LiteMarket:
+        """Create a multiple choice market."""
+        return await self._create_market(
+            "MULTIPLE_CHOICE", question, description, closeTime, tags, answers=answers
+        )
+
+    async def create_numeric_market(
+        self,
+        question: str,
+        description: str,
+        closeTime: int,
+        minValue: int,
+        maxValue: int,
+        isLogScale: bool,
+        initialValue: Optional[float] = None,
+        tags: Optional[List[str]] = None,
+    ) -> LiteMarket:
+        """Create a numeric market."""
+        return await self._create_market(
+            "PSEUDO_NUMERIC",
+            question,
+            description,
+            closeTime,
+            tags,
+            minValue=minValue,
+            maxValue=maxValue,
+            isLogScale=isLogScale,
+            initialValue=initialValue,
+        )
+
+    async def create_binary_market(
+        self,
+        question: str,
+        description: str,
+        closeTime: int,
+        tags: Optional[List[str]] = None,
+        initialProb: Optional[int] = 50,
+    ) -> LiteMarket:
+        """Create a binary market."""
+        return await self._create_market(
+            "BINARY", question, description, closeTime, tags, initialProb=initialProb
+        )
+
+    async def _create_market(
+        self,
+        outcomeType: str,
+        question: str,
+        description: str,
+        closeTime: int,
+        tags: Optional[List[str]] = None,
+        initialProb: Optional[int] = 50,
+        initialValue: Optional[float] = None,
+        minValue: Optional[int] = None,
+        maxValue: Optional[int] = None,
+        isLogScale: Optional[bool] = None,
+        answers: Optional[Sequence[str]] = None,
+    ) -> LiteMarket:
+        """Create a market."""
+        data = _market_payload(
+            outcomeType,
+            question,
+            description,
+            closeTime,
+            tags,
+            initialProb=initialProb,
+            initialValue=initialValue,
+            minValue=minValue,
+            maxValue=maxValue,
+            isLogScale=isLogScale,
+            answers=answers,
+        )
+        started = int(time() * 1000)
+        try:
+            body = await self._post("/market", json=data)
+        except aiohttp.ClientResponseError as e:
+            if e.status < 500:
+                raise
+            # Sometimes when there is a serverside error the market is still posted
+            # We want to make sure we still return it in those instances, without re-posting a duplicate
+            market = await self._recover_created_market(outcomeType, question, closeTime, started)
+            if market is None:
+                raise
+            return market
+        return LiteMarket.from_dict(body)
+
+    async def _recover_created_market(
+        self, outcomeType: str, question: str, closeTime: int, started: int
+    ) -> Optional[LiteMarket]:
+        """Look for a market this client just tried to create among the newest ones, polling a few times."""
+        creator = await self._own_username()
+        for attempt in range(RECOVERY_ATTEMPTS):
+            if attempt:
+                await asyncio.sleep(RECOVERY_DELAY * 2 ** (attempt - 1))
+            pages = self._paginate("/markets", {}, None, None, RECOVERY_PAGE_SIZE, prefetch=False)
+            try:
+                async for page in pages:
+                    for env in page:
+                        if _is_created_market(env, outcomeType, question, closeTime, creator):
+                            return LiteMarket.from_dict(env)
+                    if not page or cast(int, page[-1]["createdTime"]) < started - RECOVERY_CLOCK_SKEW:
+                        break
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                # A timeout isn't a ClientError, but during an outage it's just as likely
+                pass
+            finally:
+                await pages.aclose()
+        return None
+
+    async def resolve_market(self, market: Union[LiteMarket, str], *args: Any, **kwargs: Any) -> JSONDict:
+        """Resolve a market, with different inputs depending on its type."""
+        if isinstance(market, LiteMarket):
+            metadata = MarketMetadata.from_market(market)
+        else:
+            metadata = await self.get_market_metadata(market)
+        json = _resolution_payload(metadata, *args, **kwargs)
+        return cast(JSONDict, await self._post("/market/" + metadata.id + "/resolve", json=json))
+
+    @overload
+    async def create_comment(
+        self, market: LiteMarket | str, comment: str, mode: Literal['markdown', 'html']
+    ) -> JSONDict:
+        ...
+
+    @overload
+    async def create_comment(
+        self, market: LiteMarket | str, comment: JSONDict, mode: Literal['tiptap']
+    ) -> JSONDict:
+        ...
+
+    async def create_comment(self, market: LiteMarket | str, comment: str | JSONDict, mode: str) -> JSONDict:
+        """Create a comment on a given market, using Markdown, HTML, or TipTap formatting."""
+        return cast(JSONDict, await self._post("/comment", json=_comment_payload(market, comment, mode)))
+
+
+def _status(sent: Tuple[aiohttp.ClientResponse, Any]) -> Tuple[int, Optional[str]]:
+    return sent[0].status, sent[0].headers.get("Retry-After")
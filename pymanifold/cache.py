@@ -0,0 +1,124 @@
+"""Contains the opt-in response cache for the client's read endpoints."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Callable, Dict, Hashable, Mapping, Optional, Tuple
+
+# Seconds a response stays fresh, by endpoint, unless overridden
+DEFAULT_TTLS = {
+    "market": 5.0,
+    "slug": 5.0,
+    "user": 60.0,
+    "group": 60.0,
+}
+
+
+class CacheEntry:
+    """A cached response body, with the validators needed to revalidate it."""
+
+    __slots__ = ("value", "expires", "etag", "last_modified")
+
+    def __init__(self, value: Any, expires: float, etag: Optional[str], last_modified: Optional[str]):
+        self.value = value
+        self.expires = expires
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """Get the headers that ask the server to reply 304 if this entry is still current."""
+        headers = {}
+        if self.etag is not None:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified is not None:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """A size-bounded LRU cache of decoded API responses, with a time-to-live per endpoint.
+
+    Entries are keyed by endpoint and request parameters. Once an entry's TTL runs out it is kept, so that if the
+    server sent an ETag or Last-Modified header the client can revalidate it with a conditional request instead of
+    downloading it again. When more than `maxsize` entries are held, the least recently used one is evicted. The
+    `hits`, `misses`, `revalidations` and `evictions` counters can be used to tune the TTLs and size.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttls: Optional[Mapping[str, float]] = None,
+        default_ttl: float = 5.0,
+        clock: Callable[[], float] = monotonic,
+    ):
+        """Initialize a cache, optionally overriding some of the default TTLs."""
+        self.maxsize = maxsize
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self.hits = self.misses = self.revalidations = self.evictions = 0
+        self._entries: OrderedDict[Tuple[str, Hashable], CacheEntry] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl_for(self, endpoint: str) -> float:
+        """Get the time-to-live of responses from an endpoint."""
+        return self.ttls.get(endpoint, self.default_ttl)
+
+    def lookup(self, endpoint: str, key: Hashable) -> Tuple[Optional[CacheEntry], bool]:
+        """Find the entry for a request, and whether it is still fresh. Counts a hit or a miss."""
+        with self._lock:
+            entry = self._entries.get((endpoint, key))
+            if entry is not None:
+                self._entries.move_to_end((endpoint, key))
+            fresh = entry is not None and entry.expires > self.clock()
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry, fresh
+
+    def store(
+        self, endpoint: str, key: Hashable, value: Any, etag: Optional[str] = None, last_modified: Optional[str] = None
+    ) -> None:
+        """Cache a freshly downloaded response."""
+        entry = CacheEntry(value, self.clock() + self.ttl_for(endpoint), etag, last_modified)
+        with self._lock:
+            self._entries[(endpoint, key)] = entry
+            self._entries.move_to_end((endpoint, key))
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def revalidated(self, endpoint: str, entry: CacheEntry) -> None:
+        """Mark a stale entry as current again, after the server confirmed it hasn't changed."""
+        with self._lock:
+            entry.expires = self.clock() + self.ttl_for(endpoint)
+            self.revalidations += 1
+
+    def invalidate(self, endpoint: str, key: Hashable) -> None:
+        """Drop the entry for a request, if there is one."""
+        with self._lock:
+            self._entries.pop((endpoint, key), None)
+
+    def clear(self) -> None:
+        """Drop every entry. The counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Get the hit, miss, revalidation and eviction counters, plus the current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidations": self.revalidations,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
@@ -0,0 +1,93 @@
+"""Contains the optional msgspec backend that decodes response bytes straight into the types in `types.py`.
+
+msgspec is an optional dependency (the ``fast`` extra). Without it, or for any payload it can't decode, everything
+goes through `json` and `DictDeserializable.from_dict` as before.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import field, fields, make_dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, List
+
+from .types import _LAZY_MARKET_FIELDS, DictDeserializable, Market
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Dict, Tuple, Type, TypeVar
+
+    D = TypeVar("D", bound=DictDeserializable)
+
+# Whether the fast backend can be used
+AVAILABLE = msgspec is not None
+
+# Fields that are kept as raw JSON and only decoded when first accessed, as `from_dict` does
+_LAZY: Dict[type, Tuple[str, ...]] = {Market: tuple(_LAZY_MARKET_FIELDS)}
+
+
+def decode(data: bytes, cls: Type[D]) -> D:
+    """Decode a JSON object into an instance of `cls`."""
+    if AVAILABLE:
+        try:
+            obj = _decoder(cls, False).decode(data)
+        except msgspec.DecodeError:
+            pass
+        else:
+            _retag(obj, cls)
+            return obj  # type: ignore[no-any-return]
+    return cls.from_dict(json.loads(data))
+
+
+def decode_list(data: bytes, cls: Type[D]) -> List[D]:
+    """Decode a JSON array of objects into a list of instances of `cls`."""
+    if AVAILABLE:
+        try:
+            objs = _decoder(cls, True).decode(data)
+        except msgspec.DecodeError:
+            pass
+        else:
+            for obj in objs:
+                _retag(obj, cls)
+            return objs  # type: ignore[no-any-return]
+    return [cls.from_dict(env) for env in json.loads(data)]
+
+
+@lru_cache(maxsize=None)
+def _decoder(cls: type, many: bool) -> msgspec.json.Decoder[Any]:
+    schema = _schema(cls)
+    return msgspec.json.Decoder(List[schema] if many else schema)  # type: ignore[valid-type]
+
+
+@lru_cache(maxsize=None)
+def _schema(cls: type) -> type:
+    """Derive the type msgspec decodes into: a subclass of `cls` with the same fields, each accepting any JSON.
+
+    The API's payloads don't always match the annotations in `types.py` (amounts come back as floats, say), and
+    `from_dict` never checked them, so neither does this. Lazy fields are left as raw JSON too.
+    """
+    specs: List[Tuple[str, Any, Any]] = [
+        (
+            f.name,
+            Any,
+            field(default=f.default, default_factory=f.default_factory),  # type: ignore[call-overload]
+        )
+        for f in fields(cls)
+        if f.init
+    ]
+    frozen = cls.__dataclass_params__.frozen  # type: ignore[attr-defined]
+    return make_dataclass("_Decoded" + cls.__name__, specs, bases=(cls,), frozen=frozen)
+
+
+def _retag(obj: Any, cls: type) -> None:
+    """Turn a decoded object into an instance of the public class it was decoded for, with lazy fields pending.
+
+    The decoded subclass adds no state of its own, so this only swaps the class pointer and copies nothing.
+    """
+    object.__setattr__(obj, "__class__", cls)
+    if cls in _LAZY:
+        obj.__dict__["_pending"] = {name: obj.__dict__.pop(name) or [] for name in _LAZY[cls]}
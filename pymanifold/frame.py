@@ -0,0 +1,350 @@
+"""Contains columnar, NumPy-backed collections of bets and markets."""
+
+from __future__ import annotations
+
+from time import time
+from typing import TYPE_CHECKING, Any, Dict, Mapping, Sequence, Union, overload
+
+import numpy as np
+
+from .types import Bet, LiteMarket
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Iterable, Iterator, List, Optional
+
+    from numpy.typing import NDArray
+
+    from .types import JSONDict
+
+
+class BetFrame:
+    """A columnar, array-backed collection of bets.
+
+    Numeric and boolean fields are each kept in one typed NumPy array, with missing values stored as NaN. String
+    fields are interned: each is an array of integer codes into a shared list of categories, with -1 for missing
+    values. `fills` and `fees` are not kept. Indexing with a column name gives that column, indexing with an integer
+    gives a `Bet`, and indexing with a slice, mask or array of indices gives a new frame sharing the categories.
+    """
+
+    FLOAT_COLUMNS = ("amount", "loanAmount", "orderAmount", "probBefore", "probAfter")
+    INT_COLUMNS = ("createdTime",)
+    BOOL_COLUMNS = ("isCancelled", "isFilled")
+    STRING_COLUMNS = ("id", "contractId", "userId", "userUsername", "userName", "userAvatarUrl")
+    COLUMNS = FLOAT_COLUMNS + INT_COLUMNS + BOOL_COLUMNS + STRING_COLUMNS
+
+    def __init__(self, arrays: Mapping[str, NDArray[Any]], categories: Mapping[str, Sequence[str]]):
+        """Wrap already-built columns. Most callers want `from_pages`, `from_dicts` or `from_bets` instead."""
+        self._arrays = dict(arrays)
+        self._categories = dict(categories)
+        self._lookups: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_pages(cls, pages: Iterable[Sequence[JSONDict]]) -> BetFrame:
+        """Build a frame from pages of bet JSON, such as those returned by the `/bets` endpoint."""
+        interned: Dict[str, Dict[str, int]] = {name: {} for name in cls.STRING_COLUMNS}
+        chunks: Dict[str, List[NDArray[Any]]] = {name: [] for name in cls.COLUMNS}
+        for page in pages:
+            for name in cls.FLOAT_COLUMNS:
+                chunks[name].append(np.array([bet.get(name) for bet in page], dtype=np.float64))
+            for name in cls.INT_COLUMNS:
+                chunks[name].append(np.array([bet[name] for bet in page], dtype=np.int64))
+            for name, default in zip(cls.BOOL_COLUMNS, (False, True)):
+                chunks[name].append(np.array([bet.get(name, default) for bet in page], dtype=np.bool_))
+            for name in cls.STRING_COLUMNS:
+                codes = interned[name]
+                chunks[name].append(np.array(
+                    [-1 if bet.get(name) is None else codes.setdefault(bet[name], len(codes))  # type: ignore
+                     for bet in page],
+                    dtype=np.int32,
+                ))
+        arrays = {
+            name: np.concatenate(chunk) if chunk else np.empty(0, dtype=_BET_COLUMN_DTYPES[name])
+            for name, chunk in chunks.items()
+        }
+        return cls(arrays, {name: list(codes) for name, codes in interned.items()})
+
+    @classmethod
+    def from_dicts(cls, bets: Iterable[JSONDict]) -> BetFrame:
+        """Build a frame from bet JSON."""
+        return cls.from_pages([list(bets)])
+
+    @classmethod
+    def from_bets(cls, bets: Iterable[Bet]) -> BetFrame:
+        """Build a frame from `Bet` objects."""
+        return cls.from_dicts(vars(bet) for bet in bets)
+
+    def __len__(self) -> int:
+        return len(self._arrays["createdTime"])
+
+    def __repr__(self) -> str:
+        return "<BetFrame with %d bets>" % len(self)
+
+    @overload
+    def __getitem__(self, key: str) -> NDArray[Any]:
+        ...
+
+    @overload
+    def __getitem__(self, key: int) -> Bet:
+        ...
+
+    @overload
+    def __getitem__(self, key: Union[slice, Sequence[int], NDArray[Any]]) -> BetFrame:
+        ...
+
+    def __getitem__(
+        self, key: Union[str, int, slice, Sequence[int], NDArray[Any]]
+    ) -> Union[NDArray[Any], Bet, BetFrame]:
+        """Get a column by name, a `Bet` by position, or a sub-frame by slice, boolean mask or positions."""
+        if isinstance(key, str):
+            if key in self._categories:
+                return np.array([*self._categories[key], None], dtype=object)[self._arrays[key]]
+            return self._arrays[key]
+        if isinstance(key, (int, np.integer)):
+            return self._bet(int(key))
+        return BetFrame({name: array[key] for name, array in self._arrays.items()}, self._categories)
+
+    def __iter__(self) -> Iterator[Bet]:
+        return (self._bet(i) for i in range(len(self)))
+
+    def _bet(self, i: int) -> Bet:
+        row: Dict[str, Any] = {}
+        for name in self.FLOAT_COLUMNS:
+            value = float(self._arrays[name][i])
+            row[name] = None if value != value else value
+        for name in self.INT_COLUMNS:
+            row[name] = int(self._arrays[name][i])
+        for name in self.BOOL_COLUMNS:
+            row[name] = bool(self._arrays[name][i])
+        for name in self.STRING_COLUMNS:
+            code = self._arrays[name][i]
+            row[name] = None if code < 0 else self._categories[name][code]
+        return Bet(**row)
+
+    def to_bets(self) -> List[Bet]:
+        """Materialize every bet in the frame."""
+        return list(self)
+
+    def codes(self, name: str) -> NDArray[np.int32]:
+        """Get the integer codes of a string column. -1 marks a missing value."""
+        return self._arrays[name]
+
+    def categories(self, name: str) -> Sequence[str]:
+        """Get the distinct values of a string column, indexed by code."""
+        return self._categories[name]
+
+    def isin(self, name: str, values: Iterable[str]) -> NDArray[np.bool_]:
+        """Get a mask of the bets whose string column `name` is one of `values`, without decoding the column."""
+        lookup = self._lookups.get(name)
+        if lookup is None:
+            lookup = self._lookups[name] = {value: code for code, value in enumerate(self._categories[name])}
+        wanted = [lookup[value] for value in values if value in lookup]
+        return np.isin(self._arrays[name], np.array(wanted, dtype=np.int32))
+
+    def sort(self, by: str = "createdTime") -> BetFrame:
+        """Get a copy of the frame, stably sorted by a numeric column."""
+        return self[np.argsort(self._arrays[by], kind="stable")]
+
+
+_BET_COLUMN_DTYPES: Dict[str, type] = {
+    **{name: np.float64 for name in BetFrame.FLOAT_COLUMNS},
+    **{name: np.int64 for name in BetFrame.INT_COLUMNS},
+    **{name: np.bool_ for name in BetFrame.BOOL_COLUMNS},
+    **{name: np.int32 for name in BetFrame.STRING_COLUMNS},
+}
+
+
+class MarketFrame:
+    """A columnar, array-backed table of markets, with derived metrics, for screening the whole market list at once.
+
+    Columns are stored like a `BetFrame`'s: numbers in typed NumPy arrays with NaN for missing values (times that can
+    be missing are kept as floats, which hold them exactly), and strings interned as integer codes. The YES and NO
+    pools of binary markets are the ``poolYes`` and ``poolNo`` columns. These columns are derived when the frame is
+    built, as of `now` (in milliseconds since epoch):
+
+    - ``odds``: the implied odds of YES, ``probability / (1 - probability)``
+    - ``liquidity``: the depth of a Maniswap pool, ``poolYes ** p * poolNo ** (1 - p)``, in mana
+    - ``timeToClose``: milliseconds until ``closeTime``, negative once it's passed
+    - ``volumeRatio``: the last day's volume over the daily average of the last week, above 1 when trading picks up
+    - ``turnover``: the last day's volume over the liquidity
+    - ``isOpen``: whether the market is neither resolved nor closed
+
+    Indexing works as on a `BetFrame`, with integers giving a `LiteMarket`. `filter` and `rank` run queries on the
+    columns without making a `LiteMarket` per row.
+    """
+
+    FLOAT_COLUMNS = (
+        "probability", "p", "totalLiquidity", "volume", "volume24Hours", "volume7Days", "resolutionProbability", "min",
+        "max", "closeTime", "lastUpdatedTime", "resolutionTime",
+    )
+    INT_COLUMNS = ("createdTime",)
+    BOOL_COLUMNS = ("isResolved",)
+    STRING_COLUMNS = ("id", "creatorUsername", "outcomeType", "mechanism", "resolution", "question", "url")
+    POOL_COLUMNS = ("poolYes", "poolNo")
+    DERIVED_COLUMNS = ("odds", "liquidity", "timeToClose", "volumeRatio", "turnover", "isOpen")
+    COLUMNS = FLOAT_COLUMNS + INT_COLUMNS + BOOL_COLUMNS + STRING_COLUMNS + POOL_COLUMNS + DERIVED_COLUMNS
+
+    def __init__(
+        self,
+        arrays: Mapping[str, NDArray[Any]],
+        categories: Mapping[str, Sequence[str]],
+        markets: NDArray[np.object_],
+        now: float,
+    ):
+        """Wrap already-built columns. Most callers want `from_pages`, `from_dicts` or `from_markets` instead."""
+        self._arrays = dict(arrays)
+        self._categories = dict(categories)
+        self._lookups: Dict[str, Dict[str, int]] = {}
+        # The JSON of each market, to build a `LiteMarket` from on demand
+        self._markets = markets
+        self.now = now
+
+    @classmethod
+    def from_pages(cls, pages: Iterable[Sequence[JSONDict]], now: Optional[float] = None) -> MarketFrame:
+        """Build a frame from pages of market JSON, such as those returned by the `/markets` endpoint."""
+        markets = [market for page in pages for market in page]
+        now = now if now is not None else time() * 1000
+        arrays: Dict[str, NDArray[Any]] = {}
+        for name in cls.FLOAT_COLUMNS:
+            arrays[name] = np.array([market.get(name) for market in markets], dtype=np.float64)
+        for name in cls.INT_COLUMNS:
+            arrays[name] = np.array([market[name] for market in markets], dtype=np.int64)
+        for name in cls.BOOL_COLUMNS:
+            arrays[name] = np.array([bool(market.get(name)) for market in markets], dtype=np.bool_)
+        categories: Dict[str, List[str]] = {}
+        for name in cls.STRING_COLUMNS:
+            codes: Dict[str, int] = {}
+            arrays[name] = np.array(
+                [-1 if market.get(name) is None else codes.setdefault(market[name], len(codes))  # type: ignore
+                 for market in markets],
+                dtype=np.int32,
+            )
+            categories[name] = list(codes)
+        pools = [market.get("pool") for market in markets]
+        for name, outcome in zip(cls.POOL_COLUMNS, ("YES", "NO")):
+            arrays[name] = np.array(
+                [pool.get(outcome) if isinstance(pool, dict) else None for pool in pools], dtype=np.float64
+            )
+        arrays.update(_derived_market_columns(arrays, now))
+        envs = np.empty(len(markets), dtype=object)
+        envs[:] = markets
+        return cls(arrays, categories, envs, now)
+
+    @classmethod
+    def from_dicts(cls, markets: Iterable[JSONDict], now: Optional[float] = None) -> MarketFrame:
+        """Build a frame from market JSON."""
+        return cls.from_pages([list(markets)], now)
+
+    @classmethod
+    def from_markets(cls, markets: Iterable[LiteMarket], now: Optional[float] = None) -> MarketFrame:
+        """Build a frame from `LiteMarket` objects."""
+        return cls.from_dicts((vars(market) for market in markets), now)
+
+    def __len__(self) -> int:
+        return len(self._markets)
+
+    def __repr__(self) -> str:
+        return "<MarketFrame with %d markets>" % len(self)
+
+    @overload
+    def __getitem__(self, key: str) -> NDArray[Any]:
+        ...
+
+    @overload
+    def __getitem__(self, key: int) -> LiteMarket:
+        ...
+
+    @overload
+    def __getitem__(self, key: Union[slice, Sequence[int], NDArray[Any]]) -> MarketFrame:
+        ...
+
+    def __getitem__(
+        self, key: Union[str, int, slice, Sequence[int], NDArray[Any]]
+    ) -> Union[NDArray[Any], LiteMarket, MarketFrame]:
+        """Get a column by name, a `LiteMarket` by position, or a sub-frame by slice, boolean mask or positions."""
+        if isinstance(key, str):
+            if key in self._categories:
+                return np.array([*self._categories[key], None], dtype=object)[self._arrays[key]]
+            return self._arrays[key]
+        if isinstance(key, (int, np.integer)):
+            return LiteMarket.from_dict(self._markets[key])
+        arrays = {name: array[key] for name, array in self._arrays.items()}
+        return MarketFrame(arrays, self._categories, self._markets[key], self.now)
+
+    def __iter__(self) -> Iterator[LiteMarket]:
+        return (LiteMarket.from_dict(market) for market in self._markets)
+
+    def to_markets(self) -> List[LiteMarket]:
+        """Materialize every market in the frame."""
+        return list(self)
+
+    def codes(self, name: str) -> NDArray[np.int32]:
+        """Get the integer codes of a string column. -1 marks a missing value."""
+        return self._arrays[name]
+
+    def categories(self, name: str) -> Sequence[str]:
+        """Get the distinct values of a string column, indexed by code."""
+        return self._categories[name]
+
+    def isin(self, name: str, values: Iterable[str]) -> NDArray[np.bool_]:
+        """Get a mask of the markets whose string column `name` is one of `values`, without decoding the column."""
+        lookup = self._lookups.get(name)
+        if lookup is None:
+            lookup = self._lookups[name] = {value: code for code, value in enumerate(self._categories[name])}
+        wanted = [lookup[value] for value in values if value in lookup]
+        return np.isin(self._arrays[name], np.array(wanted, dtype=np.int32))
+
+    def mask(self, **conditions: Any) -> NDArray[np.bool_]:
+        """Get a mask of the markets meeting every condition. See `filter`."""
+        mask = np.ones(len(self), dtype=np.bool_)
+        for name, condition in conditions.items():
+            if isinstance(condition, tuple):
+                low, high = condition
+                column = self._arrays[name]
+                if low is not None:
+                    mask &= column >= low
+                if high is not None:
+                    mask &= column <= high
+            elif name in self._categories:
+                mask &= self.isin(name, [condition] if isinstance(condition, str) else condition)
+            else:
+                mask &= self._arrays[name] == condition
+        return mask
+
+    def filter(self, **conditions: Any) -> MarketFrame:
+        """Get the markets meeting every condition, each given as a column name and what its value must be.
+
+        A ``(low, high)`` tuple keeps values in that inclusive range, with None leaving a side open; missing values
+        are never in range. A string, or a collection of strings, keeps a string column equal to (one of) it. Anything
+        else is compared for equality. For example, ``frame.filter(isOpen=True, outcomeType="BINARY",
+        probability=(0.1, 0.9), liquidity=(100, None))``.
+        """
+        return self[self.mask(**conditions)]
+
+    def rank(self, by: str, n: Optional[int] = None, ascending: bool = False) -> MarketFrame:
+        """Get the markets ordered by a numeric column, largest first unless `ascending`, and only the top `n` if given.
+
+        Markets missing the value come last. Picking the top `n` only partially sorts the column.
+        """
+        keys = self._arrays[by].astype(np.float64)
+        if not ascending:
+            keys = -keys
+        if n is not None and n < len(self):
+            top = np.argpartition(keys, n)[:n] if n > 0 else np.empty(0, dtype=np.intp)
+            return self[top[np.argsort(keys[top], kind="stable")]]
+        return self[np.argsort(keys, kind="stable")]
+
+
+def _derived_market_columns(arrays: Mapping[str, NDArray[Any]], now: float) -> Dict[str, NDArray[Any]]:
+    """Compute the derived columns of a `MarketFrame` from its stored columns."""
+    probability, p = arrays["probability"], arrays["p"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        liquidity = arrays["poolYes"] ** p * arrays["poolNo"] ** (1 - p)
+        week = arrays["volume7Days"]
+        return {
+            "odds": probability / (1 - probability),
+            "liquidity": liquidity,
+            "timeToClose": arrays["closeTime"] - now,
+            "volumeRatio": np.where(week > 0, 7 * arrays["volume24Hours"] / week, np.nan),
+            "turnover": np.where(liquidity > 0, arrays["volume24Hours"] / liquidity, np.nan),
+            "isOpen": ~arrays["isResolved"] & ~(arrays["closeTime"] <= now),
+        }
@@ -0,0 +1,151 @@
+"""Contains an array-backed time series of market probability and volume, rebuilt from bets."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+from .frame import BetFrame
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Iterable, List, Optional, Sequence, Tuple
+
+    from numpy.typing import ArrayLike, NDArray
+
+    from .types import Bet
+
+
+class Resampled(NamedTuple):
+    """A probability history sampled at fixed intervals."""
+
+    # The sample times, in milliseconds since the epoch
+    times: NDArray[np.int64]
+    # The probability as of each sample time
+    probability: NDArray[np.float64]
+    # The mana traded since the previous sample time, buys and sells alike
+    volume: NDArray[np.float64]
+
+
+class ProbabilityHistory:
+    """The probability and traded volume of one or more contracts over time, as sorted arrays.
+
+    Bets are grouped by contract and ordered by time within each contract, so every lookup is a binary search over
+    one contract's bets. Indexing with a contract id gives the history of that contract alone, sharing arrays with
+    this one. Methods on a single-contract history return arrays shaped like their time arguments; on a history of
+    several contracts they add a leading axis, in the order of `contracts`.
+    """
+
+    def __init__(
+        self,
+        contracts: Sequence[str],
+        offsets: NDArray[np.intp],
+        times: NDArray[np.int64],
+        prob_before: NDArray[np.float64],
+        prob_after: NDArray[np.float64],
+        amounts: NDArray[np.float64],
+    ):
+        """Wrap already-sorted columns. Most callers want `from_frame` or `from_bets` instead.
+
+        The bets of `contracts[i]` are those in ``offsets[i]:offsets[i + 1]``.
+        """
+        self.contracts = list(contracts)
+        self._index = {contract: i for i, contract in enumerate(self.contracts)}
+        self._offsets = offsets
+        self.times = times
+        self.prob_before = prob_before
+        self.probability = prob_after
+        self.volume = np.abs(amounts)
+        # Running volume per contract, with a leading 0, so the volume between two bets is a difference
+        self._traded = np.concatenate([
+            np.r_[0.0, np.cumsum(self.volume[start:stop])] for start, stop in zip(offsets[:-1], offsets[1:])
+        ]) if self.contracts else np.zeros(0)
+
+    @classmethod
+    def from_frame(cls, frame: BetFrame) -> ProbabilityHistory:
+        """Build a history from a `BetFrame`, such as one from `ManifoldClient.get_bet_frame`."""
+        codes = frame.codes("contractId")
+        order = np.lexsort((frame["createdTime"], codes))
+        order = order[codes[order] >= 0]
+        codes = codes[order]
+        present, starts = np.unique(codes, return_index=True)
+        categories = frame.categories("contractId")
+        return cls(
+            [categories[code] for code in present],
+            np.r_[starts, len(order)].astype(np.intp),
+            frame["createdTime"][order],
+            frame["probBefore"][order],
+            frame["probAfter"][order],
+            frame["amount"][order],
+        )
+
+    @classmethod
+    def from_bets(cls, bets: Iterable[Bet]) -> ProbabilityHistory:
+        """Build a history from `Bet` objects, such as those from `ManifoldClient.get_bets` or `Market.bets`."""
+        return cls.from_frame(BetFrame.from_bets(bets))
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __repr__(self) -> str:
+        return "<ProbabilityHistory of %d bets on %d contracts>" % (len(self), len(self.contracts))
+
+    def __getitem__(self, contract: str) -> ProbabilityHistory:
+        """Get the history of a single contract."""
+        i = self._index[contract]
+        start, stop = self._offsets[i], self._offsets[i + 1]
+        return ProbabilityHistory(
+            [contract],
+            np.array([0, stop - start], dtype=np.intp),
+            self.times[start:stop],
+            self.prob_before[start:stop],
+            self.probability[start:stop],
+            self.volume[start:stop],
+        )
+
+    def at(self, t: ArrayLike) -> NDArray[np.float64]:
+        """Get the probability as of each time in `t`, i.e. just after the last bet made at or before it.
+
+        Before a contract's first bet this is the probability that bet started from; a contract with no bets has
+        no known probability, so gives NaN.
+        """
+        t = np.asarray(t, dtype=np.int64)
+        out = np.empty((len(self.contracts),) + t.shape)
+        for i, (start, stop) in enumerate(self._segments()):
+            if start == stop:
+                out[i] = np.nan
+                continue
+            before = np.searchsorted(self.times[start:stop], t, side="right")
+            out[i] = np.where(before > 0, self.probability[start + before - 1], self.prob_before[start])
+        return self._squeeze(out)
+
+    def traded(self, t: ArrayLike) -> NDArray[np.float64]:
+        """Get the total volume traded at or before each time in `t`."""
+        t = np.asarray(t, dtype=np.int64)
+        out = np.empty((len(self.contracts),) + t.shape)
+        for i, (start, stop) in enumerate(self._segments()):
+            # Each contract's running volume starts at its offset plus its index, for the leading 0
+            out[i] = self._traded[start + i + np.searchsorted(self.times[start:stop], t, side="right")]
+        return self._squeeze(out)
+
+    def resample(self, interval: int, start: Optional[int] = None, end: Optional[int] = None) -> Resampled:
+        """Sample the history every `interval` milliseconds from `start` until at least `end`.
+
+        These default to the times of the first and last bets. Each sample has the probability as of its time, and
+        the volume traded since the sample before it (or in the `interval` leading up to it, for the first).
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        if not len(self) and (start is None or end is None):
+            raise ValueError("Can't pick a time range for a history with no bets; please give start and end")
+        start = int(self.times.min()) if start is None else start
+        end = int(self.times.max()) if end is None else end
+        times = np.arange(start, end + interval, interval, dtype=np.int64)
+        traded = self.traded(np.r_[start - interval, times])
+        return Resampled(times, self.at(times), np.diff(traded, axis=-1))
+
+    def _segments(self) -> List[Tuple[int, int]]:
+        return list(zip(self._offsets[:-1].tolist(), self._offsets[1:].tolist()))
+
+    def _squeeze(self, out: NDArray[np.float64]) -> NDArray[np.float64]:
+        return out[0] if len(self.contracts) == 1 else out
@@ -0,0 +1,165 @@
+"""Contains the per-request instrumentation that a `Transport` can report to, and an in-memory metrics recorder."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from math import ceil, log
+from threading import Lock
+from typing import TYPE_CHECKING, Dict
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Callable, List, Optional, Tuple
+
+    Instrument = Callable[["RequestRecord"], Any]
+
+# Path segments that name an action rather than an object, and so are kept in endpoint names
+_LITERAL_SEGMENTS = frozenset({"by-id", "resolve", "sell", "close", "add-liquidity", "cancel"})
+
+
+@dataclass
+class RequestRecord:
+    """What happened during one request to the API."""
+
+    method: str
+    # The path requested, and the same with ids, slugs and handles replaced by ``{id}``, such as ``/market/{id}``
+    path: str
+    endpoint: str
+    # None if no response was received, in which case `error` says why
+    status: Optional[int]
+    # Seconds from sending the request to having the whole body (or just the headers, for streamed responses)
+    latency: float
+    # The size of the response body, if known
+    bytes: Optional[int]
+    # How many times the request was sent again, by the transport's retries or its rate limiter
+    retries: int = 0
+    # Seconds spent turning the body into objects, if the client did so as part of the request
+    decode_time: Optional[float] = None
+    error: Optional[str] = None
+
+
+def endpoint_of(path: str) -> str:
+    """Get the endpoint a path belongs to, such as ``/market/{id}/resolve`` for ``/market/abc/resolve``."""
+    head, *rest = path.lstrip("/").split("/")
+    return "/" + "/".join([head, *(s if s in _LITERAL_SEGMENTS else "{id}" for s in rest)])
+
+
+class Histogram:
+    """Counts of values in buckets that grow geometrically, for percentiles to within a relative `error`.
+
+    Adding a value is O(1) and memory grows only with the log of the range of values seen.
+    """
+
+    def __init__(self, error: float = 0.05, smallest: float = 1e-6):
+        """Initialize an empty histogram. Values at or below `smallest` share the first bucket."""
+        self.growth = (1 + error) / (1 - error)
+        self.smallest = smallest
+        self._scale = 1 / log(self.growth)
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def add(self, value: float) -> None:
+        """Count a value."""
+        index = 0 if value <= self.smallest else 1 + int(log(value / self.smallest) * self._scale)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        """Estimate the value below which `q` percent of values fall. NaN if nothing has been counted."""
+        if not self.count:
+            return float("nan")
+        rank = max(1, ceil(self.count * q / 100))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                break
+        # The geometric middle of the bucket, which is within `error` of every value in it
+        estimate = self.smallest * self.growth ** (index - 0.5) if index else self.smallest
+        return min(max(estimate, self.min), self.max)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else float("nan")
+
+    def summary(self) -> Dict[str, float]:
+        """Get the count, mean, maximum and 50th, 90th and 99th percentiles."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "max": self.max if self.count else float("nan"),
+        }
+
+
+class EndpointMetrics:
+    """Histograms and counters for the requests to one endpoint with one method."""
+
+    def __init__(self) -> None:
+        """Initialize empty metrics."""
+        self.latency = Histogram()
+        self.bytes = Histogram(smallest=1)
+        self.decode_time = Histogram()
+        self.statuses: Dict[Optional[int], int] = {}
+        self.retries = 0
+
+    def add(self, record: RequestRecord) -> None:
+        self.latency.add(record.latency)
+        if record.bytes is not None:
+            self.bytes.add(record.bytes)
+        if record.decode_time is not None:
+            self.decode_time.add(record.decode_time)
+        self.statuses[record.status] = self.statuses.get(record.status, 0) + 1
+        self.retries += record.retries
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "requests": self.latency.count,
+            "statuses": dict(self.statuses),
+            "retries": self.retries,
+            "latency": self.latency.summary(),
+            "bytes": self.bytes.summary(),
+            "decode_time": self.decode_time.summary(),
+        }
+
+
+class MetricsRecorder:
+    """An instrument that keeps in-memory histograms of latency, size and decode time for each endpoint.
+
+    Pass it in a `Transport`'s `instruments`, then read `summary()` or `metrics` whenever needed. Thread-safe.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a recorder with nothing recorded."""
+        self.metrics: Dict[Tuple[str, str], EndpointMetrics] = {}
+        self._lock = Lock()
+
+    def __call__(self, record: RequestRecord) -> None:
+        with self._lock:
+            metrics = self.metrics.get((record.method, record.endpoint))
+            if metrics is None:
+                metrics = self.metrics[(record.method, record.endpoint)] = EndpointMetrics()
+            metrics.add(record)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Get the metrics of each endpoint, keyed like ``"GET /market/{id}"``."""
+        with self._lock:
+            return {"%s %s" % key: metrics.summary() for key, metrics in sorted(self.metrics.items())}
+
+    def reset(self) -> None:
+        """Forget everything recorded so far."""
+        with self._lock:
+            self.metrics.clear()
+
+
+def notify(instruments: List[Instrument], record: RequestRecord) -> None:
+    """Pass a record to every instrument."""
+    for instrument in instruments:
+        instrument(record)
@@ -2,25 +2,131 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+from time import sleep, time
 from typing import TYPE_CHECKING, Any, Dict, cast, overload
 
 import requests
 
-from .types import Bet, Group, JSONDict, LiteMarket, LiteUser, Market
+from .cache import ResponseCache
+from .decoding import decode, decode_list
+from .transport import BASE_URI, Transport, default_transport  # noqa: F401
+from .types import Bet, BetResult, Group, JSONDict, LiteMarket, LiteUser, Market, MarketMetadata
+from .utils.fanout import bounded_map
+from .utils.jsonstream import iter_json_array
 from .utils.math import number_to_prob_cpmm1
 
 if TYPE_CHECKING:  # pragma: no cover
-    from typing import Iterable, List, Literal, Optional, Sequence, Union
+    from concurrent.futures import Future
+    from typing import (
+        Callable, Dict, Generator, Iterable, Iterator, List, Literal, Optional, Sequence, Tuple, Type, TypeVar, Union
+    )
 
-BASE_URI = "https://manifold.markets/api/v0"
+    from .frame import BetFrame, MarketFrame
+    from .store import ManifoldStore
+    from .types import DictDeserializable
+
+    D = TypeVar("D", bound=DictDeserializable)
+    T = TypeVar("T")
+
+# The most items the API will return from a single page of /markets or /bets
+MAX_PAGE_SIZE = 1000
+
+# How hard to look for a market whose creation failed with a server error, in case it was created anyway: this many
+# polls of the newest markets, sleeping RECOVERY_DELAY seconds (doubling each time) in between, walking back pages of
+# RECOVERY_PAGE_SIZE until reaching markets created before the attempt (less RECOVERY_CLOCK_SKEW milliseconds)
+RECOVERY_ATTEMPTS = 3
+RECOVERY_DELAY = 0.5
+RECOVERY_PAGE_SIZE = 20
+RECOVERY_CLOCK_SKEW = 60_000
+
+# How many bytes of a streamed response body to read from the socket at a time
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# How many markets' immutable attributes (see `MarketMetadata`) each client remembers
+METADATA_CACHE_SIZE = 4096
 
 
 class ManifoldClient:
     """A client for interacting with the website manifold.markets."""
 
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize a Manifold client, optionally with an API key."""
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        transport: Optional[Transport] = None,
+        cache: Optional[ResponseCache] = None,
+        store: Optional[ManifoldStore] = None,
+        max_staleness: float = 300.0,
+    ):
+        """Initialize a Manifold client, optionally with an API key.
+
+        Clients share a pooled transport unless given their own. Given a `ResponseCache`, lookups of single markets,
+        users and groups are served from it while fresh, and bets, comments and other writes through this client
+        drop its cached copies of the market they touch. Given a `ManifoldStore`, market and bet listings, lite
+        market lookups, users and groups are answered from the local mirror whenever the relevant part of it was
+        synced within the last `max_staleness` seconds.
+        """
         self.api_key = api_key
+        self.transport = transport if transport is not None else default_transport()
+        self.cache = cache
+        self.store = store
+        self.max_staleness = max_staleness
+        self._username: Optional[str] = None
+        self._metadata = ResponseCache(maxsize=METADATA_CACHE_SIZE, default_ttl=float("inf"))
+        # The cached `/slug/...` path of each market looked up by slug or URL, so writes to it can drop that too
+        self._slug_paths: Dict[str, str] = {}
+
+    def _get(self, path: str, params: Optional[JSONDict] = None) -> requests.Response:
+        return self.transport.get(path, params=params)
+
+    def _fetch(self, path: str, decode: Callable[[requests.Response], T], params: Optional[JSONDict] = None) -> T:
+        """GET a path and decode the response, so that instruments see the decoding as part of the request."""
+        return self.transport.fetch("GET", path, decode, params=params)
+
+    def _get_streamed(self, path: str, params: JSONDict) -> Iterator[JSONDict]:
+        """Yield the items of a list endpoint as each one is parsed off the wire, without buffering the body."""
+        with self.transport.get(path, params=params, stream=True) as response:
+            response.raise_for_status()
+            yield from iter_json_array(response.iter_content(STREAM_CHUNK_SIZE))
+
+    def _get_model(self, endpoint: str, path: str, cls: Type[D]) -> D:
+        """Get one object from a read endpoint, going through the cache if there is one, and decode it into `cls`."""
+        if self.cache is not None:
+            return cls.from_dict(self._get_cached(endpoint, path))
+        return self._fetch(path, lambda response: decode(response.content, cls))
+
+    def _get_cached(self, endpoint: str, path: str) -> Any:
+        """Get the decoded body of a read endpoint, going through the cache if there is one."""
+        if self.cache is None:
+            return self._fetch(path, _json)
+        entry, fresh = self.cache.lookup(endpoint, path)
+        if entry is not None and fresh:
+            return entry.value
+        headers = entry.conditional_headers() if entry is not None else None
+        response, value = self.transport.fetch(
+            "GET", path, lambda response: (response, None if response.status_code == 304 else response.json()),
+            headers=headers,
+        )
+        if entry is not None and response.status_code == 304:
+            self.cache.revalidated(endpoint, entry)
+            return entry.value
+        if response.ok:
+            self.cache.store(
+                endpoint, path, value, response.headers.get("ETag"), response.headers.get("Last-Modified")
+            )
+            if endpoint == "slug":
+                self._slug_paths[value["id"]] = path
+        return value
+
+    def _invalidate_market(self, market_id: str) -> None:
+        if self.cache is not None:
+            self.cache.invalidate("market", "/market/" + market_id)
+            slug_path = self._slug_paths.pop(market_id, None)
+            if slug_path is not None:
+                self.cache.invalidate("slug", slug_path)
+
+    def _post(self, path: str, json: JSONDict) -> requests.Response:
+        return self.transport.post(path, json=json, headers=self._auth_headers())
 
     def list_markets(
         self, limit: Optional[int] = None, before: Optional[str] = None
@@ -29,13 +135,52 @@ class ManifoldClient:
         return list(self.get_markets(limit, before))
 
     def get_markets(
-        self, limit: Optional[int] = None, before: Optional[str] = None
+        self, limit: Optional[int] = None, before: Optional[str] = None, stream: bool = False
     ) -> Iterable[LiteMarket]:
-        """Iterate over all markets."""
-        response = requests.get(
-            url=BASE_URI + "/markets", params={"limit": limit, "before": before}
-        )
-        return (LiteMarket.from_dict(market) for market in response.json())
+        """Iterate over all markets.
+
+        With `stream` set, markets are decoded and yielded as the response arrives, so only one is held in memory at
+        a time; the request is then sent when iteration starts.
+        """
+        if self.store is not None:
+            markets = self.store.fresh_markets(self.max_staleness, limit, before)
+            if markets is not None:
+                return iter(markets)
+        params: JSONDict = {"limit": limit, "before": before}
+        if stream:
+            return (LiteMarket.from_dict(market) for market in self._get_streamed("/markets", params))
+        return iter(self._fetch("/markets", lambda response: decode_list(response.content, LiteMarket), params))
+
+    def iter_markets(
+        self,
+        before: Optional[str] = None,
+        max_items: Optional[int] = None,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: bool = True,
+    ) -> Iterator[LiteMarket]:
+        """Iterate over every market, following the `before` cursor from page to page.
+
+        Stops after `max_items` markets, if given. With `prefetch` set, the next page is requested in the background
+        while the current one is being consumed.
+        """
+        pages = self._paginate("/markets", {}, before, max_items, page_size, prefetch)
+        return (LiteMarket.from_dict(market) for page in pages for market in page)
+
+    def get_market_frame(
+        self,
+        before: Optional[str] = None,
+        max_items: Optional[int] = None,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: bool = True,
+        now: Optional[float] = None,
+    ) -> MarketFrame:
+        """Fetch every market into a columnar `MarketFrame`, with its derived metrics computed as of `now`.
+
+        Takes the same arguments as `iter_markets`. No `LiteMarket` is made unless one is asked of the frame.
+        """
+        from .frame import MarketFrame  # needs NumPy, so only imported when used
+
+        return MarketFrame.from_pages(self._paginate("/markets", {}, before, max_items, page_size, prefetch), now)
 
     def list_groups(self, availableToUserId: Optional[str] = None) -> List[Group]:
         """List all markets."""
@@ -43,20 +188,21 @@ class ManifoldClient:
 
     def get_groups(self, availableToUserId: Optional[str] = None) -> Iterable[Group]:
         """Iterate over all markets."""
-        response = requests.get(
-            url=BASE_URI + "/groups", params={"availableToUserId": availableToUserId}
-        )
-        return (Group.from_dict(group) for group in response.json())
+        params: JSONDict = {"availableToUserId": availableToUserId}
+        return iter(self._fetch("/groups", lambda response: decode_list(response.content, Group), params))
 
     def get_group(self, slug: Optional[str] = None, id_: Optional[str] = None) -> Group:
         """Iterate over all markets."""
+        if self.store is not None:
+            group = self.store.group(slug, id_, max_age=self.max_staleness)
+            if group is not None:
+                return group
         if id_ is not None:
-            response = requests.get(url=BASE_URI + "/group/by-id/" + id_)
+            return self._get_model("group", "/group/by-id/" + id_, Group)
         elif slug is not None:
-            response = requests.get(url=BASE_URI + "/group/" + slug)
+            return self._get_model("group", "/group/" + slug, Group)
         else:
             raise ValueError("Requires one or more of (slug, id_)")
-        return Group.from_dict(response.json())
 
     def list_bets(
         self,
@@ -74,48 +220,199 @@ class ManifoldClient:
         before: Optional[str] = None,
         username: Optional[str] = None,
         market: Optional[str] = None,
+        stream: bool = False,
     ) -> Iterable[Bet]:
-        """Iterate over all bets."""
-        response = requests.get(
-            url=BASE_URI + "/bets", params={"limit": limit, "before": before, "username": username, "market": market}
-        )
-        return (Bet.from_dict(market) for market in response.json())
+        """Iterate over all bets.
 
-    def get_market_by_id(self, market_id: str) -> Market:
-        """Get a market by id."""
-        return Market.from_dict(self._get_market_by_id_raw(market_id))
+        With `stream` set, bets are decoded and yielded as the response arrives, so only one is held in memory at a
+        time; the request is then sent when iteration starts.
+        """
+        if self.store is not None:
+            bets = self.store.fresh_bets(self.max_staleness, limit, before, username, market)
+            if bets is not None:
+                return iter(bets)
+        params: JSONDict = {"limit": limit, "before": before, "username": username, "market": market}
+        if stream:
+            return (Bet.from_dict(bet) for bet in self._get_streamed("/bets", params))
+        return iter(self._fetch("/bets", lambda response: decode_list(response.content, Bet), params))
+
+    def iter_bets(
+        self,
+        before: Optional[str] = None,
+        username: Optional[str] = None,
+        market: Optional[str] = None,
+        max_items: Optional[int] = None,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: bool = True,
+    ) -> Iterator[Bet]:
+        """Iterate over every bet, following the `before` cursor from page to page.
+
+        Stops after `max_items` bets, if given. With `prefetch` set, the next page is requested in the background
+        while the current one is being consumed.
+        """
+        params: JSONDict = {"username": username, "market": market}
+        pages = self._paginate("/bets", params, before, max_items, page_size, prefetch)
+        return (Bet.from_dict(bet) for page in pages for bet in page)
+
+    def get_bet_frame(
+        self,
+        before: Optional[str] = None,
+        username: Optional[str] = None,
+        market: Optional[str] = None,
+        max_items: Optional[int] = None,
+        page_size: int = MAX_PAGE_SIZE,
+        prefetch: bool = True,
+    ) -> BetFrame:
+        """Fetch every bet into a columnar `BetFrame`, without making a `Bet` object for each.
+
+        Takes the same arguments as `iter_bets`.
+        """
+        from .frame import BetFrame  # needs NumPy, so only imported when used
+
+        params: JSONDict = {"username": username, "market": market}
+        return BetFrame.from_pages(self._paginate("/bets", params, before, max_items, page_size, prefetch))
+
+    def _paginate(
+        self,
+        path: str,
+        params: JSONDict,
+        before: Optional[str],
+        max_items: Optional[int],
+        page_size: int,
+        prefetch: bool,
+    ) -> Generator[List[JSONDict], None, None]:
+        """Yield raw pages from a list endpoint until it runs dry or `max_items` have been seen."""
+        def fetch(cursor: Optional[str], limit: int) -> List[JSONDict]:
+            page = self._fetch(path, _checked_json, {**params, "limit": limit, "before": cursor})
+            return cast("List[JSONDict]", page)
+
+        remaining = max_items if max_items is not None else float("inf")
+        limit = int(min(page_size, remaining))
+        if limit <= 0:
+            return
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        pending: Optional[Future[List[JSONDict]]] = None
+        try:
+            page = fetch(before, limit)
+            while True:
+                remaining -= len(page)
+                more = len(page) == limit and remaining > 0
+                if more:
+                    cursor, limit = cast(str, page[-1]["id"]), int(min(page_size, remaining))
+                    if executor is not None:
+                        pending = executor.submit(fetch, cursor, limit)
+                yield page
+                if not more:
+                    return
+                page = pending.result() if pending is not None else fetch(cursor, limit)
+        finally:
+            if pending is not None:
+                pending.cancel()
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    @overload
+    def get_market_by_id(self, market_id: str, lite: Literal[False] = False) -> Market:
+        ...
+
+    @overload
+    def get_market_by_id(self, market_id: str, lite: Literal[True]) -> LiteMarket:
+        ...
+
+    def get_market_by_id(self, market_id: str, lite: bool = False) -> LiteMarket:
+        """Get a market by id.
+
+        With `lite` set, the market's bets and comments are never decoded, and a `LiteMarket` is returned.
+        """
+        if lite and self.store is not None:
+            market = self.store.market(id_=market_id, max_age=self.max_staleness)
+            if market is not None:
+                return market
+        return self._get_model("market", "/market/" + market_id, LiteMarket if lite else Market)
 
     def _get_market_by_id_raw(self, market_id: str) -> JSONDict:
         """Get a market by id."""
-        response = requests.get(url=BASE_URI + "/market/" + market_id)
-        return cast(JSONDict, response.json())
+        return cast(JSONDict, self._get_cached("market", "/market/" + market_id))
 
-    def get_market_by_slug(self, slug: str) -> Market:
-        """Get a market by slug."""
-        return Market.from_dict(self._get_market_by_slug_raw(slug))
+    def get_market_metadata(self, market_id: str) -> MarketMetadata:
+        """Get the attributes of a market that never change, fetching them at most once per market.
+
+        A copy of the market in the client's store is used however old it is, since these attributes can't go stale.
+        """
+        entry, _ = self._metadata.lookup("metadata", market_id)
+        if entry is not None:
+            return cast(MarketMetadata, entry.value)
+        market = self.store.market(id_=market_id) if self.store is not None else None
+        if market is not None:
+            metadata = MarketMetadata.from_market(market)
+        else:
+            metadata = self._get_model("market", "/market/" + market_id, MarketMetadata)
+        self._metadata.store("metadata", market_id, metadata)
+        return metadata
+
+    @overload
+    def get_market_by_slug(self, slug: str, lite: Literal[False] = False) -> Market:
+        ...
+
+    @overload
+    def get_market_by_slug(self, slug: str, lite: Literal[True]) -> LiteMarket:
+        ...
+
+    def get_market_by_slug(self, slug: str, lite: bool = False) -> LiteMarket:
+        """Get a market by slug.
+
+        With `lite` set, the market's bets and comments are never decoded, and a `LiteMarket` is returned.
+        """
+        if lite and self.store is not None:
+            market = self.store.market(slug=slug, max_age=self.max_staleness)
+            if market is not None:
+                return market
+        return self._get_model("slug", "/slug/" + slug, LiteMarket if lite else Market)
 
     def _get_market_by_slug_raw(self, slug: str) -> JSONDict:
         """Get a market by slug."""
-        response = requests.get(url=BASE_URI + "/slug/" + slug)
-        return cast(JSONDict, response.json())
+        return cast(JSONDict, self._get_cached("slug", "/slug/" + slug))
 
-    def get_market_by_url(self, url: str) -> Market:
-        """Get a market by url."""
-        return Market.from_dict(self._get_market_by_url_raw(url))
+    @overload
+    def get_market_by_url(self, url: str, lite: Literal[False] = False) -> Market:
+        ...
+
+    @overload
+    def get_market_by_url(self, url: str, lite: Literal[True]) -> LiteMarket:
+        ...
+
+    def get_market_by_url(self, url: str, lite: bool = False) -> LiteMarket:
+        """Get a market by url.
+
+        With `lite` set, the market's bets and comments are never decoded, and a `LiteMarket` is returned.
+        """
+        return self._get_model("slug", "/slug/" + _slug_from_url(url), LiteMarket if lite else Market)
 
     def _get_market_by_url_raw(self, url: str) -> JSONDict:
         """Get a market by url."""
-        slug = url.split("/")[-1].split("#")[0]
-        response = requests.get(url=BASE_URI + "/slug/" + slug)
-        return cast(JSONDict, response.json())
+        return self._get_market_by_slug_raw(_slug_from_url(url))
 
     def get_user(self, handle: str) -> LiteUser:
         """Get a user by handle."""
-        return LiteUser.from_dict(self._get_user_raw(handle))
+        if self.store is not None:
+            user = self.store.user(handle, max_age=self.max_staleness)
+            if user is not None:
+                return user
+        return self._get_model("user", "/user/" + handle, LiteUser)
 
     def _get_user_raw(self, handle: str) -> JSONDict:
-        response = requests.get(url=BASE_URI + "/user/" + handle)
-        return cast(JSONDict, response.json())
+        return cast(JSONDict, self._get_cached("user", "/user/" + handle))
+
+    def _own_username(self) -> Optional[str]:
+        """Get the username the API key belongs to, or None if it can't be looked up right now."""
+        if self._username is None:
+            try:
+                response = self.transport.get("/me", headers=self._auth_headers())
+            except requests.RequestException:
+                return None
+            if response.ok:
+                self._username = cast(str, response.json()["username"])
+        return self._username
 
     def _auth_headers(self) -> dict[str, str]:
         if self.api_key:
@@ -129,13 +426,8 @@ class ManifoldClient:
             marketId = market.id
         else:
             marketId = market
-        response = requests.post(
-            url=BASE_URI + "/market/" + marketId + "/resolve",
-            json={
-                "outcome": "CANCEL",
-            },
-            headers=self._auth_headers(),
-        )
+        response = self._post("/market/" + marketId + "/resolve", json={"outcome": "CANCEL"})
+        self._invalidate_market(marketId)
         response.raise_for_status()
         return response
 
@@ -144,21 +436,41 @@ class ManifoldClient:
 
         Returns the ID of the created bet.
         """
-        json = {
-            "amount": int(amount),
-            "contractId": contractId,
-            "outcome": outcome,
-        }
-        if limitProb is not None:
-            json['limitProb'] = limitProb
-        response = requests.post(
-            url=BASE_URI + "/bet",
-            json=json,
-            headers=self._auth_headers(),
-        )
+        response = self._post("/bet", json=_bet_payload(contractId, amount, outcome, limitProb))
+        self._invalidate_market(contractId)
         response.raise_for_status()
         return cast(str, response.json()["betId"])
 
+    def create_bets(
+        self, bets: Iterable[Sequence[Any]], max_in_flight: int = 8, ordered_per_market: bool = False
+    ) -> List[BetResult]:
+        """Place many bets at once, each given as the `(contractId, amount, outcome[, limitProb])` for `create_bet`.
+
+        Up to `max_in_flight` bets are placed at the same time. With `ordered_per_market` set, the bets on any one
+        market are instead placed one after another in the order given, while different markets still proceed in
+        parallel. A failed bet doesn't stop the others: the results line up with `bets`, each holding either the id
+        of the new bet or the error that stopped it.
+        """
+        orders = [tuple(order) for order in bets]
+
+        def place(order: Tuple[Any, ...]) -> BetResult:
+            try:
+                return BetResult(*order, betId=self.create_bet(*order))
+            except Exception as e:
+                return BetResult(*order, error=e)
+
+        if not ordered_per_market:
+            return list(bounded_map(place, orders, max_in_flight))
+
+        def place_in_order(indices: List[int]) -> List[Tuple[int, BetResult]]:
+            return [(i, place(orders[i])) for i in indices]
+
+        results: List[Optional[BetResult]] = [None] * len(orders)
+        for placed in bounded_map(place_in_order, _indices_by_market(orders), max_in_flight, ordered=False):
+            for i, result in placed:
+                results[i] = result
+        return cast("List[BetResult]", results)
+
     def create_free_response_market(
         self,
         question: str,
@@ -236,117 +548,64 @@ class ManifoldClient:
         answers: Optional[Sequence[str]] = None,
     ) -> LiteMarket:
         """Create a market."""
-        data = {
-            "outcomeType": outcomeType,
-            "question": question,
-            "description": description,
-            "closeTime": closeTime,
-            "tags": tags or [],
-        }
-        if outcomeType == "BINARY":
-            data["initialProb"] = initialProb
-        elif outcomeType == "FREE_RESPONSE":
-            pass
-        elif outcomeType == "PSEUDO_NUMERIC":
-            data["min"] = minValue
-            data["max"] = maxValue
-            data["isLogScale"] = isLogScale
-            if initialValue is None:
-                raise ValueError("Needs initial value")
-            data["initialValue"] = initialValue
-        elif outcomeType == "MULTIPLE_CHOICE":
-            data["answers"] = answers
-        else:
-            raise Exception(
-                "Invalid outcome type. Outcome should be one of: BINARY, FREE_RESPONSE, PSEUDO_NUMERIC, MULTIPLE_CHOICE"
-            )
-
-        response = requests.post(
-            url=BASE_URI + "/market",
-            json=data,
-            headers=self._auth_headers(),
+        data = _market_payload(
+            outcomeType,
+            question,
+            description,
+            closeTime,
+            tags,
+            initialProb=initialProb,
+            initialValue=initialValue,
+            minValue=minValue,
+            maxValue=maxValue,
+            isLogScale=isLogScale,
+            answers=answers,
         )
-        if response.status_code in range(400, 500):
-            response.raise_for_status()
-        elif response.status_code >= 500:
+        started = int(time() * 1000)
+        response = self._post("/market", json=data)
+        if response.status_code >= 500:
             # Sometimes when there is a serverside error the market is still posted
-            # We want to make sure we still return it in those instances
-            for mkt in self.list_markets():
-                if (question, outcomeType, closeTime) == (mkt.question, mkt.outcomeType, mkt.closeTime):
-                    return mkt
+            # We want to make sure we still return it in those instances, without re-posting a duplicate
+            market = self._recover_created_market(outcomeType, question, closeTime, started)
+            if market is not None:
+                return market
+        response.raise_for_status()
         return LiteMarket.from_dict(response.json())
 
+    def _recover_created_market(
+        self, outcomeType: str, question: str, closeTime: int, started: int
+    ) -> Optional[LiteMarket]:
+        """Look for a market this client just tried to create among the newest ones, polling a few times."""
+        creator = self._own_username()
+        for attempt in range(RECOVERY_ATTEMPTS):
+            if attempt:
+                sleep(RECOVERY_DELAY * 2 ** (attempt - 1))
+            pages = self._paginate("/markets", {}, None, None, RECOVERY_PAGE_SIZE, prefetch=False)
+            try:
+                for page in pages:
+                    for env in page:
+                        if _is_created_market(env, outcomeType, question, closeTime, creator):
+                            return LiteMarket.from_dict(env)
+                    if not page or cast(int, page[-1]["createdTime"]) < started - RECOVERY_CLOCK_SKEW:
+                        break
+            except requests.RequestException:
+                pass
+            finally:
+                pages.close()
+        return None
+
     def resolve_market(self, market: Union[LiteMarket, str], *args: Any, **kwargs: Any) -> requests.Response:
         """Resolve a market, with different inputs depending on its type."""
-        if not isinstance(market, LiteMarket):
-            market = self.get_market_by_id(market)
-        if market.outcomeType == "BINARY":
-            return self._resolve_binary_market(market, *args, **kwargs)
-        elif market.outcomeType == "FREE_RESPONSE":
-            return self._resolve_free_response_market(market, *args, **kwargs)
-        elif market.outcomeType == "MULTIPLE_CHOICE":
-            return self._resolve_multiple_choice_market(market, *args, **kwargs)
-        elif market.outcomeType == "PSEUDO_NUMERIC":
-            return self._resolve_pseudo_numeric_market(market, *args, **kwargs)
-        else:  # pragma: no cover
-            raise NotImplementedError()
-
-    def _resolve_binary_market(self, market: LiteMarket, probabilityInt: float) -> requests.Response:
-        if probabilityInt == 100 or probabilityInt is True:
-            json: Dict[str, Union[float, str]] = {"outcome": "YES"}
-        elif probabilityInt == 0 or probabilityInt is False:
-            json = {"outcome": "NO"}
-        else:
-            json = {"outcome": "MKT", "probabilityInt": probabilityInt}
-
-        response = requests.post(
-            url=BASE_URI + "/market/" + market.id + "/resolve",
-            json=json,
-            headers=self._auth_headers(),
-        )
-        response.raise_for_status()
-        return response
-
-    def _resolve_pseudo_numeric_market(
-        self, market: LiteMarket, resolutionValue: float
-    ) -> requests.Response:
-        assert market.min is not None
-        assert market.max is not None
-        prob = 100 * number_to_prob_cpmm1(resolutionValue, market.min, market.max, bool(market.isLogScale))
-        json = {"outcome": "MKT", "value": resolutionValue, "probabilityInt": prob}
-        response = requests.post(
-            url=BASE_URI + "/market/" + market.id + "/resolve",
-            json=json,
-            headers=self._auth_headers(),
-        )
-        response.raise_for_status()
-        return response
-
-    def _resolve_free_response_market(self, market: LiteMarket, weights: Dict[int, float]) -> requests.Response:
-        if len(weights) == 1:
-            json: JSONDict = {"outcome": next(iter(weights))}
+        if isinstance(market, LiteMarket):
+            metadata = MarketMetadata.from_market(market)
         else:
-            total = sum(weights.values())
-            json = {
-                "outcome": "MKT",
-                "resolutions": [
-                    {"answer": index, "pct": 100 * weight / total}
-                    for index, weight in weights.items()
-                ]
-            }
-        response = requests.post(
-            url=BASE_URI + "/market/" + market.id + "/resolve",
-            json=json,
-            headers=self._auth_headers(),
-        )
+            metadata = self.get_market_metadata(market)
+        json = _resolution_payload(metadata, *args, **kwargs)
+        response = self._post("/market/" + metadata.id + "/resolve", json=json)
+        self._invalidate_market(metadata.id)
         response.raise_for_status()
         return response
 
-    _resolve_multiple_choice_market = _resolve_free_response_market
-
-    def _resolve_numeric_market(self, market: LiteMarket, number: float) -> requests.Response:
-        raise NotImplementedError("TODO: I suspect the relevant docs are out of date")
-
     @overload
     def create_comment(
         self, market: LiteMarket | str, comment: str, mode: Literal['markdown', 'html']
@@ -363,21 +622,164 @@ class ManifoldClient:
         self, market: LiteMarket | str, comment: str | JSONDict, mode: str
     ) -> requests.Response:
         """Create a comment on a given market, using Markdown, HTML, or TipTap formatting."""
-        if isinstance(market, LiteMarket):
-            market = market.id
-        data: JSONDict = {'contractId': market}
-        if mode == 'tiptap':
-            data['content'] = comment
-        elif mode == 'html':
-            data['html'] = comment
-        elif mode == 'markdown':
-            data['markdown'] = comment
-        else:
-            raise ValueError("Invalid format mode")
-        response = requests.post(
-            url=BASE_URI + "/comment",
-            json=data,
-            headers=self._auth_headers(),
-        )
+        data = _comment_payload(market, comment, mode)
+        response = self._post("/comment", json=data)
+        self._invalidate_market(cast(str, data["contractId"]))
         response.raise_for_status()
         return response
+
+
+def _json(response: requests.Response) -> Any:
+    return response.json()
+
+
+def _checked_json(response: requests.Response) -> Any:
+    response.raise_for_status()
+    return response.json()
+
+
+def _slug_from_url(url: str) -> str:
+    return url.split("/")[-1].split("#")[0]
+
+
+def _market_from_dict(env: JSONDict, lite: bool) -> LiteMarket:
+    """Deserialize a full market, or just its `LiteMarket` fields."""
+    return LiteMarket.from_dict(env) if lite else Market.from_dict(env)
+
+
+def _is_created_market(
+    env: JSONDict, outcomeType: str, question: str, closeTime: int, creator: Optional[str]
+) -> bool:
+    if creator is not None and env.get("creatorUsername") != creator:
+        return False
+    return (env.get("question"), env.get("outcomeType"), env.get("closeTime")) == (question, outcomeType, closeTime)
+
+
+def _indices_by_market(orders: Sequence[Sequence[Any]]) -> List[List[int]]:
+    """Group the positions of bet orders by the market they're on, keeping each market's bets in order."""
+    groups: Dict[str, List[int]] = {}
+    for i, order in enumerate(orders):
+        groups.setdefault(order[0], []).append(i)
+    return list(groups.values())
+
+
+def _bet_payload(contractId: str, amount: int, outcome: str, limitProb: Optional[float] = None) -> JSONDict:
+    """Build the request body for placing a bet."""
+    json: JSONDict = {
+        "amount": int(amount),
+        "contractId": contractId,
+        "outcome": outcome,
+    }
+    if limitProb is not None:
+        json['limitProb'] = limitProb
+    return json
+
+
+def _market_payload(
+    outcomeType: str,
+    question: str,
+    description: str,
+    closeTime: int,
+    tags: Optional[List[str]] = None,
+    initialProb: Optional[int] = 50,
+    initialValue: Optional[float] = None,
+    minValue: Optional[int] = None,
+    maxValue: Optional[int] = None,
+    isLogScale: Optional[bool] = None,
+    answers: Optional[Sequence[str]] = None,
+) -> JSONDict:
+    """Build the request body for creating a market."""
+    data: JSONDict = {
+        "outcomeType": outcomeType,
+        "question": question,
+        "description": description,
+        "closeTime": closeTime,
+        "tags": tags or [],
+    }
+    if outcomeType == "BINARY":
+        data["initialProb"] = initialProb
+    elif outcomeType == "FREE_RESPONSE":
+        pass
+    elif outcomeType == "PSEUDO_NUMERIC":
+        data["min"] = minValue
+        data["max"] = maxValue
+        data["isLogScale"] = isLogScale
+        if initialValue is None:
+            raise ValueError("Needs initial value")
+        data["initialValue"] = initialValue
+    elif outcomeType == "MULTIPLE_CHOICE":
+        data["answers"] = answers
+    else:
+        raise Exception(
+            "Invalid outcome type. Outcome should be one of: BINARY, FREE_RESPONSE, PSEUDO_NUMERIC, MULTIPLE_CHOICE"
+        )
+    return data
+
+
+def _resolution_payload(market: MarketMetadata, *args: Any, **kwargs: Any) -> JSONDict:
+    """Build the request body for resolving a market, with different inputs depending on its type."""
+    if market.outcomeType == "BINARY":
+        return _binary_resolution(market, *args, **kwargs)
+    elif market.outcomeType == "FREE_RESPONSE":
+        return _free_response_resolution(market, *args, **kwargs)
+    elif market.outcomeType == "MULTIPLE_CHOICE":
+        return _multiple_choice_resolution(market, *args, **kwargs)
+    elif market.outcomeType == "PSEUDO_NUMERIC":
+        return _pseudo_numeric_resolution(market, *args, **kwargs)
+    else:  # pragma: no cover
+        raise NotImplementedError()
+
+
+def _binary_resolution(market: MarketMetadata, probabilityInt: float) -> JSONDict:
+    if probabilityInt == 100 or probabilityInt is True:
+        json: JSONDict = {"outcome": "YES"}
+    elif probabilityInt == 0 or probabilityInt is False:
+        json = {"outcome": "NO"}
+    else:
+        json = {"outcome": "MKT", "probabilityInt": probabilityInt}
+    return json
+
+
+def _pseudo_numeric_resolution(market: MarketMetadata, resolutionValue: float) -> JSONDict:
+    assert market.min is not None
+    assert market.max is not None
+    prob = 100 * number_to_prob_cpmm1(resolutionValue, market.min, market.max, bool(market.isLogScale))
+    return {"outcome": "MKT", "value": resolutionValue, "probabilityInt": prob}
+
+
+def _free_response_resolution(market: MarketMetadata, weights: Dict[int, float]) -> JSONDict:
+    if len(weights) == 1:
+        json: JSONDict = {"outcome": next(iter(weights))}
+    else:
+        total = sum(weights.values())
+        json = {
+            "outcome": "MKT",
+            "resolutions": [
+                {"answer": index, "pct": 100 * weight / total}
+                for index, weight in weights.items()
+            ]
+        }
+    return json
+
+
+_multiple_choice_resolution = _free_response_resolution
+
+
+def _numeric_resolution(market: MarketMetadata, number: float) -> JSONDict:
+    raise NotImplementedError("TODO: I suspect the relevant docs are out of date")
+
+
+def _comment_payload(market: LiteMarket | str, comment: str | JSONDict, mode: str) -> JSONDict:
+    """Build the request body for creating a comment."""
+    if isinstance(market, LiteMarket):
+        market = market.id
+    data: JSONDict = {'contractId': market}
+    if mode == 'tiptap':
+        data['content'] = comment
+    elif mode == 'html':
+        data['html'] = comment
+    elif mode == 'markdown':
+        data['markdown'] = comment
+    else:
+        raise ValueError("Invalid format mode")
+    return data
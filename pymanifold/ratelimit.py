@@ -0,0 +1,196 @@
+"""Contains the client-side rate limiter that keeps request rates under the API's limits."""
+
+from __future__ import annotations
+
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from time import monotonic, sleep, time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Awaitable, Callable, Dict, Mapping, Optional, Tuple, TypeVar
+
+    R = TypeVar("R")
+
+# Statuses that mean the server wants us to slow down
+THROTTLE_STATUSES = frozenset({429, 503})
+
+# Methods that only read, and so draw from the read budget
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# On being throttled the rate is multiplied by RATE_DECREASE; each request that goes through then adds back
+# RATE_INCREASE times the maximum rate, until it's reached again
+RATE_DECREASE = 0.5
+RATE_INCREASE = 1 / 32
+
+
+class TokenBucket:
+    """A thread-safe token bucket, holding up to `burst` tokens and refilling at `rate` tokens per second.
+
+    The rate adapts: it's cut whenever the server throttles a request, and creeps back up to `rate` as requests
+    go through again. `queued` is the total time requests have spent waiting for a token.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        min_rate: Optional[float] = None,
+        clock: Callable[[], float] = monotonic,
+    ):
+        """Initialize a full bucket."""
+        self.max_rate = self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.clock = clock
+        self.tokens = self.burst
+        self.updated = clock()
+        self.blocked_until = float("-inf")
+        self.queued = 0.0
+        self.requests = self.throttled = 0
+        self._lock = Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available now and return 0, or else return how long to wait before trying again."""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            if now >= self.blocked_until and self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+
+    def acquire(self) -> float:
+        """Take a token, blocking until one is available. Returns the time spent waiting."""
+        start = self.clock()
+        wait = self.try_acquire()
+        while wait:
+            sleep(wait)
+            wait = self.try_acquire()
+        return self._record(start)
+
+    async def acquire_async(self) -> float:
+        """Take a token, yielding to the event loop until one is available. Returns the time spent waiting."""
+        import asyncio  # already loaded by whatever runs this, but not worth importing for synchronous clients
+
+        start = self.clock()
+        wait = self.try_acquire()
+        while wait:
+            await asyncio.sleep(wait)
+            wait = self.try_acquire()
+        return self._record(start)
+
+    def _record(self, start: float) -> float:
+        waited = self.clock() - start
+        with self._lock:
+            self.queued += waited
+            self.requests += 1
+        return waited
+
+    def throttle(self, retry_after: Optional[float] = None) -> None:
+        """Back off after being throttled: hand out no tokens for `retry_after` seconds, and cut the rate."""
+        with self._lock:
+            now = self.clock()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * RATE_DECREASE)
+            delay = retry_after if retry_after is not None else 1 / self.rate
+            self.blocked_until = max(self.blocked_until, now + delay)
+            self.tokens = 0.0
+            self.throttled += 1
+
+    def succeeded(self) -> None:
+        """Let the rate recover a little after a request went through."""
+        with self._lock:
+            if self.rate < self.max_rate:
+                self._refill(self.clock())
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RATE_INCREASE)
+
+    def stats(self) -> Dict[str, float]:
+        """Get the current rate, and the request, throttle and queueing totals."""
+        return {"rate": self.rate, "requests": self.requests, "throttled": self.throttled, "queued": self.queued}
+
+
+class RateLimiter:
+    """Separate token buckets for reads and writes, which any number of transports and threads can share.
+
+    Every request first waits for a token from its budget. A 429 or 503 response cuts that budget's rate and
+    pauses it for as long as the response's ``Retry-After`` header asks; a 429 means the request wasn't handled, so
+    it's then sent again, up to `max_retries` times. `stats()` reports, per budget, how long requests spent queued.
+    """
+
+    def __init__(
+        self,
+        reads: float = 10.0,
+        writes: float = 2.0,
+        burst: Optional[Mapping[str, float]] = None,
+        max_retries: int = 3,
+        clock: Callable[[], float] = monotonic,
+    ):
+        """Initialize a limiter allowing `reads` and `writes` requests per second, optionally with custom bursts."""
+        burst = burst or {}
+        self.buckets = {
+            "read": TokenBucket(reads, burst.get("read"), clock=clock),
+            "write": TokenBucket(writes, burst.get("write"), clock=clock),
+        }
+        self.max_retries = max_retries
+
+    def bucket_for(self, method: str) -> TokenBucket:
+        """Get the budget that requests with the given method draw from."""
+        return self.buckets["read" if method.upper() in READ_METHODS else "write"]
+
+    def send(self, method: str, send: Callable[[], R], status: Callable[[R], Tuple[int, Optional[str]]]) -> R:
+        """Send a request through the limiter, given a function that sends it and one that reads its status.
+
+        `status` returns the response's status code and ``Retry-After`` header.
+        """
+        bucket = self.bucket_for(method)
+        for attempt in range(self.max_retries + 1):
+            bucket.acquire()
+            response = send()
+            if not self._should_retry(bucket, attempt, *status(response)):
+                return response
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    async def send_async(
+        self,
+        method: str,
+        send: Callable[[], Awaitable[R]],
+        status: Callable[[R], Tuple[int, Optional[str]]],
+    ) -> R:
+        """Send a request through the limiter from a coroutine. See `send`."""
+        bucket = self.bucket_for(method)
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire_async()
+            response = await send()
+            if not self._should_retry(bucket, attempt, *status(response)):
+                return response
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    def _should_retry(self, bucket: TokenBucket, attempt: int, status: int, retry_after: Optional[str]) -> bool:
+        if status not in THROTTLE_STATUSES:
+            bucket.succeeded()
+            return False
+        bucket.throttle(parse_retry_after(retry_after))
+        return status == 429 and attempt < self.max_retries
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Get the rate, request, throttle and queueing totals of each budget."""
+        return {name: bucket.stats() for name, bucket in self.buckets.items()}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Turn a ``Retry-After`` header, in seconds or as an HTTP date, into a number of seconds from now."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time())
+    except (TypeError, ValueError):
+        return None
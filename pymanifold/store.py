@@ -0,0 +1,450 @@
+"""Contains a local SQLite mirror of Manifold's markets, bets, users and groups."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from threading import Lock
+from time import time
+from typing import TYPE_CHECKING, cast
+
+from .lib import MAX_PAGE_SIZE
+from .types import Bet, Group, LiteMarket, LiteUser
+from .utils.fanout import bounded_map
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+    from .frame import BetFrame, MarketFrame
+    from .lib import ManifoldClient
+    from .types import JSONDict
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS markets (
+    id TEXT PRIMARY KEY,
+    slug TEXT,
+    creatorUsername TEXT,
+    createdTime INTEGER,
+    lastUpdatedTime INTEGER,
+    closeTime INTEGER,
+    outcomeType TEXT,
+    isResolved INTEGER,
+    syncedAt REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS markets_createdTime ON markets (createdTime);
+CREATE INDEX IF NOT EXISTS markets_slug ON markets (slug);
+
+CREATE TABLE IF NOT EXISTS bets (
+    id TEXT PRIMARY KEY,
+    contractId TEXT,
+    userId TEXT,
+    userUsername TEXT,
+    createdTime INTEGER,
+    syncedAt REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bets_contractId ON bets (contractId, createdTime);
+CREATE INDEX IF NOT EXISTS bets_userId ON bets (userId, createdTime);
+CREATE INDEX IF NOT EXISTS bets_userUsername ON bets (userUsername, createdTime);
+CREATE INDEX IF NOT EXISTS bets_createdTime ON bets (createdTime);
+
+CREATE TABLE IF NOT EXISTS users (
+    id TEXT PRIMARY KEY,
+    username TEXT UNIQUE,
+    syncedAt REAL NOT NULL,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS groups (
+    id TEXT PRIMARY KEY,
+    slug TEXT UNIQUE,
+    syncedAt REAL NOT NULL,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    scope TEXT PRIMARY KEY,
+    syncedAt REAL NOT NULL,
+    watermark INTEGER
+);
+"""
+
+
+class ManifoldStore:
+    """A persistent local mirror of markets, bets, users and groups, kept in SQLite.
+
+    Markets and bets are synced incrementally: the API lists both newest first, so each sync follows the `before`
+    cursor only until it reaches items created at or before the newest one seen by the last complete sync. Changes
+    to markets that were already mirrored are picked up by `refresh_markets`, which compares `lastUpdatedTime`;
+    there is no such refresh for bets, so a mirrored bet stays as it was when first synced.
+    Every sync records when it ran, and every market when it was last synced or found unchanged, so a
+    `ManifoldClient` given this store can tell whether it is fresh enough to answer from.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        """Open (creating if needed) a store at the given path."""
+        self.path = path
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._lock = Lock()
+        with self._lock, self._db:
+            self._db.executescript(SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._db.close()
+
+    def __enter__(self) -> ManifoldStore:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    # Freshness
+
+    def synced_at(self, scope: str) -> Optional[float]:
+        """Get when a scope (e.g. ``"markets"``, or ``bets_scope(market=...)``) last finished syncing."""
+        rows = self._query("SELECT syncedAt FROM sync_state WHERE scope = ?", (scope,))
+        return cast(float, rows[0][0]) if rows else None
+
+    def is_fresh(self, scope: str, max_age: float) -> bool:
+        """Check whether a scope finished syncing within the last `max_age` seconds."""
+        synced_at = self.synced_at(scope)
+        return synced_at is not None and time() - synced_at <= max_age
+
+    def _watermark(self, scope: str) -> Optional[int]:
+        rows = self._query("SELECT watermark FROM sync_state WHERE scope = ?", (scope,))
+        return cast("Optional[int]", rows[0][0]) if rows else None
+
+    def _mark_synced(self, scope: str, watermark: Optional[int]) -> None:
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT INTO sync_state (scope, syncedAt, watermark) VALUES (?, ?, ?) "
+                "ON CONFLICT (scope) DO UPDATE SET syncedAt = excluded.syncedAt, "
+                "watermark = COALESCE(MAX(watermark, excluded.watermark), watermark, excluded.watermark)",
+                (scope, time(), watermark),
+            )
+
+    # Writing
+
+    def add_markets(self, markets: Iterable[JSONDict]) -> None:
+        """Insert or update markets from their JSON. Bets and comments of full markets are not kept."""
+        now = time()
+        rows = [
+            (
+                m["id"],
+                _slug(m),
+                m.get("creatorUsername"),
+                m.get("createdTime"),
+                m.get("lastUpdatedTime"),
+                m.get("closeTime"),
+                m.get("outcomeType"),
+                m.get("isResolved"),
+                now,
+                json.dumps({k: v for k, v in m.items() if k not in ("bets", "comments")}),
+            )
+            for m in markets
+        ]
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO markets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def add_bets(self, bets: Iterable[JSONDict]) -> None:
+        """Insert or update bets from their JSON."""
+        now = time()
+        rows = [
+            (b["id"], b.get("contractId"), b.get("userId"), b.get("userUsername"), b.get("createdTime"), now,
+             json.dumps(b))
+            for b in bets
+        ]
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO bets VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def add_users(self, users: Iterable[JSONDict]) -> None:
+        """Insert or update users from their JSON."""
+        now = time()
+        rows = [(u["id"], u.get("username"), now, json.dumps(u)) for u in users]
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?)", rows)
+
+    def add_groups(self, groups: Iterable[JSONDict]) -> None:
+        """Insert or update groups from their JSON."""
+        now = time()
+        rows = [(g["id"], g.get("slug"), now, json.dumps(g)) for g in groups]
+        with self._lock, self._db:
+            self._db.executemany("INSERT OR REPLACE INTO groups VALUES (?, ?, ?, ?)", rows)
+
+    # Syncing
+
+    def sync_markets(self, client: ManifoldClient, max_items: Optional[int] = None) -> int:
+        """Mirror every market created since the last sync. Returns how many markets were written."""
+        return self._sync(client, "markets", "/markets", {}, self.add_markets, max_items)
+
+    def sync_bets(
+        self,
+        client: ManifoldClient,
+        username: Optional[str] = None,
+        market: Optional[str] = None,
+        max_items: Optional[int] = None,
+    ) -> int:
+        """Mirror every bet placed since the last sync, optionally only those by a user or on a market (by slug).
+
+        Bets already mirrored are not fetched again, so later changes to them (limit orders being filled or
+        cancelled, shares being sold) aren't picked up; pass bets fetched again to `add_bets` to update them.
+        Returns how many bets were written.
+        """
+        params: JSONDict = {"username": username, "market": market}
+        return self._sync(client, bets_scope(username, market), "/bets", params, self.add_bets, max_items)
+
+    def _sync(
+        self,
+        client: ManifoldClient,
+        scope: str,
+        path: str,
+        params: JSONDict,
+        add: Callable[[Sequence[JSONDict]], None],
+        max_items: Optional[int],
+    ) -> int:
+        watermark = self._watermark(scope)
+        newest: Optional[int] = None
+        written = 0
+        reached = False
+        pages = client._paginate(path, params, None, max_items, MAX_PAGE_SIZE, prefetch=True)
+        for page in pages:
+            add(page)
+            written += len(page)
+            times = [cast(int, item["createdTime"]) for item in page]
+            if times:
+                newest = max(max(times), newest or 0)
+            if watermark is not None and times and min(times) <= watermark:
+                reached = True
+                pages.close()
+                break
+        # A walk cut short by max_items before reaching what's already mirrored leaves a gap behind it
+        capped = max_items is not None and written >= max_items
+        if reached or not capped:
+            self._mark_synced(scope, newest)
+        return written
+
+    def refresh_markets(
+        self, client: ManifoldClient, ids: Optional[Iterable[str]] = None, max_workers: int = 8
+    ) -> List[str]:
+        """Bring mirrored markets (all of them by default) up to date, storing those whose `lastUpdatedTime` moved on.
+
+        Without `ids`, every market's `lastUpdatedTime` is read from the market listing, a page at a time, and only
+        the mirrored markets that changed are fetched again. With `ids`, each of those markets is fetched. Either way,
+        the markets found unchanged count as synced now. Returns the ids of the markets that changed.
+        """
+        known: Dict[str, Optional[int]] = dict(self._query("SELECT id, lastUpdatedTime FROM markets"))
+        unchanged: List[str] = []
+        if ids is None:
+            ids = []
+            for page in client._paginate("/markets", {}, None, None, MAX_PAGE_SIZE, prefetch=True):
+                for env in page:
+                    id_ = cast(str, env["id"])
+                    if id_ in known:
+                        updated = env.get("lastUpdatedTime")
+                        (unchanged if updated is not None and updated == known[id_] else ids).append(id_)
+        changed = []
+        for env in bounded_map(client._get_market_by_id_raw, ids, max_workers):
+            updated = env.get("lastUpdatedTime")
+            if updated is None or updated != known.get(cast(str, env.get("id"))):
+                changed.append(env)
+            else:
+                unchanged.append(cast(str, env["id"]))
+        self.add_markets(changed)
+        self._touch_markets(unchanged)
+        return [cast(str, env["id"]) for env in changed]
+
+    def _touch_markets(self, ids: Iterable[str]) -> None:
+        """Mark mirrored markets as synced now, having found them unchanged."""
+        now = time()
+        with self._lock, self._db:
+            self._db.executemany("UPDATE markets SET syncedAt = ? WHERE id = ?", [(now, id_) for id_ in ids])
+
+    def sync_user(self, client: ManifoldClient, handle: str) -> LiteUser:
+        """Fetch a user and mirror them."""
+        env = client._get_user_raw(handle)
+        self.add_users([env])
+        return LiteUser.from_dict(env)
+
+    def sync_group(self, client: ManifoldClient, slug: Optional[str] = None, id_: Optional[str] = None) -> Group:
+        """Fetch a group and mirror it."""
+        group = client.get_group(slug, id_)
+        self.add_groups([vars(group)])
+        return group
+
+    # Reading
+
+    def markets(
+        self, limit: Optional[int] = None, before: Optional[str] = None, creator: Optional[str] = None
+    ) -> List[LiteMarket]:
+        """List mirrored markets newest first, the same way the `/markets` endpoint pages through them."""
+        return [LiteMarket.from_dict(json.loads(row[0])) for row in self._market_rows(limit, before, creator)]
+
+    def fresh_markets(
+        self, max_age: float, limit: Optional[int] = None, before: Optional[str] = None
+    ) -> Optional[List[LiteMarket]]:
+        """Answer a `/markets` query from the mirror, or return None if it isn't fresh enough to.
+
+        That takes both a sync of the newest markets and a sync or refresh of each market returned within `max_age`
+        seconds, since a sync doesn't rewrite markets mirrored before. A `before` cursor that isn't mirrored can't be
+        answered either. Like the API, at most a page of markets is returned when no `limit` is given.
+        """
+        if not self.is_fresh("markets", max_age) or not self._has_cursor("markets", before):
+            return None
+        rows = self._market_rows(limit if limit is not None else MAX_PAGE_SIZE, before)
+        if any(time() - synced_at > max_age for _, synced_at in rows):
+            return None
+        return [LiteMarket.from_dict(json.loads(data)) for data, _ in rows]
+
+    def _has_cursor(self, table: str, before: Optional[str]) -> bool:
+        """Check that a `before` cursor, if given, names a mirrored row, so the page after it can be found."""
+        return before is None or bool(self._query("SELECT 1 FROM %s WHERE id = ?" % table, (before,)))
+
+    def _market_rows(
+        self, limit: Optional[int] = None, before: Optional[str] = None, creator: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        sql, params = "SELECT data, syncedAt FROM markets WHERE 1", []
+        if before is not None:
+            sql += " AND createdTime < (SELECT createdTime FROM markets WHERE id = ?)"
+            params.append(before)
+        if creator is not None:
+            sql += " AND creatorUsername = ?"
+            params.append(creator)
+        sql += " ORDER BY createdTime DESC, id DESC LIMIT ?"
+        params.append(limit if limit is not None else -1)
+        return cast("List[Tuple[str, float]]", self._query(sql, params))
+
+    def market_frame(self, creator: Optional[str] = None, now: Optional[float] = None) -> MarketFrame:
+        """Load every mirrored market, or only those by `creator`, into a `MarketFrame`."""
+        from .frame import MarketFrame  # needs NumPy, so only imported when used
+
+        sql, params = "SELECT data FROM markets", []
+        if creator is not None:
+            sql += " WHERE creatorUsername = ?"
+            params.append(creator)
+        sql += " ORDER BY createdTime DESC, id DESC"
+        return MarketFrame.from_dicts((json.loads(row[0]) for row in self._query(sql, params)), now)
+
+    def market(
+        self, id_: Optional[str] = None, slug: Optional[str] = None, max_age: Optional[float] = None
+    ) -> Optional[LiteMarket]:
+        """Get a mirrored market by id or slug, if it was synced within `max_age` seconds."""
+        rows = self._query("SELECT data, syncedAt FROM markets WHERE id = ? OR slug = ?", (id_, slug))
+        if not rows or (max_age is not None and time() - rows[0][1] > max_age):
+            return None
+        return LiteMarket.from_dict(json.loads(rows[0][0]))
+
+    def fresh_bets(
+        self,
+        max_age: float,
+        limit: Optional[int] = None,
+        before: Optional[str] = None,
+        username: Optional[str] = None,
+        market: Optional[str] = None,
+    ) -> Optional[List[Bet]]:
+        """Answer a `/bets` query from the mirror, or return None if that scope isn't fresh enough to.
+
+        A `before` cursor that isn't mirrored can't be answered either. Like the API, at most a page of bets is
+        returned when no `limit` is given.
+        """
+        if not self.is_fresh(bets_scope(username, market), max_age) or not self._has_cursor("bets", before):
+            return None
+        contract_id = None
+        if market is not None:
+            rows = self._query("SELECT id FROM markets WHERE slug = ?", (market,))
+            if not rows:
+                return None
+            contract_id = rows[0][0]
+        limit = limit if limit is not None else MAX_PAGE_SIZE
+        return self.bets(contract_id=contract_id, username=username, before=before, limit=limit)
+
+    def _bet_rows(
+        self,
+        contract_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        username: Optional[str] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        before: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[JSONDict]:
+        sql, params = "SELECT data FROM bets WHERE 1", []
+        for column, value in (("contractId", contract_id), ("userId", user_id), ("userUsername", username)):
+            if value is not None:
+                sql += " AND %s = ?" % column
+                params.append(value)
+        if since is not None:
+            sql += " AND createdTime >= ?"
+            params.append(since)
+        if until is not None:
+            sql += " AND createdTime < ?"
+            params.append(until)
+        if before is not None:
+            sql += " AND createdTime < (SELECT createdTime FROM bets WHERE id = ?)"
+            params.append(before)
+        sql += " ORDER BY createdTime DESC, id DESC LIMIT ?"
+        params.append(limit if limit is not None else -1)
+        return (json.loads(row[0]) for row in self._query(sql, params))
+
+    def bets(
+        self,
+        contract_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        username: Optional[str] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        before: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Bet]:
+        """List mirrored bets newest first, filtered by market id, user and `createdTime` range."""
+        rows = self._bet_rows(contract_id, user_id, username, since, until, before, limit)
+        return [Bet.from_dict(env) for env in rows]
+
+    def bet_frame(
+        self,
+        contract_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        username: Optional[str] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+    ) -> BetFrame:
+        """Load mirrored bets, filtered like `bets`, into a `BetFrame`."""
+        from .frame import BetFrame  # needs NumPy, so only imported when used
+
+        return BetFrame.from_dicts(self._bet_rows(contract_id, user_id, username, since, until))
+
+    def user(self, handle: str, max_age: Optional[float] = None) -> Optional[LiteUser]:
+        """Get a mirrored user by username, if they were synced within `max_age` seconds."""
+        rows = self._query("SELECT data, syncedAt FROM users WHERE username = ?", (handle,))
+        if not rows or (max_age is not None and time() - rows[0][1] > max_age):
+            return None
+        return LiteUser.from_dict(json.loads(rows[0][0]))
+
+    def group(
+        self, slug: Optional[str] = None, id_: Optional[str] = None, max_age: Optional[float] = None
+    ) -> Optional[Group]:
+        """Get a mirrored group by slug or id, if it was synced within `max_age` seconds."""
+        rows = self._query("SELECT data, syncedAt FROM groups WHERE id = ? OR slug = ?", (id_, slug))
+        if not rows or (max_age is not None and time() - rows[0][1] > max_age):
+            return None
+        return Group.from_dict(json.loads(rows[0][0]))
+
+
+def bets_scope(username: Optional[str] = None, market: Optional[str] = None) -> str:
+    """Get the sync scope name for bets filtered by username and/or market slug."""
+    scope = "bets"
+    if username is not None:
+        scope += ":username=" + username
+    if market is not None:
+        scope += ":market=" + market
+    return scope
+
+
+def _slug(market: JSONDict) -> Optional[str]:
+    url = market.get("url")
+    return cast(str, url).split("/")[-1] if url else None
@@ -0,0 +1,175 @@
+"""Contains the pooled HTTP transport that the clients talk to Manifold through."""
+
+from __future__ import annotations
+
+from threading import Lock
+from time import perf_counter
+from typing import TYPE_CHECKING
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .instrument import RequestRecord, endpoint_of, notify
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, TypeVar
+
+    from .instrument import Instrument
+    from .ratelimit import RateLimiter
+
+    T = TypeVar("T")
+
+BASE_URI = "https://manifold.markets/api/v0"
+DEFAULT_TIMEOUT = 10.0
+
+
+class Transport:
+    """A pooled, keep-alive HTTP transport for the Manifold API.
+
+    Every request goes through one `requests.Session`, so connections to the API are reused rather than re-opened
+    for each call. `timeouts` maps path prefixes (e.g. ``"/bet"`` or ``"/market/"``) to a timeout in seconds; the
+    longest matching prefix wins, and `timeout` is used for everything else. Idempotent requests are retried on
+    gateway errors with exponential backoff. Given a `RateLimiter`, which may be shared with other transports, every
+    request waits for its turn and backs off when the API throttles it. Point `base_uri` somewhere else to talk to a
+    local stand-in server.
+
+    Each of `instruments` (see `instrument.MetricsRecorder`) is called with a `RequestRecord` of every request once
+    it completes. Without any, requests aren't timed at all.
+    """
+
+    def __init__(
+        self,
+        base_uri: str = BASE_URI,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        timeout: Optional[float] = DEFAULT_TIMEOUT,
+        timeouts: Optional[Mapping[str, Optional[float]]] = None,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        session: Optional[requests.Session] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        instruments: Iterable[Instrument] = (),
+    ):
+        """Initialize a transport, optionally wrapping an existing session."""
+        self.base_uri = base_uri.rstrip("/")
+        self.rate_limiter = rate_limiter
+        self.instruments: List[Instrument] = list(instruments)
+        self.timeout = timeout
+        self.timeouts: Dict[str, Optional[float]] = dict(timeouts or {})
+        self.session = session if session is not None else requests.Session()
+        retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def timeout_for(self, path: str) -> Optional[float]:
+        """Get the timeout that applies to a given API path."""
+        best: Optional[str] = None
+        for prefix in self.timeouts:
+            if path.startswith(prefix) and (best is None or len(prefix) > len(best)):
+                best = prefix
+        if best is None:
+            return self.timeout
+        return self.timeouts[best]
+
+    def request(self, method: str, path: str, **kwargs: Any) -> requests.Response:
+        """Send a request to the API path, relative to `base_uri`."""
+        if not self.instruments:
+            return self._send(method, path, kwargs)
+        response, record = self._send_recorded(method, path, kwargs)
+        notify(self.instruments, record)
+        return response
+
+    def fetch(self, method: str, path: str, decode: Callable[[requests.Response], T], **kwargs: Any) -> T:
+        """Send a request and turn the response into objects with `decode`, recording the time that takes too."""
+        if not self.instruments:
+            return decode(self._send(method, path, kwargs))
+        response, record = self._send_recorded(method, path, kwargs)
+        start = perf_counter()
+        try:
+            return decode(response)
+        finally:
+            record.decode_time = perf_counter() - start
+            notify(self.instruments, record)
+
+    def _send(self, method: str, path: str, kwargs: Dict[str, Any]) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout_for(path))
+        if self.rate_limiter is None:
+            return self.session.request(method, self.base_uri + path, **kwargs)
+        return self.rate_limiter.send(
+            method, lambda: self.session.request(method, self.base_uri + path, **kwargs), _status
+        )
+
+    def _send_recorded(self, method: str, path: str, kwargs: Dict[str, Any]) -> Tuple[requests.Response, RequestRecord]:
+        sends = 0
+
+        def send() -> requests.Response:
+            nonlocal sends
+            sends += 1
+            return self.session.request(method, self.base_uri + path, **kwargs)
+
+        kwargs.setdefault("timeout", self.timeout_for(path))
+        start = perf_counter()
+        try:
+            response = send() if self.rate_limiter is None else self.rate_limiter.send(method, send, _status)
+        except requests.RequestException as e:
+            record = RequestRecord(
+                method, path, endpoint_of(path), None, perf_counter() - start, None, max(0, sends - 1),
+                error=type(e).__name__,
+            )
+            notify(self.instruments, record)
+            raise
+        latency = perf_counter() - start
+        if kwargs.get("stream"):
+            length = response.headers.get("Content-Length")
+            size = int(length) if length is not None and length.isdigit() else None
+        else:
+            size = len(response.content)
+        # Retries the connection pool made itself, on top of any resends by the rate limiter
+        history = getattr(getattr(response.raw, "retries", None), "history", None) or ()
+        record = RequestRecord(
+            method, path, endpoint_of(path), response.status_code, latency, size, sends - 1 + len(history)
+        )
+        return response, record
+
+    def get(self, path: str, **kwargs: Any) -> requests.Response:
+        """Send a GET request to the API path."""
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs: Any) -> requests.Response:
+        """Send a POST request to the API path."""
+        return self.request("POST", path, **kwargs)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+    def __enter__(self) -> Transport:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def _status(response: requests.Response) -> Tuple[int, Optional[str]]:
+    return response.status_code, response.headers.get("Retry-After")
+
+
+_default_transport: Optional[Transport] = None
+_default_transport_lock = Lock()
+
+
+def default_transport() -> Transport:
+    """Get the transport shared by every client that wasn't given one explicitly."""
+    global _default_transport
+    with _default_transport_lock:
+        if _default_transport is None:
+            _default_transport = Transport()
+        return _default_transport
@@ -3,12 +3,17 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from functools import lru_cache
 from inspect import signature
-from typing import TYPE_CHECKING, Dict, Mapping, Sequence, Union
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Mapping, Sequence, Union
+
+from .utils.fanout import bounded_map, unique
+from .utils.lazy import lazy_attributes
 
 if TYPE_CHECKING:  # pragma: no cover
     from typing import Iterable, List, Literal, Optional, Type, TypeVar
 
+    from .frame import BetFrame  # noqa: F401
     from .lib import ManifoldClient
 
     T = TypeVar("T")
@@ -17,6 +22,9 @@ if TYPE_CHECKING:  # pragma: no cover
 JSONType = Union[int, float, bool, str, None, Sequence['JSONType'], Mapping[str, 'JSONType']]
 JSONDict = Dict[str, JSONType]
 
+# `BetFrame` used to live here; it needs NumPy, so it's only imported from `.frame` when asked for
+__getattr__, __dir__ = lazy_attributes(__name__, {"BetFrame": ".frame"})
+
 
 class DictDeserializable:
     """An object which can be deserialized from a known dictionary spec."""
@@ -24,9 +32,14 @@ class DictDeserializable:
     @classmethod
     def from_dict(cls: Type[T], env: JSONDict) -> T:
         """Take a dictionary and return an instance of the associated class."""
-        return cls(
-            **{k: v for k, v in env.items() if k in signature(cls).parameters}  # type: ignore
-        )
+        parameters = _init_parameters(cls)
+        return cls(**{k: v for k, v in env.items() if k in parameters})
+
+
+@lru_cache(maxsize=None)
+def _init_parameters(cls: type) -> FrozenSet[str]:
+    """Get the names a class's constructor accepts, introspecting each class only once."""
+    return frozenset(signature(cls).parameters)
 
 
 @dataclass
@@ -54,6 +67,24 @@ class Bet(DictDeserializable):
     probAfter: float | None = None
 
 
+@dataclass
+class BetResult:
+    """The outcome of one of the bets placed by `create_bets`: the id of the new bet, or the error that stopped it."""
+
+    contractId: str
+    amount: int
+    outcome: str
+    limitProb: float | None = None
+
+    betId: str | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the bet was placed."""
+        return self.error is None
+
+
 @dataclass
 class Comment(DictDeserializable):
     """Represents a comment."""
@@ -128,14 +159,48 @@ class Market(LiteMarket):
 
     @classmethod
     def from_dict(cls, env: JSONDict) -> 'Market':
-        """Take a dictionary and return an instance of the associated class."""
-        market = super(Market, cls).from_dict(env)
-        bets: Sequence[JSONDict] = env['bets']  # type: ignore[assignment]
-        comments: Sequence[JSONDict] = env['comments']  # type: ignore[assignment]
-        market.bets = [Bet.from_dict(bet) for bet in bets]
-        market.comments = [Comment.from_dict(bet) for bet in comments]
+        """Take a dictionary and return an instance of the associated class.
+
+        The bets and comments are kept as they are, and only turned into `Bet` and `Comment` objects the first time
+        they're accessed.
+        """
+        market = super(Market, cls).from_dict({k: v for k, v in env.items() if k not in _LAZY_MARKET_FIELDS})
+        for name in _LAZY_MARKET_FIELDS:
+            del market.__dict__[name]
+        market.__dict__['_pending'] = {name: env.get(name) or [] for name in _LAZY_MARKET_FIELDS}
         return market
 
+    if not TYPE_CHECKING:
+        def __getattr__(self, name: str) -> Any:
+            # Only reached for bets and comments that haven't been decoded yet
+            pending = self.__dict__.get('_pending')
+            if pending is None or name not in pending:
+                raise AttributeError(name)
+            cls = _LAZY_MARKET_FIELDS[name]
+            value = self.__dict__[name] = [cls.from_dict(item) for item in pending[name]]
+            # Shallow copies share the pending dict, so replace it rather than changing it under them
+            self.__dict__['_pending'] = {k: v for k, v in pending.items() if k != name}
+            return value
+
+
+_LAZY_MARKET_FIELDS: Dict[str, Type[DictDeserializable]] = {'bets': Bet, 'comments': Comment}
+
+
+@dataclass(frozen=True)
+class MarketMetadata(DictDeserializable):
+    """The attributes of a market that never change once it's created, which are all resolving it needs."""
+
+    id: str
+    outcomeType: Literal["BINARY", "FREE_RESPONSE", "NUMERIC", "PSEUDO_NUMERIC", "MULTIPLE_CHOICE"]
+    min: Optional[float] = None
+    max: Optional[float] = None
+    isLogScale: Optional[bool] = None
+
+    @classmethod
+    def from_market(cls, market: LiteMarket) -> MarketMetadata:
+        """Take the immutable attributes of a market that was already fetched."""
+        return cls(market.id, market.outcomeType, market.min, market.max, market.isLogScale)
+
 
 @dataclass
 class Group(DictDeserializable):
@@ -153,13 +218,27 @@ class Group(DictDeserializable):
     slug: str = ""
     about: str = ""
 
-    def contracts(self, client: 'ManifoldClient') -> Iterable[Market]:
-        """Iterate over the markets in this group."""
-        return (client.get_market_by_id(id_) for id_ in self.contractIds)
-
-    def members(self, client: 'ManifoldClient') -> Iterable["LiteUser"]:
-        """Iterate over the users in this group."""
-        return (client.get_user(id_) for id_ in self.memberIds)
+    def contracts(
+        self, client: 'ManifoldClient', max_workers: int = 8, ordered: bool = True, dedup: bool = False
+    ) -> Iterable[Market]:
+        """Iterate over the markets in this group, skipping repeated ids if `dedup` is set.
+
+        Up to `max_workers` markets are fetched at once; pass 1 to fetch them one by one. See
+        `utils.fanout.bounded_map`.
+        """
+        ids = unique(self.contractIds) if dedup else self.contractIds
+        return bounded_map(client.get_market_by_id, ids, max_workers, ordered)
+
+    def members(
+        self, client: 'ManifoldClient', max_workers: int = 8, ordered: bool = True, dedup: bool = False
+    ) -> Iterable["LiteUser"]:
+        """Iterate over the users in this group, skipping repeated ids if `dedup` is set.
+
+        Up to `max_workers` users are fetched at once; pass 1 to fetch them one by one. See
+        `utils.fanout.bounded_map`.
+        """
+        ids = unique(self.memberIds) if dedup else self.memberIds
+        return bounded_map(client.get_user, ids, max_workers, ordered)
 
 
 @dataclass
@@ -1,6 +1,14 @@
 """Collection of utility functions that consumers of PyManifold might find useful."""
 
-from .kelly import kelly_calc
+from typing import TYPE_CHECKING
+
+from .lazy import lazy_attributes
 from .math import number_to_prob_cpmm1
 
-__all__ = ('kelly_calc', 'number_to_prob_cpmm1')
+if TYPE_CHECKING:  # pragma: no cover
+    from .kelly import kelly_calc, kelly_calc_batch
+
+__all__ = ('kelly_calc', 'kelly_calc_batch', 'number_to_prob_cpmm1')
+
+# The Kelly functions need NumPy, so they're only imported when first used
+__getattr__, __dir__ = lazy_attributes(__name__, {"kelly_calc": ".kelly", "kelly_calc_batch": ".kelly"})
@@ -0,0 +1,162 @@
+"""Contains a vectorized simulator for Maniswap, the constant-product market maker behind binary markets.
+
+More on Maniswap can be found here: 'https://manifoldmarkets.notion.site/Maniswap-ce406e1e897d417cbd491071ea8a0c39'.
+Every function takes NumPy arrays (or anything that broadcasts to them) of pool states, so that millions of bets
+can be priced in one call. A pool is its YES shares `y`, its NO shares `n`, and the probability `p` the market was
+initialised at; the product ``y**p * n**(1 - p)`` is invariant under trading.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple, Union, cast
+
+import numpy as np
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Literal, Tuple
+
+    from numpy.typing import ArrayLike, NDArray
+
+    Outcomes = Union[Literal["YES", "NO"], ArrayLike]
+
+# The fee charged on each bet, in shares, is FEE_RATE times the bet times the post-bet probability of the other
+# outcome, plus FLAT_FEE. These are the values `kelly.shares_bought` has always assumed.
+FEE_RATE = 0.0
+FLAT_FEE = 0.1
+
+
+class Trade(NamedTuple):
+    """The result of buying shares from Maniswap pools, with one entry per bet."""
+
+    # Shares received, after fees
+    shares: NDArray[np.float64]
+    # The probability of YES once the bet has been made
+    probability: NDArray[np.float64]
+    # The pool once the bet has been made
+    pool_yes: NDArray[np.float64]
+    pool_no: NDArray[np.float64]
+    # The fee taken out of the shares received
+    fees: NDArray[np.float64]
+
+
+def probability(pool_yes: ArrayLike, pool_no: ArrayLike, p: ArrayLike) -> NDArray[np.float64]:
+    """Get the probability of YES implied by pools."""
+    y, n, p = _floats(pool_yes, pool_no, p)
+    return cast("NDArray[np.float64]", p * n / (p * n + (1 - p) * y))
+
+
+def shares(
+    pool_yes: ArrayLike,
+    pool_no: ArrayLike,
+    p: ArrayLike,
+    amount: ArrayLike,
+    outcome: Outcomes,
+    flat_fee: float = FLAT_FEE,
+) -> NDArray[np.float64]:
+    """Get just the shares each bet buys, net of the flat fee. Cheaper than `buy` when nothing else is needed."""
+    y, n, p, amount = _floats(pool_yes, pool_no, p, amount)
+    yes = _is_yes(outcome)
+    if yes is True:
+        return cast("NDArray[np.float64]", y + amount - _pool_yes_after(y, n, p, n + amount) - flat_fee)
+    elif yes is False:
+        return cast("NDArray[np.float64]", n + amount - _pool_no_after(y, n, p, y + amount) - flat_fee)
+    return buy(y, n, p, amount, yes, fee_rate=0.0, flat_fee=flat_fee).shares
+
+
+def buy(
+    pool_yes: ArrayLike,
+    pool_no: ArrayLike,
+    p: ArrayLike,
+    amount: ArrayLike,
+    outcome: Outcomes,
+    fee_rate: float = FEE_RATE,
+    flat_fee: float = FLAT_FEE,
+) -> Trade:
+    """Buy `amount` worth of `outcome` shares from each pool independently.
+
+    All arguments broadcast against each other. `outcome` is ``"YES"``, ``"NO"``, or an array of either (or of
+    booleans, True meaning YES).
+    """
+    y, n, p, amount = np.broadcast_arrays(*_floats(pool_yes, pool_no, p, amount))
+    yes = np.broadcast_to(_is_yes(outcome), y.shape)
+    # Buying YES adds the bet to both pools and takes out the YES shares that restore the invariant; NO is symmetric
+    y_after = np.where(yes, _pool_yes_after(y, n, p, n + amount), y + amount)
+    n_after = np.where(yes, n + amount, _pool_no_after(y, n, p, y + amount))
+    bought = np.where(yes, y + amount - y_after, n + amount - n_after)
+    prob = probability(y_after, n_after, p)
+    fees = fee_rate * np.where(yes, 1 - prob, prob) * amount + flat_fee
+    return Trade(bought - fees, prob, y_after, n_after, fees)
+
+
+def simulate(
+    pool_yes: float,
+    pool_no: float,
+    p: float,
+    amounts: ArrayLike,
+    outcomes: Outcomes,
+    fee_rate: float = FEE_RATE,
+    flat_fee: float = FLAT_FEE,
+) -> Trade:
+    """Apply a sequence of bets to a single pool, each one trading against the pool the previous one left behind.
+
+    Returns one entry per bet, in order. Since a run of bets on the same outcome only ever adds to one side of the
+    pool, each run is priced in a single vectorized step, so the cost grows with how often the outcome switches
+    rather than with the number of bets.
+    """
+    amounts = np.asarray(amounts, dtype=np.float64).ravel()
+    yes = np.broadcast_to(_is_yes(outcomes), amounts.shape)
+    y_after = np.empty_like(amounts)
+    n_after = np.empty_like(amounts)
+    # Where each run of bets on the same outcome starts and stops
+    starts = np.flatnonzero(np.r_[True, yes[1:] != yes[:-1]]) if len(amounts) else np.empty(0, dtype=np.intp)
+    stops = np.r_[starts[1:], len(amounts)]
+    y, n = float(pool_yes), float(pool_no)
+    for start, stop in zip(starts, stops):
+        added = np.cumsum(amounts[start:stop])
+        if yes[start]:
+            n_after[start:stop] = n + added
+            y_after[start:stop] = _pool_yes_after(y, n, p, n + added)
+        else:
+            y_after[start:stop] = y + added
+            n_after[start:stop] = _pool_no_after(y, n, p, y + added)
+        y, n = y_after[stop - 1], n_after[stop - 1]
+
+    # Each bet adds its amount to the pool left by the one before, and takes out the shares it bought
+    y_before = np.r_[pool_yes, y_after[:-1]]
+    n_before = np.r_[pool_no, n_after[:-1]]
+    bought = np.where(yes, y_before + amounts - y_after, n_before + amounts - n_after)
+    prob = probability(y_after, n_after, p)
+    fees = fee_rate * np.where(yes, 1 - prob, prob) * amounts + flat_fee
+    return Trade(bought - fees, prob, y_after, n_after, fees)
+
+
+def _pool_yes_after(y: ArrayLike, n: ArrayLike, p: ArrayLike, n_after: ArrayLike) -> NDArray[np.float64]:
+    """Get the YES pool that keeps the invariant once the NO pool has become `n_after`."""
+    y, n, p, n_after = _floats(y, n, p, n_after)
+    k = y**p * n**(1 - p)
+    return cast("NDArray[np.float64]", (k / n_after**(1 - p))**(1 / p))
+
+
+def _pool_no_after(y: ArrayLike, n: ArrayLike, p: ArrayLike, y_after: ArrayLike) -> NDArray[np.float64]:
+    """Get the NO pool that keeps the invariant once the YES pool has become `y_after`."""
+    y, n, p, y_after = _floats(y, n, p, y_after)
+    k = y**p * n**(1 - p)
+    return cast("NDArray[np.float64]", (k / y_after**p)**(1 / (1 - p)))
+
+
+def _floats(*arrays: ArrayLike) -> Tuple[NDArray[np.float64], ...]:
+    return tuple(np.asarray(a, dtype=np.float64) for a in arrays)
+
+
+def _is_yes(outcome: Outcomes) -> bool | NDArray[np.bool_]:
+    """Turn outcomes into True for YES and False for NO, keeping a single outcome as a plain bool."""
+    if isinstance(outcome, str):
+        if outcome not in ("YES", "NO"):
+            raise ValueError("Please give a valid outcome")
+        return outcome == "YES"
+    outcome = np.asarray(outcome)
+    if outcome.dtype == np.bool_:
+        return outcome
+    if not np.isin(outcome, ("YES", "NO")).all():
+        raise ValueError("Please give a valid outcome")
+    return cast("NDArray[np.bool_]", outcome == "YES")
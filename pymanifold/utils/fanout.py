@@ -0,0 +1,59 @@
+"""Contains helpers for running many API calls at once on a bounded thread pool."""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
+from typing import TYPE_CHECKING, TypeVar
+
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import Future
+    from typing import Callable, Deque, Iterable, Iterator, Optional, Set
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def bounded_map(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    max_workers: int = 8,
+    ordered: bool = True,
+    max_pending: Optional[int] = None,
+) -> Iterator[R]:
+    """Apply `func` to each item on a pool of `max_workers` threads, yielding results as they're ready.
+
+    At most `max_pending` calls (by default twice the number of workers) are queued or running at any time, and
+    `items` is only consumed as that window frees up, so a huge input never floods the API. With `ordered` set,
+    results come out in the same order as `items`; otherwise they come out in the order they complete.
+    """
+    if max_workers <= 1:
+        yield from map(func, items)
+        return
+    window = max_pending if max_pending is not None else 2 * max_workers
+    remaining = iter(items)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        if ordered:
+            queue: Deque[Future[R]] = deque(executor.submit(func, item) for item in islice(remaining, window))
+            while queue:
+                result = queue.popleft().result()
+                for item in islice(remaining, 1):
+                    queue.append(executor.submit(func, item))
+                yield result
+        else:
+            pending: Set[Future[R]] = {executor.submit(func, item) for item in islice(remaining, window)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                pending |= {executor.submit(func, item) for item in islice(remaining, len(done))}
+                for future in done:
+                    yield future.result()
+
+
+def unique(items: Iterable[T]) -> Iterator[T]:
+    """Iterate over the distinct items, keeping the first occurrence of each."""
+    seen: Set[T] = set()
+    for item in items:
+        if item not in seen:
+            seen.add(item)
+            yield item
@@ -0,0 +1,89 @@
+"""Contains an incremental parser for JSON arrays that arrive in chunks, such as streamed HTTP bodies."""
+
+from __future__ import annotations
+
+import codecs
+from json import JSONDecodeError, JSONDecoder
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Iterable, Iterator
+
+_decoder = JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+# Characters a number can go on with: one followed by only these, up to the end of the buffer, may be cut short
+_NUMBER_CHARACTERS = frozenset("0123456789.eE+-")
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator[Any]:
+    """Yield the elements of a UTF-8 JSON array one at a time, as soon as each has been fully received.
+
+    Only the element being parsed (plus at most one unconsumed chunk) is held in memory, never the whole array.
+    Raises `JSONDecodeError` if the input isn't a well-formed array.
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    remaining = iter(chunks)
+    buffer = ""
+    pos = 0
+    done = False
+
+    def fill(min_size: int = 1) -> bool:
+        """Buffer at least `min_size` more characters, dropping what's been consumed. False if input had run out."""
+        nonlocal buffer, pos, done
+        if done:
+            return False
+        parts = [buffer[pos:]]
+        added = 0
+        while added < min_size and not done:
+            chunk = next(remaining, None)
+            done = chunk is None
+            text = utf8.decode(chunk or b"", final=done)
+            parts.append(text)
+            added += len(text)
+        buffer = "".join(parts)
+        pos = 0
+        return True
+
+    def skip_whitespace() -> None:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer) or not fill():
+                return
+
+    skip_whitespace()
+    if buffer[pos:pos + 1] != "[":
+        raise JSONDecodeError("Expecting '['", buffer, pos)
+    pos += 1
+    skip_whitespace()
+    if buffer[pos:pos + 1] == "]":
+        return
+    while True:
+        skip_whitespace()
+        while True:
+            try:
+                element, end = _decoder.raw_decode(buffer, pos)
+            except JSONDecodeError:
+                # Read at least as much again as is buffered before retrying, so a huge element is parsed O(1) times
+                if fill(max(1, len(buffer) - pos)):
+                    continue
+                raise
+            # A number cut off by the end of the buffer may go on in the next chunk. It may even have parsed as a
+            # shorter number with `.`, `e` or `e-` left over, as with `12.` or `1.5e`, so parse it again with more input
+            is_number = isinstance(element, (int, float)) and not isinstance(element, bool)
+            if not (is_number and _NUMBER_CHARACTERS.issuperset(buffer[end:])) or not fill():
+                break
+        pos = end
+        yield element
+        skip_whitespace()
+        separator = buffer[pos:pos + 1]
+        pos += 1
+        if separator == "]":
+            break
+        if separator != ",":
+            raise JSONDecodeError("Expecting ',' delimiter", buffer, pos - 1)
+    skip_whitespace()
+    if pos < len(buffer):
+        raise JSONDecodeError("Extra data", buffer, pos)
@@ -2,14 +2,27 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ProcessPoolExecutor
 from typing import TYPE_CHECKING, Dict, Literal, cast
 
+import numpy as np
 from numpy import argmax
 from numpy import log as ln
 
+from . import cpmm
+
 if TYPE_CHECKING:  # pragma: no cover
+    from typing import Optional, Tuple
+
+    from numpy.typing import ArrayLike, NDArray
+
     from ..types import Market
 
+# How many candidate bets are evaluated at once when narrowing in on the optimum
+GRID_POINTS = 64
+# How many markets each worker solves at a time when kelly_calc_batch is given a process pool
+PROCESS_CHUNK_SIZE = 10_000
+
 
 def expected_log_wealth(
     market: Market, sub_prob: float, bet: float, outcome: Literal["YES", "NO"], balance: int
@@ -31,51 +44,104 @@ def shares_bought(
 ) -> float:
     """Figure out the number of shares a given purchace yields.
 
-    Returns the number of shares and the resulting pool. This function assumes Manifold Markets are using
-    'Maniswap' as their Automated Market Maker. More on Maniswap
-    can be found here: 'https://manifoldmarkets.notion.site/Maniswap-ce406e1e897d417cbd491071ea8a0c39'.
+    This function assumes Manifold Markets are using 'Maniswap' as their Automated Market Maker; see `cpmm.buy`
+    for the details.
     """
-    # find the probability the market was initialised at
-    p = market.p
-    assert p is not None
-
-    # find the current liquidity pool
-    pool = cast(Dict[Literal['YES', 'NO'], float], market.pool)
-    assert not isinstance(pool, float)
-
-    y = pool['YES']
-    n = pool['NO']
-
-    # implement Maniswap
-    k: float = y**p * n**(1 - p)
+    return float(cpmm.shares(*_pool_state(market), bet, outcome))
 
-    y += bet
-    n += bet
 
-    if outcome == "YES":
-        y2: float = (k / n**(1 - p))**(1 / p)
-        y -= y2
-        shares_without_fees = y
-        post_bet_probability = p * n / (p * n + (1 - p) * y2)
-        fee = 0 * (1 - post_bet_probability) * bet + 0.1
-        shares_after_fees = shares_without_fees - fee
-        return shares_after_fees
-
-    elif outcome == "NO":
-        n2 = (k / y**p)**(1 / (1 - p))
-        n -= n2
-        shares_without_fees = n
-        post_bet_probability = p * n2 / (p * n2 + (1 - p) * y)
-        fee = 0 * post_bet_probability * bet + 0.1
-        shares_after_fees = shares_without_fees - fee
-        return shares_after_fees
-
-    else:
-        raise ValueError("Please give a valid outcome")
+def kelly_calc(market: Market, subjective_prob: float, balance: int) -> tuple[int, Literal["YES", "NO"]]:
+    """For a given binary market, find the bet that maximises expected log wealth.
 
+    This gives the same answer as trying every bet in `range(balance)`, but since expected log wealth is concave in
+    the bet size, it only needs to evaluate a few grids of candidates, each narrowing the bracket around the optimum.
+    """
+    # figure out which option to buy
+    assert market.probability
+    outcome: Literal['YES', 'NO'] = 'YES' if (subjective_prob > market.probability) else 'NO'
 
-def kelly_calc(market: Market, subjective_prob: float, balance: int) -> tuple[int, Literal["YES", "NO"]]:
-    """For a given binary market, find the bet that maximises expected log wealth."""
+    y, n, p = _pool_state(market)
+    kelly_bet = _kelly_bets(
+        *(np.array([x], dtype=np.float64) for x in (y, n, p, subjective_prob, balance)), outcome=outcome
+    )
+    return int(kelly_bet[0]), outcome
+
+
+def kelly_calc_batch(
+    pool_yes: ArrayLike,
+    pool_no: ArrayLike,
+    p: ArrayLike,
+    probability: ArrayLike,
+    subjective_prob: ArrayLike,
+    balance: ArrayLike,
+    processes: Optional[int] = None,
+) -> Tuple[NDArray[np.int64], NDArray[np.str_]]:
+    """Find the kelly bet for many binary markets at once.
+
+    Each argument is an array with one entry per market (`balance` may also be a single number). Returns an array of
+    bets and an array of outcomes, each entry matching what `kelly_calc` would give for that market alone. With
+    `processes` set, large batches are split into chunks that are solved in a pool of that many processes.
+    """
+    inputs = (pool_yes, pool_no, p, probability, subjective_prob, balance)
+    y, n, p_, prob, q, bal = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64).ravel() for x in inputs))
+    if processes is not None and processes > 1 and len(y) > PROCESS_CHUNK_SIZE:
+        chunks = -(-len(y) // PROCESS_CHUNK_SIZE)
+        columns = [np.array_split(column, chunks) for column in (y, n, p_, prob, q, bal)]
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(kelly_calc_batch, *columns))
+        return np.concatenate([r[0] for r in results]), np.concatenate([r[1] for r in results])
+
+    yes = q > prob
+    bets = np.empty(len(y), dtype=np.int64)
+    for outcome, mask in (('YES', yes), ('NO', ~yes)):
+        if mask.any():
+            bets[mask] = _kelly_bets(y[mask], n[mask], p_[mask], q[mask], bal[mask], outcome=outcome)
+    return bets, np.where(yes, 'YES', 'NO')
+
+
+def _kelly_bets(
+    y: NDArray[np.float64],
+    n: NDArray[np.float64],
+    p: NDArray[np.float64],
+    q: NDArray[np.float64],
+    balance: NDArray[np.float64],
+    outcome: Literal["YES", "NO"],
+) -> NDArray[np.int64]:
+    """Find the integer bet in `range(balance)` that maximises expected log wealth, for each market.
+
+    Expected log wealth is concave in the bet size, so rather than trying every bet this evaluates a grid of
+    candidates per market, narrows each bracket to the grid neighbours of its best point, and repeats until the
+    brackets are small enough to scan directly.
+    """
+    if (balance < 1).any():
+        raise ValueError("Balance must be at least 1")
+    lo = np.zeros(len(y), dtype=np.int64)
+    hi = balance.astype(np.int64) - 1
+    steps = np.linspace(0, 1, GRID_POINTS)
+    while True:
+        wide = np.flatnonzero(hi - lo > GRID_POINTS)
+        if not len(wide):
+            break
+        grid = (lo[wide, None] + steps * (hi - lo)[wide, None]).astype(np.int64)
+        values = _expected_log_wealth_array(
+            y[wide, None], n[wide, None], p[wide, None], q[wide, None], grid, outcome, balance[wide, None]
+        )
+        best = argmax(values, axis=1)
+        rows = np.arange(len(wide))
+        # The integer optimum must lie between the grid neighbours of the best grid point
+        lo[wide] = grid[rows, np.maximum(best - 1, 0)]
+        hi[wide] = grid[rows, np.minimum(best + 1, GRID_POINTS - 1)]
+
+    # Brackets narrower than the grid are padded by repeating their top bet, which can't change the argmax
+    bets = np.minimum(lo[:, None] + np.arange(GRID_POINTS + 1), hi[:, None])
+    values = _expected_log_wealth_array(y[:, None], n[:, None], p[:, None], q[:, None], bets, outcome, balance[:, None])
+    return bets[np.arange(len(y)), argmax(values, axis=1)]
+
+
+def _kelly_calc_brute_force(
+    market: Market, subjective_prob: float, balance: int
+) -> tuple[int, Literal["YES", "NO"]]:
+    """Find the kelly bet by trying every bet in `range(balance)`. Kept as a reference for `kelly_calc`."""
     # figure out which option to buy
     assert market.probability
     outcome: Literal['YES', 'NO'] = 'YES' if (subjective_prob > market.probability) else 'NO'
@@ -84,3 +150,31 @@ def kelly_calc(market: Market, subjective_prob: float, balance: int) -> tuple[in
     kelly_bet = argmax([expected_log_wealth(market, subjective_prob, bet, outcome, balance) for bet in range(balance)])
 
     return int(kelly_bet), outcome
+
+
+def _pool_state(market: Market) -> Tuple[float, float, float]:
+    """Get the YES pool, NO pool and initial probability of a Maniswap market."""
+    p = market.p
+    assert p is not None
+    pool = cast(Dict[Literal['YES', 'NO'], float], market.pool)
+    assert not isinstance(pool, float)
+    return pool['YES'], pool['NO'], p
+
+
+def _expected_log_wealth_array(
+    y: ArrayLike,
+    n: ArrayLike,
+    p: ArrayLike,
+    sub_prob: ArrayLike,
+    bet: ArrayLike,
+    outcome: Literal["YES", "NO"],
+    balance: ArrayLike,
+) -> NDArray[np.float64]:
+    """Compute `expected_log_wealth` for arrays of pools and bets at once."""
+    q = np.asarray(sub_prob, dtype=np.float64)
+    bet = np.asarray(bet, dtype=np.float64)
+    kept = balance - bet
+    win = kept + cpmm.shares(y, n, p, bet, outcome)
+    if outcome == 'YES':
+        return cast("NDArray[np.float64]", q * ln(win) + (1 - q) * ln(kept))
+    return cast("NDArray[np.float64]", (1 - q) * ln(win) + q * ln(kept))
@@ -0,0 +1,33 @@
+"""Contains a helper for modules that only import some of their attributes when they're first used."""
+
+from __future__ import annotations
+
+import sys
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Callable, List, Mapping, Tuple
+
+
+def lazy_attributes(
+    module: str, attributes: Mapping[str, str]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Make a ``__getattr__`` and ``__dir__`` for `module`, which import each of `attributes` on first access.
+
+    `attributes` maps each name to the module it's imported from, relative to `module`'s package. Once imported, a
+    name is stored in the module like any other, so later lookups cost nothing extra.
+    """
+    namespace = vars(sys.modules[module])
+
+    def __getattr__(name: str) -> Any:
+        source = attributes.get(name)
+        if source is None:
+            raise AttributeError("module %r has no attribute %r" % (module, name))
+        value = namespace[name] = getattr(import_module(source, namespace["__package__"]), name)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted({*namespace, *attributes})
+
+    return __getattr__, __dir__
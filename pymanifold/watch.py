@@ -0,0 +1,228 @@
+"""Contains a watcher that polls a set of markets and reports what changed, at a cost that follows activity."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field, fields
+from threading import Event
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Dict, List
+
+import requests
+
+from .decoding import decode
+from .types import Bet, LiteMarket, Market
+from .utils.fanout import bounded_map
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Callable, Iterable, Optional, Set, Tuple
+
+    from .lib import ManifoldClient
+
+    Callback = Callable[["MarketChange"], Any]
+
+# The fields compared between snapshots of a market
+_COMPARED_FIELDS = tuple(f.name for f in fields(LiteMarket))
+
+
+@dataclass
+class MarketChange:
+    """What changed about a watched market between two polls."""
+
+    market_id: str
+    # The market as of the previous snapshot, and as just fetched (a `Market` if the watcher fetches full markets)
+    before: LiteMarket
+    after: LiteMarket
+    # The old and new value of each field that changed
+    changes: Dict[str, Tuple[Any, Any]]
+    # The bets on the market seen in the feed since the previous poll, newest first
+    bets: List[Bet] = field(default_factory=list)
+
+    @property
+    def probability_change(self) -> Optional[float]:
+        """Get how far the probability moved, if the market has one."""
+        if self.before.probability is None or self.after.probability is None:
+            return None
+        return self.after.probability - self.before.probability
+
+
+class MarketWatcher:
+    """Polls a set of markets, calling back with a `MarketChange` whenever one of them changes.
+
+    Rather than fetching every watched market on every poll, the watcher reads the global bet feed back to the last
+    bet it saw, and only fetches the watched markets that were bet on since. Those are compared with their last
+    snapshot on `lastUpdatedTime`, `probability` and every other field, and callbacks are only called if something
+    differs. A poll therefore costs one request per page of new bets plus one per active market, however many markets
+    are watched.
+
+    Changes that don't come with a bet, like a resolution or an edited description, are only seen by sweeps, which
+    fetch every watched market; with `sweep_interval` set, one happens at most that many seconds apart. A sweep also
+    happens whenever more than `max_feed_bets` bets arrive between two polls, instead of reading the feed further.
+
+    A market whose fetch fails keeps its old snapshot and is fetched again on the next poll, along with the bets seen
+    on it meanwhile; the error is kept in `errors` until then. `run` carries on through failed polls.
+    """
+
+    def __init__(
+        self,
+        client: ManifoldClient,
+        market_ids: Iterable[str] = (),
+        interval: float = 30.0,
+        full: bool = False,
+        sweep_interval: Optional[float] = None,
+        max_feed_bets: int = 10_000,
+        page_size: int = 200,
+        max_workers: int = 8,
+        clock: Callable[[], float] = monotonic,
+    ):
+        """Initialize a watcher polling every `interval` seconds.
+
+        With `full` set, changed markets are fetched with their bets and comments.
+        """
+        self.client = client
+        self.interval = interval
+        self.full = full
+        self.sweep_interval = sweep_interval
+        self.max_feed_bets = max_feed_bets
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.clock = clock
+        self.callbacks: List[Callback] = []
+        self.snapshots: Dict[str, LiteMarket] = {}
+        self._watched: Set[str] = set()
+        self._last_sweep = float("-inf")
+        # The newest bet seen in the feed: its time, and the ids of every bet seen at that time
+        self._since: Optional[int] = None
+        self._seen: Set[str] = set()
+        # The error of each market whose last fetch failed, and the bets read on it since its last snapshot
+        self.errors: Dict[str, requests.RequestException] = {}
+        self._unreported: Dict[str, List[Bet]] = {}
+        self._stopped = Event()
+        self.watch(market_ids)
+
+    def watch(self, market_ids: Iterable[str]) -> None:
+        """Start watching more markets. They're snapshotted on the next poll, without calling back."""
+        self._watched.update(market_ids)
+
+    def unwatch(self, market_ids: Iterable[str]) -> None:
+        """Stop watching some markets."""
+        for market_id in market_ids:
+            self._watched.discard(market_id)
+            self.snapshots.pop(market_id, None)
+            self.errors.pop(market_id, None)
+            self._unreported.pop(market_id, None)
+
+    def on_change(self, callback: Callback) -> Callback:
+        """Register a function to call with each `MarketChange`. Returns it, so this can be used as a decorator."""
+        self.callbacks.append(callback)
+        return callback
+
+    def poll(self) -> List[MarketChange]:
+        """Check for changes once, calling back for each changed market. Returns the changes."""
+        bets, overflowed = self._read_feed()
+        new = self._watched.difference(self.snapshots)
+        now = self.clock()
+        if overflowed or (self.sweep_interval is not None and now - self._last_sweep >= self.sweep_interval):
+            self._last_sweep = now
+            active = set(self._watched)
+        else:
+            active = new | {bet.contractId for bet in bets if bet.contractId in self._watched}
+        # Markets whose fetch failed last time are tried again
+        active |= self._watched.intersection(self.errors)
+        for bet in bets:
+            if bet.contractId in active:
+                self._unreported.setdefault(bet.contractId, []).append(bet)
+
+        changes = []
+        for market_id, market in bounded_map(self._try_fetch, sorted(active), self.max_workers):
+            if market is None:
+                continue
+            market_bets = self._unreported.pop(market_id, [])
+            before = self.snapshots.get(market_id)
+            self.snapshots[market_id] = market
+            if before is None:
+                continue
+            diff = {
+                name: (getattr(before, name), getattr(market, name))
+                for name in _COMPARED_FIELDS
+                if getattr(before, name) != getattr(market, name)
+            }
+            if diff:
+                # Bets carried over from failed polls were added first, so sort to keep them newest first
+                market_bets.sort(key=lambda bet: -bet.createdTime)
+                changes.append(MarketChange(market_id, before, market, diff, market_bets))
+        for change in changes:
+            for callback in self.callbacks:
+                callback(change)
+        return changes
+
+    def run(self, max_polls: Optional[int] = None) -> None:
+        """Poll every `interval` seconds until `stop` is called, or `max_polls` polls have been made."""
+        self._stopped.clear()
+        polls = 0
+        while not self._stopped.is_set():
+            started = self.clock()
+            try:
+                self.poll()
+            except requests.RequestException:
+                # The feed couldn't be read; nothing was consumed, so the next poll picks up from the same place
+                pass
+            polls += 1
+            if max_polls is not None and polls >= max_polls:
+                return
+            self._stopped.wait(max(0.0, self.interval - (self.clock() - started)))
+
+    def stop(self) -> None:
+        """Make `run` return once the current poll finishes."""
+        self._stopped.set()
+
+    def _read_feed(self) -> Tuple[List[Bet], bool]:
+        """Get the bets made since the last poll, newest first, and whether there were too many to read them all."""
+        limit = 1 if self._since is None else self.max_feed_bets
+        pages = self.client._paginate("/bets", {}, None, limit, self.page_size, prefetch=False)
+        bets: List[Bet] = []
+        read = 0
+        reached = False
+        try:
+            for page in pages:
+                read += len(page)
+                for env in page:
+                    bet = Bet.from_dict(env)
+                    if self._since is not None and bet.createdTime < self._since:
+                        reached = True
+                        break
+                    if bet.id not in self._seen:
+                        bets.append(bet)
+                if reached:
+                    break
+        finally:
+            pages.close()
+
+        if bets and (self._since is None or bets[0].createdTime > self._since):
+            self._since, self._seen = bets[0].createdTime, set()
+        self._seen.update(bet.id for bet in bets if bet.createdTime == self._since)
+        if limit == 1:
+            # The first poll only finds where the feed is up to
+            return [], False
+        return bets, not reached and read >= self.max_feed_bets
+
+    def _try_fetch(self, market_id: str) -> Tuple[str, Optional[LiteMarket]]:
+        """Fetch a market, recording the error instead of raising if that fails."""
+        try:
+            market = self._fetch(market_id)
+        except requests.RequestException as e:
+            self.errors[market_id] = e
+            return market_id, None
+        self.errors.pop(market_id, None)
+        return market_id, market
+
+    def _fetch(self, market_id: str) -> LiteMarket:
+        """Fetch a market, bypassing the client's cache and store since they may be older than the last snapshot."""
+        cls = Market if self.full else LiteMarket
+
+        def checked_decode(response: requests.Response) -> LiteMarket:
+            response.raise_for_status()
+            return decode(response.content, cls)
+
+        market = self.client._fetch("/market/" + market_id, checked_decode)
+        self.client._invalidate_market(market_id)
+        return market
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import TYPE_CHECKING
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from pymanifold.transport import Transport
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
+
+    Response = Union[Tuple[int, Any], Tuple[int, Any, Dict[str, str]]]
+    Route = Union[Response, Callable[["StubRequest"], Response]]
+
+
+class StubRequest:
+    def __init__(self, method: str, path: str, query: Dict[str, List[str]], body: Any, port: int,
+                 headers: Dict[str, str]):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.body = body
+        self.port = port
+        self.headers = headers
+
+
+class StubServer:
+    """A tiny local HTTP server that answers API paths with canned JSON."""
+
+    def __init__(self) -> None:
+        self.routes: Dict[Tuple[str, str], Route] = {}
+        self.requests: List[StubRequest] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _handle(self) -> None:
+                url = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                request = StubRequest(
+                    self.command, url.path, parse_qs(url.query), body, self.client_address[1], dict(self.headers)
+                )
+                stub.requests.append(request)
+                route = stub.routes.get((self.command, url.path))
+                if route is None:
+                    response: Response = (404, {"message": "Not found"})
+                elif callable(route):
+                    response = route(request)
+                else:
+                    response = route
+                status, payload, headers = (*response, {})[:3]
+                data = b"" if status == 304 else json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = _handle
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+        self.thread.start()
+
+    @property
+    def base_uri(self) -> str:
+        return "http://127.0.0.1:%d/api/v0" % self.httpd.server_address[1]
+
+    def route(self, method: str, path: str, response: Route) -> None:
+        self.routes[(method, "/api/v0" + path)] = response
+
+    def close(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def stub_server() -> Iterator[StubServer]:
+    server = StubServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def stub_transport(stub_server: StubServer) -> Iterator[Transport]:
+    with Transport(base_uri=stub_server.base_uri, retries=0) as transport:
+        yield transport
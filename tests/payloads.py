@@ -0,0 +1,153 @@
+"""API payloads and stub routes shared by several test modules.
+
+The synthetic payload builders, shaped like the JSON Manifold returns, are reused by the benchmarks.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pymanifold.types import Market
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Callable, Dict, List, Tuple
+
+    from pymanifold.types import JSONDict
+
+    from .conftest import StubRequest
+
+USER = {
+    "id": "w1knZ6yBvEhRThYPEYTwlmGv7N33",
+    "createdTime": 1655431081524,
+    "name": "Velocity",
+    "username": "v",
+    "url": "https://manifold.markets/v",
+}
+
+MARKET = {
+    "id": "l6jsJPhOWSztXtzqhpU7",
+    "creatorUsername": "v",
+    "creatorName": "Velocity",
+    "createdTime": 1655431081524,
+    "creatorAvatarUrl": None,
+    "closeTime": 4102444800000,
+    "question": "Is this a test?",
+    "tags": [],
+    "outcomeType": "BINARY",
+    "pool": {"YES": 100.0, "NO": 100.0},
+    "volume7Days": 0,
+    "volume24Hours": 0,
+    "isResolved": False,
+    "probability": 0.5,
+    "p": 0.5,
+    "bets": [{"amount": 10, "contractId": "l6jsJPhOWSztXtzqhpU7", "createdTime": 1655431081600, "id": "b1"}],
+    "comments": [],
+}
+
+
+def market(i: int) -> Dict[str, Any]:
+    return dict(MARKET, id="m%d" % i, url="https://manifold.markets/a/slug-%d" % i, createdTime=i, lastUpdatedTime=i,
+                bets=None, comments=None)
+
+
+def bet(i: int, contract: str = "m1", username: str = "u") -> Dict[str, Any]:
+    return {"amount": i, "contractId": contract, "createdTime": i, "id": "b%d" % i, "userUsername": username,
+            "userId": username + "-id"}
+
+
+def newest_first(items: List[Dict[str, Any]]) -> Callable[[StubRequest], Tuple[int, Any]]:
+    """Serve `items` like a paginated listing endpoint: newest first, honouring `limit` and `before`."""
+    def serve(request: StubRequest) -> Tuple[int, Any]:
+        ordered = sorted(items, key=lambda item: -item["createdTime"])
+        start = 0
+        if "before" in request.query:
+            start = [item["id"] for item in ordered].index(request.query["before"][0]) + 1
+        return 200, ordered[start:start + int(request.query.get("limit", ["1000"])[0])]
+    return serve
+
+
+START_TIME = 1655431081524
+
+
+def bet_payload(i: int, contract_id: str = "contract0") -> JSONDict:
+    """Build the JSON for the `i`th bet on a market."""
+    prob = 0.5 + 0.4 * ((i * 7919) % 1000 - 500) / 500
+    return {
+        "id": "bet%07d" % i,
+        "contractId": contract_id,
+        "createdTime": START_TIME + 1000 * i,
+        "amount": 10 + i % 90,
+        "loanAmount": 0,
+        "userId": "user%04d" % (i % 500),
+        "userAvatarUrl": "https://example.com/avatar.png",
+        "userUsername": "user%04d" % (i % 500),
+        "userName": "User %d" % (i % 500),
+        "outcome": "YES" if i % 2 else "NO",
+        "shares": 12.5,
+        "probBefore": prob,
+        "probAfter": min(prob + 0.01, 0.99),
+        "isCancelled": False,
+        "isFilled": True,
+        "isAnte": False,
+        "isRedemption": False,
+        "fees": {"creatorFee": 0, "platformFee": 0, "liquidityFee": 0},
+        "fills": [{"matchedBetId": None, "amount": 10, "shares": 12.5, "timestamp": START_TIME + 1000 * i}],
+    }
+
+
+def comment_payload(i: int, contract_id: str = "contract0") -> JSONDict:
+    """Build the JSON for the `i`th comment on a market."""
+    return {
+        "id": "comment%07d" % i,
+        "contractId": contract_id,
+        "createdTime": START_TIME + 1000 * i,
+        "text": "Comment number %d" % i,
+        "userId": "user%04d" % (i % 500),
+        "userName": "User %d" % (i % 500),
+        "userAvatarUrl": "https://example.com/avatar.png",
+        "userUsername": "user%04d" % (i % 500),
+    }
+
+
+def lite_market_payload(i: int) -> JSONDict:
+    """Build the JSON for the `i`th market in a listing."""
+    p = 0.2 + 0.6 * ((i * 104729) % 1000) / 1000
+    return {
+        "id": "contract%d" % i,
+        "creatorId": "user%04d" % (i % 500),
+        "creatorUsername": "user%04d" % (i % 500),
+        "creatorName": "User %d" % (i % 500),
+        "createdTime": START_TIME + 60000 * i,
+        "creatorAvatarUrl": "https://example.com/avatar.png",
+        "closeTime": START_TIME + 60000 * i + 86400000 * (1 + i % 365),
+        "question": "Will synthetic market %d resolve YES?" % i,
+        "description": "A synthetic market.",
+        "tags": ["synthetic"],
+        "url": "https://manifold.markets/user%04d/synthetic-market-%d" % (i % 500, i),
+        "outcomeType": "BINARY",
+        "mechanism": "cpmm-1",
+        "pool": {"YES": 100.0 + i % 900, "NO": 100.0 + (i * 31) % 900},
+        "p": p,
+        "totalLiquidity": 100.0 + i % 1000,
+        "probability": 0.5,
+        "volume": 1000.0 + i % 10000,
+        "volume7Days": 100.0 + i % 700,
+        "volume24Hours": 10.0 + i % 100,
+        "isResolved": False,
+        "lastUpdatedTime": START_TIME + 60000 * i + 1000,
+    }
+
+
+def market_payload(i: int, bets: int = 0, comments: int = 0) -> JSONDict:
+    """Build the JSON for the full `i`th market, with its bets and comments."""
+    env = lite_market_payload(i)
+    env["bets"] = [bet_payload(j, str(env["id"])) for j in range(bets)]
+    env["comments"] = [comment_payload(j, str(env["id"])) for j in range(comments)]
+    return env
+
+
+def make_market(yes: float, no: float, p: float) -> Market:
+    """Build a binary Maniswap market with the given pool."""
+    env = market_payload(0)
+    env.update(pool={"YES": yes, "NO": no}, p=p, probability=p * no / (p * no + (1 - p) * yes))
+    return Market.from_dict(env)
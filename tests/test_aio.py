@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from threading import Lock
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pymanifold import AsyncManifoldClient
+
+from .payloads import MARKET, USER
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Tuple
+
+    from .conftest import StubRequest, StubServer
+
+pytest.importorskip("aiohttp")
+
+def test_reads(stub_server: StubServer) -> None:
+    stub_server.route("GET", "/user/v", (200, USER))
+    stub_server.route("GET", "/markets", (200, [MARKET, MARKET]))
+    stub_server.route("GET", "/market/" + MARKET["id"], (200, MARKET))
+
+    async def main() -> None:
+        async with AsyncManifoldClient(base_uri=stub_server.base_uri) as client:
+            user, markets, market = await asyncio.gather(
+                client.get_user("v"), client.list_markets(limit=2), client.get_market_by_id(MARKET["id"])
+            )
+        assert user.username == "v"
+        assert [m.id for m in markets] == [MARKET["id"]] * 2
+        assert market.bets[0].id == "b1"
+
+    asyncio.run(main())
+    (listing,) = [r for r in stub_server.requests if r.path.endswith("/markets")]
+    assert listing.query == {"limit": ["2"]}
+
+
+def test_writes(stub_server: StubServer) -> None:
+    stub_server.route("GET", "/market/" + MARKET["id"], (200, MARKET))
+    stub_server.route("POST", "/bet", (200, {"betId": "abc"}))
+    stub_server.route("POST", "/market/" + MARKET["id"] + "/resolve", (200, {}))
+
+    async def main() -> None:
+        async with AsyncManifoldClient(api_key="key", base_uri=stub_server.base_uri) as client:
+            assert await client.create_bet(MARKET["id"], 10, "YES", limitProb=0.4) == "abc"
+            await client.resolve_market(MARKET["id"], 100)
+
+    asyncio.run(main())
+    bet, _, resolve = stub_server.requests
+    assert bet.headers["Authorization"] == "Key key"
+    assert bet.body == {"amount": 10, "contractId": MARKET["id"], "outcome": "YES", "limitProb": 0.4}
+    assert resolve.body == {"outcome": "YES"}
+
+
+def test_write_errors_raise(stub_server: StubServer) -> None:
+    import aiohttp
+
+    stub_server.route("POST", "/bet", (400, {"message": "Insufficient balance"}))
+
+    async def main() -> None:
+        async with AsyncManifoldClient(api_key="key", base_uri=stub_server.base_uri) as client:
+            await client.create_bet(MARKET["id"], 10, "YES")
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        asyncio.run(main())
+
+
+def test_bounded_concurrency(stub_server: StubServer) -> None:
+    lock = Lock()
+    in_flight = [0, 0]  # current, peak
+
+    def slow(request: StubRequest) -> Tuple[int, Any]:
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        time.sleep(0.02)
+        with lock:
+            in_flight[0] -= 1
+        return 200, USER
+
+    stub_server.route("GET", "/user/v", slow)
+
+    async def main() -> None:
+        async with AsyncManifoldClient(base_uri=stub_server.base_uri, max_concurrency=4) as client:
+            users = await asyncio.gather(*(client.get_user("v") for _ in range(20)))
+        assert len(users) == 20
+
+    asyncio.run(main())
+    assert 1 < in_flight[1] <= 4
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from benchmarks import suite
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pathlib import Path
+
+
+def test_suite_flags_regressions(tmp_path: Path) -> None:
+    (case,) = [case for case in suite.CASES if case.name == "number_to_prob_cpmm1"]
+    results = suite.run([case], max_size=10, calibration=1.0)
+    assert [(r.case, r.size) for r in results] == [(case.name, 1), (case.name, 10)]
+    assert all(r.seconds == r.relative > 0 for r in results)
+
+    path = tmp_path / "baselines.json"
+    suite.save_baselines(results[:1], path)
+    suite.save_baselines([results[1]._replace(relative=2.0)], path)
+    baselines = suite.load_baselines(path)
+    assert baselines[case.name]["10"] == 2.0 and "1" in baselines[case.name]
+
+    slower = [r._replace(relative=baselines[r.case][str(r.size)] * 1.5) for r in results]
+    assert suite.compare(slower, baselines, threshold=0.6) == []
+    assert suite.compare(slower, baselines, threshold=0.3) == [
+        "number_to_prob_cpmm1 at 1: 50% slower than baseline",
+        "number_to_prob_cpmm1 at 10: 50% slower than baseline",
+    ]
+    assert suite.compare(slower, {}, threshold=0.3) == []
+
+
+def test_baselines_cover_every_case() -> None:
+    baselines = suite.load_baselines()
+    for case in suite.CASES:
+        assert [int(size) for size in baselines[case.name]] == [s for s in suite.SIZES if s <= case.max_size]
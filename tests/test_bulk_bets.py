@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import pytest
+import requests
+
+from pymanifold import AsyncManifoldClient, ManifoldClient
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, List, Tuple
+
+    from pymanifold.transport import Transport
+
+    from .conftest import StubRequest, StubServer
+
+ORDERS = [("m%d" % (i % 3), 10 + i, "YES") for i in range(12)] + [("bad", 1, "NO", 0.5)]
+
+
+class Exchange:
+    """Answers POST /bet slowly, tracking how many bets are in flight and the order each market saw them in."""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = self.peak = 0
+        self.seen: List[Tuple[str, int]] = []
+
+    def __call__(self, request: StubRequest) -> Tuple[int, Any]:
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+            self.seen.append((request.body["contractId"], request.body["amount"]))
+        if request.body["contractId"] == "bad":
+            return 400, {"message": "Market not found"}
+        return 200, {"betId": "bet-%d" % request.body["amount"]}
+
+    def order_on(self, contract: str) -> List[int]:
+        return [amount for contract_id, amount in self.seen if contract_id == contract]
+
+
+@pytest.mark.parametrize("ordered_per_market", [False, True])
+def test_create_bets(stub_server: StubServer, stub_transport: Transport, ordered_per_market: bool) -> None:
+    exchange = Exchange()
+    stub_server.route("POST", "/bet", exchange)
+    client = ManifoldClient("key", transport=stub_transport)
+    results = client.create_bets(ORDERS, max_in_flight=4, ordered_per_market=ordered_per_market)
+
+    assert [r.betId for r in results[:-1]] == ["bet-%d" % (10 + i) for i in range(12)]
+    assert all(r.ok for r in results[:-1])
+    assert not results[-1].ok and results[-1].betId is None and results[-1].limitProb == 0.5
+    assert isinstance(results[-1].error, requests.HTTPError)
+    assert 1 < exchange.peak <= 4
+    if ordered_per_market:
+        assert exchange.order_on("m1") == [11, 14, 17, 20]
+
+
+def test_async_create_bets(stub_server: StubServer) -> None:
+    pytest.importorskip("aiohttp")
+    exchange = Exchange()
+    stub_server.route("POST", "/bet", exchange)
+
+    async def main(**kwargs: Any) -> List[Any]:
+        async with AsyncManifoldClient("key", base_uri=stub_server.base_uri) as client:
+            return await client.create_bets(ORDERS, **kwargs)
+
+    results = asyncio.run(main(max_in_flight=4))
+    assert [r.betId for r in results[:-1]] == ["bet-%d" % (10 + i) for i in range(12)]
+    assert not results[-1].ok
+    assert 1 < exchange.peak <= 4
+
+    exchange.seen.clear()
+    asyncio.run(main(max_in_flight=8, ordered_per_market=True))
+    assert exchange.order_on("m2") == [12, 15, 18, 21]
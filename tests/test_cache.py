@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pymanifold import ManifoldClient, ResponseCache
+
+from .payloads import USER, market_payload
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Tuple
+
+    from pymanifold.transport import Transport
+
+    from .conftest import Response, StubRequest, StubServer
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_fresh_entries_are_served_from_cache(stub_server: StubServer, stub_transport: Transport) -> None:
+    stub_server.route("GET", "/user/v", (200, USER))
+    clock = Clock()
+    client = ManifoldClient(transport=stub_transport, cache=ResponseCache(ttls={"user": 10}, clock=clock))
+    for _ in range(3):
+        assert client.get_user("v").username == "v"
+    assert len(stub_server.requests) == 1
+
+    clock.now = 11
+    client.get_user("v")
+    assert len(stub_server.requests) == 2
+    assert client.cache is not None
+    assert client.cache.stats() == {"hits": 2, "misses": 2, "revalidations": 0, "evictions": 0, "size": 1}
+
+
+def test_stale_entries_are_revalidated(stub_server: StubServer, stub_transport: Transport) -> None:
+    def serve(request: StubRequest) -> Response:
+        if request.headers.get("If-None-Match") == '"v1"':
+            return 304, None
+        return 200, market_payload(0, bets=2), {"ETag": '"v1"'}
+
+    stub_server.route("GET", "/market/contract0", serve)
+    clock = Clock()
+    cache = ResponseCache(clock=clock)
+    client = ManifoldClient(transport=stub_transport, cache=cache)
+    first = client.get_market_by_id("contract0")
+    clock.now = 100
+    second = client.get_market_by_id("contract0")
+    assert second == first
+    assert second is not first
+    assert [r.headers.get("If-None-Match") for r in stub_server.requests] == [None, '"v1"']
+    assert cache.revalidations == 1
+
+    client.get_market_by_id("contract0")
+    assert len(stub_server.requests) == 2
+
+
+def test_lru_eviction(stub_server: StubServer, stub_transport: Transport) -> None:
+    def serve(request: StubRequest) -> Tuple[int, Any]:
+        return 200, dict(USER, username=request.path.rsplit("/", 1)[1])
+
+    for name in "abc":
+        stub_server.route("GET", "/user/" + name, serve)
+    cache = ResponseCache(maxsize=2)
+    client = ManifoldClient(transport=stub_transport, cache=cache)
+    for name in "abac":
+        client.get_user(name)
+    assert cache.evictions == 1
+    client.get_user("a")
+    client.get_user("b")
+    assert [r.path.rsplit("/", 1)[1] for r in stub_server.requests] == ["a", "b", "c", "b"]
+
+
+def test_bets_invalidate_market(stub_server: StubServer, stub_transport: Transport) -> None:
+    stub_server.route("GET", "/market/contract0", (200, market_payload(0)))
+    stub_server.route("POST", "/bet", (200, {"betId": "bet0"}))
+    client = ManifoldClient(api_key="key", transport=stub_transport, cache=ResponseCache())
+    client.get_market_by_id("contract0")
+    client.create_bet("contract0", 10, "YES")
+    client.get_market_by_id("contract0")
+    assert [r.method for r in stub_server.requests] == ["GET", "POST", "GET"]
+
+
+def test_bets_invalidate_market_looked_up_by_slug(stub_server: StubServer, stub_transport: Transport) -> None:
+    market = market_payload(0)
+    stub_server.route("GET", "/slug/" + market["url"].split("/")[-1], (200, market))
+    stub_server.route("POST", "/bet", (200, {"betId": "bet0"}))
+    client = ManifoldClient(api_key="key", transport=stub_transport, cache=ResponseCache())
+    client.get_market_by_url(market["url"])
+    client.get_market_by_url(market["url"])
+    client.create_bet("contract0", 10, "YES")
+    client.get_market_by_url(market["url"])
+    assert [r.method for r in stub_server.requests] == ["GET", "POST", "GET"]
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from pymanifold.utils import cpmm
+
+
+def reference_buy(y: float, n: float, p: float, bet: float, outcome: str) -> cpmm.Trade:
+    """Buy shares the way `kelly.shares_bought` used to, one bet at a time."""
+    k = y**p * n**(1 - p)
+    y, n = y + bet, n + bet
+    if outcome == "YES":
+        y2 = (k / n**(1 - p))**(1 / p)
+        prob = p * n / (p * n + (1 - p) * y2)
+        return cpmm.Trade(y - y2 - 0.1, prob, y2, n, 0.1)
+    n2 = (k / y**p)**(1 / (1 - p))
+    prob = p * n2 / (p * n2 + (1 - p) * y)
+    return cpmm.Trade(n - n2 - 0.1, prob, y, n2, 0.1)
+
+
+def random_bets(size: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return (
+        rng.uniform(5, 5000, size),
+        rng.uniform(5, 5000, size),
+        rng.uniform(0.05, 0.95, size),
+        rng.uniform(1, 1000, size),
+        rng.choice(["YES", "NO"], size),
+    )
+
+
+def test_buy_matches_reference() -> None:
+    y, n, p, amount, outcome = random_bets(200)
+    trade = cpmm.buy(y, n, p, amount, outcome)
+    expected = np.array([reference_buy(*args) for args in zip(y, n, p, amount, outcome)])
+    np.testing.assert_allclose(np.column_stack(trade), expected, rtol=1e-9)
+    np.testing.assert_allclose(cpmm.shares(y, n, p, amount, outcome), trade.shares, rtol=1e-12)
+
+
+def test_buy_keeps_invariant() -> None:
+    y, n, p, amount, outcome = random_bets(50, seed=1)
+    trade = cpmm.buy(y, n, p, amount, outcome)
+    np.testing.assert_allclose(trade.pool_yes**p * trade.pool_no**(1 - p), y**p * n**(1 - p), rtol=1e-9)
+    np.testing.assert_allclose(trade.probability, cpmm.probability(trade.pool_yes, trade.pool_no, p))
+    assert ((trade.probability > cpmm.probability(y, n, p)) == (outcome == "YES")).all()
+
+
+def test_buy_broadcasts_single_outcome() -> None:
+    trade = cpmm.buy(1000.0, 800.0, 0.5, np.arange(1, 6), "NO", fee_rate=0.01)
+    assert trade.shares.shape == (5,)
+    for i, amount in enumerate(range(1, 6)):
+        prob = reference_buy(1000.0, 800.0, 0.5, amount, "NO").probability
+        assert trade.fees[i] == pytest.approx(0.01 * prob * amount + 0.1)
+
+
+def test_invalid_outcome() -> None:
+    with pytest.raises(ValueError):
+        cpmm.buy(100, 100, 0.5, 10, "MAYBE")
+    with pytest.raises(ValueError):
+        cpmm.shares(100, 100, 0.5, [10, 10], ["YES", "MAYBE"])
+
+
+def test_simulate_matches_sequential_buys() -> None:
+    rng = np.random.default_rng(2)
+    amounts = rng.uniform(1, 100, 300)
+    # Long runs of one outcome, as well as single bets between them
+    outcomes = np.repeat(["YES", "NO", "YES", "NO", "YES"], [100, 1, 50, 120, 29])
+    trade = cpmm.simulate(1000.0, 800.0, 0.3, amounts, outcomes, fee_rate=0.01)
+
+    y, n = 1000.0, 800.0
+    for i, (amount, outcome) in enumerate(zip(amounts, outcomes)):
+        step = cpmm.buy(y, n, 0.3, amount, outcome, fee_rate=0.01)
+        assert trade.shares[i] == pytest.approx(step.shares, rel=1e-9)
+        assert trade.probability[i] == pytest.approx(step.probability, rel=1e-9)
+        assert trade.fees[i] == pytest.approx(step.fees, rel=1e-9)
+        y, n = float(step.pool_yes), float(step.pool_no)
+    assert (trade.pool_yes[-1], trade.pool_no[-1]) == pytest.approx((y, n), rel=1e-9)
+
+
+def test_simulate_empty() -> None:
+    trade = cpmm.simulate(100.0, 100.0, 0.5, [], [])
+    assert all(len(column) == 0 for column in trade)
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+import pymanifold.decoding
+from pymanifold import ManifoldClient
+from pymanifold.decoding import decode, decode_list
+from pymanifold.types import Bet, Comment, Group, LiteMarket, LiteUser, Market, MarketMetadata
+
+from .payloads import USER, bet_payload, lite_market_payload, market_payload
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pymanifold.transport import Transport
+
+    from .conftest import StubServer
+
+
+@pytest.fixture(params=[True, False], ids=["msgspec", "json"])
+def backend(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> None:
+    if request.param:
+        pytest.importorskip("msgspec")
+    monkeypatch.setattr(pymanifold.decoding, "AVAILABLE", request.param)
+
+
+@pytest.mark.usefixtures("backend")
+def test_matches_from_dict() -> None:
+    market = market_payload(0, bets=5, comments=2)
+    market["bets"][1]["amount"] = 2.5  # type: ignore[index]  # the API doesn't always send what types.py says
+    cases = [(Market, market), (LiteMarket, market), (MarketMetadata, market), (LiteUser, USER)]
+    for cls, env in cases:
+        decoded = decode(json.dumps(env).encode(), cls)  # type: ignore[type-var]
+        assert type(decoded) is cls
+        assert decoded == cls.from_dict(env)  # type: ignore[attr-defined]
+    full = decode(json.dumps(market).encode(), Market)
+    assert "bets" not in vars(full) and "comments" not in vars(full)  # decoded on first access, as by from_dict
+    assert [type(b) for b in full.bets] == [Bet] * 5 and type(full.comments[0]) is Comment
+
+    groups = [{"id": "g%d" % i, "name": "G", "contractIds": ["c"]} for i in range(3)]
+    assert decode_list(json.dumps(groups).encode(), Group) == [Group.from_dict(g) for g in groups]
+    bets = [bet_payload(i) for i in range(10)]
+    assert decode_list(json.dumps(bets).encode(), Bet) == [Bet.from_dict(b) for b in bets]
+
+
+@pytest.mark.usefixtures("backend")
+def test_falls_back_on_payloads_the_schema_rejects() -> None:
+    assert decode(json.dumps(dict(market_payload(0), bets=None)).encode(), Market).bets == []
+    with pytest.raises(TypeError):
+        decode(b'{"id": "b1"}', Bet)
+
+
+def test_client_decodes_responses(stub_server: StubServer, stub_transport: Transport) -> None:
+    stub_server.route("GET", "/market/contract0", (200, market_payload(0, bets=3)))
+    stub_server.route("GET", "/markets", (200, [lite_market_payload(i) for i in range(3)]))
+    client = ManifoldClient(transport=stub_transport)
+    market = client.get_market_by_id("contract0")
+    assert type(market) is Market and len(market.bets) == 3
+    assert type(client.get_market_by_id("contract0", lite=True)) is LiteMarket
+    assert [type(m) for m in client.get_markets()] == [LiteMarket] * 3
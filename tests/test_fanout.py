@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import time
+from threading import Lock
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pymanifold import ManifoldClient
+from pymanifold.types import Group
+from pymanifold.utils.fanout import bounded_map, unique
+
+from .payloads import market_payload
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Tuple
+
+    from pymanifold.transport import Transport
+
+    from .conftest import StubRequest, StubServer
+
+
+class Tracker:
+    def __init__(self) -> None:
+        self.lock = Lock()
+        self.running = self.peak = self.calls = 0
+
+    def __call__(self, item: int) -> int:
+        with self.lock:
+            self.calls += 1
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(0.001 * (item % 5))
+        with self.lock:
+            self.running -= 1
+        return item * 2
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_bounded_map_ordered(max_workers: int) -> None:
+    tracker = Tracker()
+    assert list(bounded_map(tracker, range(40), max_workers=max_workers)) == [i * 2 for i in range(40)]
+    assert tracker.peak <= max_workers
+
+
+def test_bounded_map_unordered() -> None:
+    assert sorted(bounded_map(Tracker(), range(40), max_workers=4, ordered=False)) == [i * 2 for i in range(40)]
+
+
+def test_bounded_map_backpressure() -> None:
+    tracker = Tracker()
+    results = bounded_map(tracker, range(1000), max_workers=4, max_pending=6)
+    assert next(results) == 0
+    time.sleep(0.05)
+    assert tracker.calls <= 7
+    results.close()
+
+
+def test_unique() -> None:
+    assert list(unique(["b", "a", "b", "c", "a"])) == ["b", "a", "c"]
+
+
+def test_group_contracts_concurrent(stub_server: StubServer, stub_transport: Transport) -> None:
+    def serve_market(request: StubRequest) -> Tuple[int, Any]:
+        return 200, market_payload(int(request.path.rsplit("contract", 1)[1]))
+
+    ids = ["contract%d" % i for i in (3, 1, 4, 1, 5, 9, 2, 6)]
+    for id_ in set(ids):
+        stub_server.route("GET", "/market/" + id_, serve_market)
+    group = Group(contractIds=ids)
+    client = ManifoldClient(transport=stub_transport)
+
+    markets = list(group.contracts(client))
+    assert [m.id for m in markets] == ids
+    assert len(stub_server.requests) == 8
+
+    markets = list(group.contracts(client, max_workers=4, dedup=True))
+    assert [m.id for m in markets] == list(unique(ids))
+    assert len(stub_server.requests) == 15
+
+    markets = list(group.contracts(client, max_workers=4, ordered=False))
+    assert sorted(m.id for m in markets) == sorted(ids)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from pymanifold import ManifoldClient, ManifoldStore, MarketFrame
+from pymanifold.types import LiteMarket
+
+from .payloads import START_TIME, lite_market_payload, newest_first
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Dict, List
+
+    from pymanifold.transport import Transport
+
+    from .conftest import StubServer
+
+DAY = 86_400_000
+
+NOW = START_TIME + 30 * DAY
+
+
+def payloads(n: int) -> List[Dict[str, Any]]:
+    markets = [lite_market_payload(i) for i in range(n)]
+    markets[1]["isResolved"] = True
+    markets[2]["closeTime"] = None
+    markets[3].update(outcomeType="FREE_RESPONSE", pool={"answer0": 50.0}, probability=None, p=None)
+    markets[4]["volume7Days"] = 0
+    return markets
+
+
+def test_market_frame_columns() -> None:
+    markets = payloads(10)
+    frame = MarketFrame.from_pages([markets[:4], markets[4:]], now=NOW)
+
+    assert len(frame) == 10
+    assert frame["createdTime"].tolist() == [m["createdTime"] for m in markets]
+    assert np.isnan(frame["closeTime"][2])
+    assert frame["poolYes"][0] == markets[0]["pool"]["YES"]
+    assert np.isnan(frame["poolYes"][3])
+    assert frame["outcomeType"][3] == "FREE_RESPONSE"
+    assert frame.codes("resolution")[0] == -1
+    assert frame[5] == LiteMarket.from_dict(markets[5])
+    assert [market.id for market in frame[:2]] == ["contract0", "contract1"]
+
+
+def test_market_frame_derived_columns() -> None:
+    markets = payloads(10)
+    frame = MarketFrame.from_dicts(markets, now=NOW)
+    m = markets[0]
+    pool, p = m["pool"], m["p"]
+
+    assert frame["odds"][0] == pytest.approx(m["probability"] / (1 - m["probability"]))
+    assert frame["liquidity"][0] == pytest.approx(pool["YES"] ** p * pool["NO"] ** (1 - p))
+    assert frame["timeToClose"][0] == m["closeTime"] - NOW
+    assert frame["volumeRatio"][0] == pytest.approx(7 * m["volume24Hours"] / m["volume7Days"])
+    assert frame["turnover"][0] == pytest.approx(m["volume24Hours"] / frame["liquidity"][0])
+    assert np.isnan(frame["liquidity"][3]) and np.isnan(frame["odds"][3]) and np.isnan(frame["volumeRatio"][4])
+
+    closed = frame["closeTime"] <= NOW
+    assert closed.any()
+    expected = ~closed & np.array([not m["isResolved"] for m in markets])
+    assert frame["isOpen"].tolist() == expected.tolist()
+    assert frame["isOpen"][2]
+
+
+def test_market_frame_filter_and_rank() -> None:
+    frame = MarketFrame.from_dicts(payloads(500), now=NOW)
+    markets = frame.to_markets()
+
+    found = frame.filter(isOpen=True, outcomeType="BINARY", liquidity=(150, None), volumeRatio=(None, 5))
+    assert len(found) > 0
+    assert (found["liquidity"] >= 150).all() and (found["volumeRatio"] <= 5).all() and found["isOpen"].all()
+    assert set(found["outcomeType"]) == {"BINARY"}
+    assert len(frame.filter(outcomeType=["BINARY", "FREE_RESPONSE"])) == 500
+    assert len(frame.filter(id="missing")) == 0
+
+    top = frame.rank("turnover", n=10)
+    order = np.argsort(-np.nan_to_num(frame["turnover"], nan=-np.inf), kind="stable")
+    expected = [markets[i].id for i in order[:10]]
+    assert top["id"].tolist() == expected
+    assert np.all(np.diff(top["turnover"]) <= 0)
+
+    ranked = frame.rank("liquidity", ascending=True)
+    assert np.all(np.diff(ranked["liquidity"][:-1]) >= 0)
+    assert np.isnan(ranked["liquidity"][-1])
+    assert len(frame.rank("liquidity", n=0)) == 0
+    assert len(frame.rank("liquidity", n=1000)) == 500
+
+
+def test_get_market_frame(stub_server: StubServer, stub_transport: Transport) -> None:
+    markets = [lite_market_payload(i) for i in range(5)]
+    stub_server.route("GET", "/markets", newest_first(markets))
+    client = ManifoldClient(transport=stub_transport)
+    frame = client.get_market_frame(page_size=2, now=NOW)
+    assert frame["id"].tolist() == ["contract4", "contract3", "contract2", "contract1", "contract0"]
+    assert frame.now == NOW
+
+    store = ManifoldStore()
+    store.add_markets(markets)
+    assert store.market_frame(now=NOW)["id"].tolist() == frame["id"].tolist()
+    assert store.market_frame(creator="user0001")["id"].tolist() == ["contract1"]
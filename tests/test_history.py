@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from pymanifold import ProbabilityHistory
+from pymanifold.types import Bet, BetFrame, Market
+
+from .payloads import START_TIME, bet_payload, market_payload
+
+
+def reference_at(bets: list[Bet], t: int) -> float:
+    """Find the probability at a time by walking the bets, oldest first."""
+    ordered = sorted(bets, key=lambda bet: bet.createdTime)
+    prob = ordered[0].probBefore
+    for bet in ordered:
+        if bet.createdTime > t:
+            break
+        prob = bet.probAfter
+    return prob
+
+
+def test_at_matches_walk() -> None:
+    # The API lists bets newest first
+    bets = Market.from_dict(market_payload(0, bets=50)).bets[::-1]
+    history = ProbabilityHistory.from_bets(bets)
+    times = np.arange(START_TIME - 5000, START_TIME + 60_000, 700)
+    assert history.at(times).tolist() == [reference_at(bets, t) for t in times]
+    assert history.at(START_TIME + 3000) == bets[-4].probAfter
+
+
+def test_many_contracts() -> None:
+    payloads = [bet_payload(i, "c%d" % (i % 3)) for i in range(60)]
+    frame = BetFrame.from_dicts(payloads)
+    history = ProbabilityHistory.from_frame(frame)
+    assert history.contracts == ["c0", "c1", "c2"]
+    times = np.arange(START_TIME, START_TIME + 60_000, 1500)
+    probs = history.at(times)
+    assert probs.shape == (3, len(times))
+    for i, contract in enumerate(history.contracts):
+        bets = [bet for bet in frame.to_bets() if bet.contractId == contract]
+        assert probs[i].tolist() == [reference_at(bets, t) for t in times]
+        assert history[contract].at(times).tolist() == probs[i].tolist()
+
+
+def test_resample() -> None:
+    frame = BetFrame.from_dicts([bet_payload(i) for i in range(20)])
+    history = ProbabilityHistory.from_frame(frame)
+    resampled = history.resample(5000)
+    # The last sample is the first at or after the last bet
+    assert resampled.times.tolist() == list(range(START_TIME, START_TIME + 25_000, 5000))
+    assert resampled.probability.tolist() == history.at(resampled.times).tolist()
+    amounts = frame["amount"]
+    assert resampled.volume.tolist() == [amounts[0], *(amounts[i - 4:i + 1].sum() for i in (5, 10, 15, 20))]
+    # Everything traded in range is counted once
+    everything = history.resample(3000, START_TIME - 3000, START_TIME + 30_000)
+    assert everything.volume.sum() == amounts.sum()
+    assert np.isnan(ProbabilityHistory.from_bets([]).at([START_TIME])).all()
+    with pytest.raises(ValueError):
+        ProbabilityHistory.from_bets([]).resample(1000)
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import pytest
+
+import pymanifold
+from pymanifold import frame, history, types, utils
+from pymanifold.utils import kelly
+
+from benchmarks.bench_import import HEAVY_MODULES, best_import_time, import_time
+
+
+def test_import_loads_no_heavy_modules() -> None:
+    _, modules = import_time("import pymanifold")
+    assert "pymanifold" in modules
+    assert not modules.intersection(HEAVY_MODULES)
+
+    _, modules = import_time("from pymanifold import ManifoldClient, ManifoldStore, MarketWatcher")
+    assert not modules.intersection(HEAVY_MODULES)
+
+
+def test_heavy_modules_load_on_first_use() -> None:
+    _, modules = import_time("import pymanifold; pymanifold.BetFrame")
+    assert "numpy" in modules
+    _, modules = import_time("from pymanifold.utils import kelly_calc")
+    assert "numpy" in modules
+
+
+def test_import_time() -> None:
+    # Which modules get loaded is what's really guarded, above; this bound is loose enough for a loaded CI machine and
+    # only catches something pathological
+    seconds, _ = best_import_time("import pymanifold", repeat=3)
+    assert seconds < 1.0
+
+
+def test_lazy_attributes() -> None:
+    assert pymanifold.BetFrame is frame.BetFrame
+    assert pymanifold.ProbabilityHistory is history.ProbabilityHistory
+    assert types.BetFrame is frame.BetFrame
+    assert utils.kelly_calc is kelly.kelly_calc
+    assert {"BetFrame", "AsyncManifoldClient", "ProbabilityHistory"} <= set(dir(pymanifold))
+    assert "kelly_calc_batch" in dir(utils)
+    with pytest.raises(AttributeError):
+        pymanifold.NotAThing
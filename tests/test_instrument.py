@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import json
+import random
+from typing import TYPE_CHECKING
+
+import pytest
+import requests
+
+from pymanifold import ManifoldClient, MetricsRecorder, RateLimiter, Transport
+from pymanifold.instrument import Histogram, endpoint_of
+
+from .payloads import MARKET
+from .test_ratelimit import throttled_once
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import List
+
+    from pymanifold import RequestRecord
+
+    from .conftest import StubServer
+
+
+def test_records(stub_server: StubServer) -> None:
+    stub_server.route("GET", "/market/m1", (200, MARKET))
+    stub_server.route("GET", "/user/v", throttled_once())
+    stub_server.route("POST", "/bet", (200, {"betId": "b1"}))
+    records: List[RequestRecord] = []
+    recorder = MetricsRecorder()
+    with Transport(
+        base_uri=stub_server.base_uri, retries=0, rate_limiter=RateLimiter(), instruments=[records.append, recorder]
+    ) as transport:
+        client = ManifoldClient("key", transport=transport)
+        client.get_market_by_id("m1")
+        client.get_user("v")
+        client.create_bet("m1", 10, "YES")
+
+    market, user, bet = records
+    assert (market.method, market.path, market.endpoint, market.status) == ("GET", "/market/m1", "/market/{id}", 200)
+    assert market.bytes == len(json.dumps(MARKET).encode())
+    assert market.latency > 0 and market.decode_time is not None and market.retries == 0
+    assert (user.endpoint, user.status, user.retries) == ("/user/{id}", 200, 1)
+    assert (bet.method, bet.endpoint, bet.decode_time) == ("POST", "/bet", None)
+
+    summary = recorder.summary()
+    assert list(summary) == ["GET /market/{id}", "GET /user/{id}", "POST /bet"]
+    assert summary["GET /user/{id}"]["retries"] == 1
+    assert summary["GET /market/{id}"]["statuses"] == {200: 1}
+    assert summary["GET /market/{id}"]["decode_time"]["count"] == 1
+    recorder.reset()
+    assert recorder.summary() == {}
+
+
+def test_failed_requests_are_recorded() -> None:
+    records: List[RequestRecord] = []
+    with Transport(base_uri="http://127.0.0.1:1/api/v0", retries=0, instruments=[records.append]) as transport:
+        with pytest.raises(requests.ConnectionError):
+            transport.get("/markets")
+    (record,) = records
+    assert (record.status, record.bytes, record.error) == (None, None, "ConnectionError")
+
+
+def test_endpoint_of() -> None:
+    assert endpoint_of("/markets") == "/markets"
+    assert endpoint_of("/market/abc/resolve") == "/market/{id}/resolve"
+    assert endpoint_of("/group/by-id/xyz") == "/group/by-id/{id}"
+    assert endpoint_of("/slug/some-market") == "/slug/{id}"
+
+
+def test_histogram_percentiles() -> None:
+    rng = random.Random(0)
+    values = sorted(rng.lognormvariate(-4, 1) for _ in range(10_000))
+    histogram = Histogram(error=0.05)
+    for value in values:
+        histogram.add(value)
+    for q in (1, 50, 90, 99, 100):
+        exact = values[max(0, -(-len(values) * q // 100) - 1)]
+        assert histogram.percentile(q) == pytest.approx(exact, rel=0.05)
+    assert histogram.mean == pytest.approx(sum(values) / len(values))
+    assert histogram.summary()["max"] == values[-1]
+    assert len(histogram.buckets) < 200
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+import random
+import tracemalloc
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pymanifold import ManifoldClient
+from pymanifold.utils.jsonstream import iter_json_array
+
+from .payloads import bet_payload, lite_market_payload
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Iterator, List
+
+    from pymanifold.transport import Transport
+
+    from .conftest import StubServer
+
+VALUES: List[Any] = [{"s": "é☃" * i, "n": [1.5, None, True]} for i in range(50)] + [12345, -1e5, "x", None, [], {}]
+
+
+def chunked(data: bytes, size: int) -> Iterator[bytes]:
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.parametrize("size", [1, 3, 64, 1 << 20])
+def test_chunk_boundaries(size: int) -> None:
+    assert list(iter_json_array(chunked(json.dumps(VALUES).encode(), size))) == VALUES
+
+
+def test_numbers_split_across_chunks() -> None:
+    assert list(iter_json_array([b" [1", b"2,3", b"4, tr", b"ue] "])) == [12, 34, True]
+    assert list(iter_json_array([b"[", b"]"])) == []
+    assert list(iter_json_array([b"[12.", b"5]"])) == [12.5]
+    assert list(iter_json_array([b"[1.5e", b"3, -", b"2E", b"-", b"2]"])) == [1.5e3, -2e-2]
+    assert list(iter_json_array([b"[0", b".", b"25", b"e+", b"1]"])) == [2.5]
+
+
+def test_random_chunkings() -> None:
+    data = json.dumps([lite_market_payload(i) for i in range(20)] + VALUES).encode()
+    rng = random.Random(0)
+    for _ in range(300):
+        cuts = sorted(rng.sample(range(1, len(data)), 40))
+        chunks = [data[i:j] for i, j in zip([0, *cuts], [*cuts, len(data)])]
+        assert list(iter_json_array(chunks)) == json.loads(data)
+
+
+@pytest.mark.parametrize("data", [b"", b"{}", b"[1 2]", b"[1,", b"[1,]", b"[1] x"])
+def test_malformed(data: bytes) -> None:
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(chunked(data, 2)))
+
+
+def test_memory_is_bounded_by_one_element() -> None:
+    data = json.dumps([bet_payload(i) for i in range(5000)]).encode()
+    tracemalloc.start()
+    try:
+        for _ in iter_json_array(chunked(data, 16 * 1024)):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < len(data) / 10
+
+
+def test_client_streaming_matches_buffered(stub_server: StubServer, stub_transport: Transport) -> None:
+    stub_server.route("GET", "/bets", (200, [bet_payload(i) for i in range(200)]))
+    stub_server.route("GET", "/markets", (200, [lite_market_payload(i) for i in range(200)]))
+    client = ManifoldClient(transport=stub_transport)
+    streamed = client.get_bets(username="v", stream=True)
+    assert stub_server.requests == []  # nothing is sent until iteration starts
+    assert list(streamed) == list(client.get_bets(username="v"))
+    assert list(client.get_markets(limit=200, stream=True)) == list(client.get_markets(limit=200))
+    assert [r.query for r in stub_server.requests] == [{"username": ["v"]}] * 2 + [{"limit": ["200"]}] * 2
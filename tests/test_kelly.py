@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import random
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pytest
+
+from pymanifold.utils import kelly, kelly_calc, kelly_calc_batch
+from pymanifold.utils.kelly import _expected_log_wealth_array, _kelly_calc_brute_force, expected_log_wealth
+
+from .payloads import make_market
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Tuple
+
+    from numpy.typing import NDArray
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_kelly_calc_matches_brute_force(seed: int) -> None:
+    rng = random.Random(seed)
+    market = make_market(rng.uniform(5, 5000), rng.uniform(5, 5000), rng.uniform(0.05, 0.95))
+    subjective_prob = rng.random()
+    balance = rng.randint(1, 2000)
+    assert kelly_calc(market, subjective_prob, balance) == _kelly_calc_brute_force(market, subjective_prob, balance)
+
+
+def test_kelly_calc_large_balance() -> None:
+    market = make_market(1000, 800, 0.5)
+    bet, outcome = kelly_calc(market, 0.8, 10 ** 9)
+    assert outcome == "YES"
+    assert 0 < bet < 10 ** 9
+
+
+def test_kelly_calc_requires_balance() -> None:
+    with pytest.raises(ValueError):
+        kelly_calc(make_market(100, 100, 0.5), 0.8, 0)
+
+
+def random_batch(size: int, seed: int = 0) -> Tuple[NDArray[np.float64], ...]:
+    rng = np.random.default_rng(seed)
+    pool_yes = rng.uniform(5, 5000, size)
+    pool_no = rng.uniform(5, 5000, size)
+    p = rng.uniform(0.05, 0.95, size)
+    probability = p * pool_no / (p * pool_no + (1 - p) * pool_yes)
+    return pool_yes, pool_no, p, probability, rng.random(size), rng.integers(1, 2000, size).astype(np.float64)
+
+
+def test_kelly_calc_batch_matches_scalar() -> None:
+    pool_yes, pool_no, p, probability, subjective_prob, balance = random_batch(40)
+    bets, outcomes = kelly_calc_batch(pool_yes, pool_no, p, probability, subjective_prob, balance)
+    for i in range(40):
+        market = make_market(pool_yes[i], pool_no[i], p[i])
+        market.probability = probability[i]
+        expected = _kelly_calc_brute_force(market, subjective_prob[i], int(balance[i]))
+        assert (int(bets[i]), outcomes[i]) == expected
+        outcome = expected[1]
+        assert expected_log_wealth(market, subjective_prob[i], bets[i], outcome, int(balance[i])) == pytest.approx(
+            _expected_log_wealth_array(pool_yes[i], pool_no[i], p[i], subjective_prob[i], bets[i], outcome, balance[i])
+        )
+
+
+def test_kelly_calc_batch_scalar_balance() -> None:
+    pool_yes, pool_no, p, probability, subjective_prob, _ = random_batch(10)
+    bets, _ = kelly_calc_batch(pool_yes, pool_no, p, probability, subjective_prob, 500)
+    assert bets.shape == (10,)
+    assert (bets < 500).all()
+
+
+def test_kelly_calc_batch_processes(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(kelly, "PROCESS_CHUNK_SIZE", 25)
+    batch = random_batch(100)
+    bets, outcomes = kelly_calc_batch(*batch, processes=2)
+    expected_bets, expected_outcomes = kelly_calc_batch(*batch)
+    assert (bets == expected_bets).all()
+    assert (outcomes == expected_outcomes).all()
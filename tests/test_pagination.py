@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pymanifold import AsyncManifoldClient, ManifoldClient
+
+from .payloads import MARKET
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, List, Tuple
+
+    from pymanifold.transport import Transport
+
+    from .conftest import StubRequest, StubServer
+
+MARKETS = [dict(MARKET, id="m%04d" % i, bets=None, comments=None) for i in range(25)]
+
+
+def serve_pages(request: StubRequest) -> Tuple[int, Any]:
+    limit = int(request.query["limit"][0])
+    start = 0
+    if "before" in request.query:
+        start = [m["id"] for m in MARKETS].index(request.query["before"][0]) + 1
+    return 200, MARKETS[start:start + limit]
+
+
+def cursors(server: StubServer) -> List[Tuple[str, ...]]:
+    return [(r.query["limit"][0], *r.query.get("before", ())) for r in server.requests]
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_iter_markets_walks_every_page(stub_server: StubServer, stub_transport: Transport, prefetch: bool) -> None:
+    stub_server.route("GET", "/markets", serve_pages)
+    client = ManifoldClient(transport=stub_transport)
+    markets = list(client.iter_markets(page_size=10, prefetch=prefetch))
+    assert [m.id for m in markets] == [m["id"] for m in MARKETS]
+    assert cursors(stub_server) == [("10",), ("10", "m0009"), ("10", "m0019")]
+
+
+def test_iter_markets_max_items(stub_server: StubServer, stub_transport: Transport) -> None:
+    stub_server.route("GET", "/markets", serve_pages)
+    client = ManifoldClient(transport=stub_transport)
+    markets = list(client.iter_markets(before="m0004", max_items=15, page_size=10))
+    assert [m.id for m in markets] == [m["id"] for m in MARKETS[5:20]]
+    assert cursors(stub_server) == [("10", "m0004"), ("5", "m0014")]
+
+
+def test_iter_bets_passes_filters(stub_server: StubServer, stub_transport: Transport) -> None:
+    bets = [{"amount": 1, "contractId": "c", "createdTime": i, "id": "b%d" % i} for i in range(5)]
+    stub_server.route("GET", "/bets", (200, bets))
+    client = ManifoldClient(transport=stub_transport)
+    assert [b.id for b in client.iter_bets(username="v", page_size=10)] == ["b0", "b1", "b2", "b3", "b4"]
+    (request,) = stub_server.requests
+    assert request.query == {"limit": ["10"], "username": ["v"]}
+
+
+def test_async_iter_markets(stub_server: StubServer) -> None:
+    pytest.importorskip("aiohttp")
+    stub_server.route("GET", "/markets", serve_pages)
+
+    async def main() -> List[str]:
+        async with AsyncManifoldClient(base_uri=stub_server.base_uri) as client:
+            return [m.id async for m in client.iter_markets(max_items=21, page_size=10)]
+
+    assert asyncio.run(main()) == [m["id"] for m in MARKETS[:21]]
+    assert cursors(stub_server) == [("10",), ("10", "m0009"), ("1", "m0019")]
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import asyncio
+from email.utils import formatdate
+from threading import Thread
+from time import monotonic, time
+from typing import TYPE_CHECKING
+
+import pytest
+
+from pymanifold import AsyncManifoldClient, ManifoldClient, RateLimiter
+from pymanifold.ratelimit import TokenBucket, parse_retry_after
+from pymanifold.transport import Transport
+
+from .payloads import USER
+from .test_cache import Clock
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, List, Tuple
+
+    from .conftest import StubRequest, StubServer
+
+
+def throttled_once(status: int = 429, retry_after: str = "0") -> Any:
+    calls: List[StubRequest] = []
+
+    def respond(request: StubRequest) -> Tuple[int, Any, Any]:
+        calls.append(request)
+        if len(calls) == 1:
+            return status, {"message": "slow down"}, {"Retry-After": retry_after}
+        return 200, USER, {}
+
+    return respond
+
+
+def test_token_bucket() -> None:
+    clock = Clock()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+    assert bucket.try_acquire() == bucket.try_acquire() == 0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+    clock.now += 0.5
+    assert bucket.try_acquire() == 0
+
+    bucket.throttle(retry_after=3)
+    assert bucket.rate == 1
+    assert bucket.try_acquire() == pytest.approx(3)
+    clock.now += 3
+    assert bucket.try_acquire() == 0
+    for _ in range(32):
+        bucket.succeeded()
+    assert bucket.rate == 2
+    assert bucket.stats()["throttled"] == 1
+
+
+def test_parse_retry_after() -> None:
+    assert parse_retry_after("2") == 2
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(formatdate(time() + 30, usegmt=True)) == pytest.approx(30, abs=2)
+
+
+def test_transport_retries_429(stub_server: StubServer) -> None:
+    stub_server.route("GET", "/user/v", throttled_once())
+    limiter = RateLimiter()
+    with Transport(base_uri=stub_server.base_uri, retries=0, rate_limiter=limiter) as transport:
+        assert ManifoldClient(transport=transport).get_user("v").id == USER["id"]
+    assert len(stub_server.requests) == 2
+    assert limiter.stats()["read"]["throttled"] == 1
+    assert limiter.stats()["read"]["rate"] < 10
+
+
+def test_post_503_backs_off_without_resending(stub_server: StubServer) -> None:
+    stub_server.route("POST", "/bet", throttled_once(503, "0"))
+    limiter = RateLimiter()
+    with Transport(base_uri=stub_server.base_uri, retries=0, rate_limiter=limiter) as transport:
+        assert transport.post("/bet", json={}).status_code == 503
+    assert len(stub_server.requests) == 1
+    assert limiter.stats()["write"]["throttled"] == 1
+    assert limiter.stats()["read"]["throttled"] == 0
+
+
+def test_limiter_is_shared_across_threads(stub_server: StubServer) -> None:
+    stub_server.route("GET", "/user/v", (200, USER))
+    limiter = RateLimiter(reads=100, burst={"read": 1})
+    transports = [Transport(base_uri=stub_server.base_uri, rate_limiter=limiter) for _ in range(4)]
+
+    def work(transport: Transport) -> None:
+        for _ in range(5):
+            transport.get("/user/v")
+
+    start = monotonic()
+    threads = [Thread(target=work, args=(transport,)) for transport in transports]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert monotonic() - start >= 0.18
+    stats = limiter.stats()["read"]
+    assert stats["requests"] == 20
+    assert stats["queued"] > 0.1  # requests from the four threads wait on each other
+    for transport in transports:
+        transport.close()
+
+
+def test_async_client_retries_429(stub_server: StubServer) -> None:
+    pytest.importorskip("aiohttp")
+    stub_server.route("GET", "/user/v", throttled_once())
+    limiter = RateLimiter()
+
+    async def main() -> str:
+        async with AsyncManifoldClient(base_uri=stub_server.base_uri, rate_limiter=limiter) as client:
+            return (await client.get_user("v")).id
+
+    assert asyncio.run(main()) == USER["id"]
+    assert len(stub_server.requests) == 2
+    assert limiter.stats()["read"]["throttled"] == 1
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+from time import sleep, time
+from typing import TYPE_CHECKING
+
+import pytest
+import requests
+
+import pymanifold.aio
+import pymanifold.lib
+from pymanifold import AsyncManifoldClient, ManifoldClient
+
+from .payloads import MARKET, USER
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Dict, List, Tuple
+
+    from pymanifold.transport import Transport
+
+    from .conftest import StubRequest, StubServer
+
+CLOSE_TIME = 1700000000000
+
+
+@pytest.fixture(autouse=True)
+def no_delay(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(pymanifold.lib, "RECOVERY_DELAY", 0)
+    monkeypatch.setattr(pymanifold.aio, "RECOVERY_DELAY", 0)
+
+
+def recent_markets(count: int, age: int = 0) -> List[Dict[str, Any]]:
+    now = int(time() * 1000)
+    return [
+        dict(MARKET, id="old%d" % i, createdTime=now - age - i, creatorUsername="v", bets=None, comments=None)
+        for i in range(count)
+    ]
+
+
+def created(creator: str = "v") -> Dict[str, Any]:
+    return dict(MARKET, id="new", createdTime=int(time() * 1000), question="Created?", outcomeType="BINARY",
+                closeTime=CLOSE_TIME, creatorUsername=creator, bets=None, comments=None)
+
+
+def serve(stub_server: StubServer, polls: List[List[Dict[str, Any]]]) -> None:
+    """Route /markets to answer each poll's listing in turn, newest first and paged by `before`."""
+    listing = polls[0]
+
+    def markets(request: StubRequest) -> Tuple[int, Any]:
+        nonlocal listing
+        if "before" not in request.query:
+            listing = polls.pop(0) if len(polls) > 1 else polls[0]
+        start = 0
+        if "before" in request.query:
+            start = [m["id"] for m in listing].index(request.query["before"][0]) + 1
+        return 200, listing[start:start + int(request.query["limit"][0])]
+
+    stub_server.route("POST", "/market", (503, {"message": "Service unavailable"}))
+    stub_server.route("GET", "/me", (200, USER))
+    stub_server.route("GET", "/markets", markets)
+
+
+def market_requests(stub_server: StubServer) -> List[Tuple[str, ...]]:
+    return [tuple(r.query.get("before", ())) for r in stub_server.requests if r.path.endswith("/markets")]
+
+
+def test_recovers_market_created_despite_server_error(stub_server: StubServer, stub_transport: Transport) -> None:
+    serve(stub_server, [recent_markets(5), [created(), *recent_markets(5)]])
+    client = ManifoldClient("key", transport=stub_transport)
+    market = client.create_binary_market("Created?", "", CLOSE_TIME)
+    assert market.id == "new"
+    assert [r.method for r in stub_server.requests].count("POST") == 1
+    assert market_requests(stub_server) == [(), ()]
+
+
+def test_recovery_skips_other_creators_and_stops_at_older_markets(
+    stub_server: StubServer, stub_transport: Transport
+) -> None:
+    serve(stub_server, [[created("someone-else"), *recent_markets(50, age=3_600_000)]])
+    client = ManifoldClient("key", transport=stub_transport)
+    with pytest.raises(requests.HTTPError):
+        client.create_binary_market("Created?", "", CLOSE_TIME)
+    # Each poll reads a single small page, since it already reaches markets from before the attempt
+    assert market_requests(stub_server) == [()] * pymanifold.lib.RECOVERY_ATTEMPTS
+    assert all(r.query["limit"] == ["20"] for r in stub_server.requests if r.path.endswith("/markets"))
+
+
+def test_recovery_walks_back_past_newer_markets(stub_server: StubServer, stub_transport: Transport) -> None:
+    serve(stub_server, [[*recent_markets(25), created(), *recent_markets(10, age=3_600_000)]])
+    client = ManifoldClient("key", transport=stub_transport)
+    assert client.create_binary_market("Created?", "", CLOSE_TIME).id == "new"
+    assert market_requests(stub_server) == [(), ("old19",)]
+
+
+def test_async_recovery(stub_server: StubServer) -> None:
+    pytest.importorskip("aiohttp")
+    serve(stub_server, [recent_markets(5), [created(), *recent_markets(5)]])
+
+    async def main() -> str:
+        async with AsyncManifoldClient("key", base_uri=stub_server.base_uri) as client:
+            return (await client.create_binary_market("Created?", "", CLOSE_TIME)).id
+
+    assert asyncio.run(main()) == "new"
+    assert [r.method for r in stub_server.requests].count("POST") == 1
+    (me,) = [r for r in stub_server.requests if r.path.endswith("/me")]
+    assert me.headers["Authorization"] == "Key key"
+
+
+def test_async_recovery_timeouts_keep_the_original_error(stub_server: StubServer) -> None:
+    aiohttp = pytest.importorskip("aiohttp")
+    serve(stub_server, [recent_markets(5)])
+
+    def slow(request: StubRequest) -> Tuple[int, Any]:
+        sleep(0.5)
+        return 200, USER
+
+    stub_server.route("GET", "/me", slow)
+    stub_server.route("GET", "/markets", slow)
+
+    async def main() -> None:
+        async with AsyncManifoldClient("key", base_uri=stub_server.base_uri, timeout=0.1) as client:
+            await client.create_binary_market("Created?", "", CLOSE_TIME)
+
+    with pytest.raises(aiohttp.ClientResponseError) as info:
+        asyncio.run(main())
+    assert info.value.status == 503
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import pytest
+
+from pymanifold import ManifoldClient, Transport
+
+from benchmarks.server import Dataset, StandInServer
+
+
+@pytest.fixture(scope="module")
+def data() -> Dataset:
+    return Dataset.synthetic(markets=50, bets=500, comments=20, groups=2)
+
+
+def test_reads_match_the_data(data: Dataset) -> None:
+    with StandInServer(data) as server, Transport(base_uri=server.base_uri) as transport:
+        client = ManifoldClient(transport=transport)
+        assert [m.id for m in client.iter_markets(page_size=7)] == ["contract%d" % i for i in range(49, -1, -1)]
+        bets = list(client.iter_bets(market="synthetic-market-3", page_size=4))
+        assert [b.id for b in bets] == ["bet%07d" % j for j in range(453, 0, -50)]
+        market = client.get_market_by_id("contract3")
+        assert [b.id for b in market.bets] == [b.id for b in bets]
+        assert client.get_market_by_slug("synthetic-market-3").comments == market.comments
+        assert client.get_user("user0003").username == "user0003"
+        assert client.get_group(id_="group1").contractIds == ["contract%d" % i for i in range(1, 50, 2)]
+        assert server.statuses.keys() == {200}
+
+
+def test_bets_move_the_market(data: Dataset) -> None:
+    with StandInServer(data) as server, Transport(base_uri=server.base_uri) as transport:
+        client = ManifoldClient("key", transport=transport)
+        before = client.get_market_by_id("contract7", lite=True)
+        bet_id = client.create_bet("contract7", 100, "YES")
+        after = client.get_market_by_id("contract7", lite=True)
+        assert after.probability > before.probability
+        (bet,) = client.list_bets(limit=1)
+        assert (bet.id, bet.probBefore, bet.probAfter) == (bet_id, before.probability, after.probability)
+        with pytest.raises(Exception):
+            ManifoldClient("key", transport=transport).create_bet("missing", 100, "YES")
+
+
+def test_faults(data: Dataset) -> None:
+    with StandInServer(data, error_rate=0.5) as server, Transport(base_uri=server.base_uri) as transport:
+        results = ManifoldClient("key", transport=transport).create_bets([("contract1", 10, "NO")] * 40)
+        failed = sum(not result.ok for result in results)
+        assert failed == server.statuses[500]
+        assert 0 < failed < 40
+
+    with StandInServer(data, rate_limit=1, burst=2) as server:
+        with Transport(base_uri=server.base_uri, retries=0) as transport:
+            statuses = [transport.get("/user/user0001").status_code for _ in range(3)]
+        assert statuses == [200, 200, 429]
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pymanifold import ManifoldClient, ManifoldStore
+from pymanifold.lib import MAX_PAGE_SIZE
+
+from .payloads import USER, bet, market, newest_first
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pymanifold.transport import Transport
+
+    from .conftest import StubServer
+
+
+def test_sync_stops_at_watermark(stub_server: StubServer, stub_transport: Transport) -> None:
+    markets = [market(i) for i in range(5)]
+    stub_server.route("GET", "/markets", newest_first(markets))
+    client = ManifoldClient(transport=stub_transport)
+    store = ManifoldStore()
+    assert store.sync_markets(client) == 5
+    assert store.is_fresh("markets", 60)
+
+    markets += [market(5), market(6)]
+    del stub_server.requests[:]
+    written = store.sync_markets(client)
+    (request,) = stub_server.requests
+    assert "before" not in request.query
+    assert written == 7  # the single page also held already mirrored markets
+    assert [m.id for m in store.markets()] == ["m6", "m5", "m4", "m3", "m2", "m1", "m0"]
+    assert [m.id for m in store.markets(limit=2, before="m5")] == ["m4", "m3"]
+
+
+def test_capped_sync_is_not_fresh(stub_server: StubServer, stub_transport: Transport) -> None:
+    stub_server.route("GET", "/markets", newest_first([market(i) for i in range(5)]))
+    client = ManifoldClient(transport=stub_transport)
+    store = ManifoldStore()
+    store.sync_markets(client)
+    stub_server.route("GET", "/markets", newest_first([market(i) for i in range(10)]))
+    store._mark_synced("markets", None)
+    assert store.sync_markets(client, max_items=2) == 2
+    assert store._watermark("markets") == 4
+
+    # Nor is a first sync cut short, since it can't tell how much it left out
+    store = ManifoldStore()
+    assert store.sync_markets(client, max_items=2) == 2
+    assert not store.is_fresh("markets", 60)
+    assert store._watermark("markets") is None
+
+
+def test_fresh_markets_need_fresh_rows(stub_server: StubServer, stub_transport: Transport) -> None:
+    markets = [market(i) for i in range(3)]
+    stub_server.route("GET", "/markets", newest_first(markets))
+    store = ManifoldStore()
+    client = ManifoldClient(transport=stub_transport, store=store, max_staleness=60)
+    store.sync_markets(client)
+    assert [m.id for m in store.fresh_markets(60)] == ["m2", "m1", "m0"]  # type: ignore[union-attr]
+
+    # Markets mirrored long ago aren't current just because the newest ones were synced
+    store._db.execute("UPDATE markets SET syncedAt = 0 WHERE id = 'm0'")
+    assert store.fresh_markets(60, limit=2) is not None
+    assert store.fresh_markets(60) is None
+    del stub_server.requests[:]
+    assert len(list(client.get_markets())) == 3
+    assert len(stub_server.requests) == 1
+
+    # A refresh that finds them unchanged makes them current again
+    stub_server.route("GET", "/market/m0", (200, markets[0]))
+    assert store.refresh_markets(client, ids=["m0"]) == []
+    assert store.fresh_markets(60) is not None
+
+
+def test_fresh_markets_return_a_page(stub_server: StubServer, stub_transport: Transport) -> None:
+    store = ManifoldStore()
+    store.add_markets(market(i) for i in range(MAX_PAGE_SIZE + 5))
+    store._mark_synced("markets", MAX_PAGE_SIZE + 4)
+    assert len(store.fresh_markets(60)) == MAX_PAGE_SIZE  # type: ignore[arg-type]
+    assert len(store.markets()) == MAX_PAGE_SIZE + 5
+
+
+def test_unknown_cursor_is_a_miss(stub_server: StubServer, stub_transport: Transport) -> None:
+    markets = [market(i) for i in range(3)]
+    stub_server.route("GET", "/markets", newest_first(markets))
+    stub_server.route("GET", "/bets", newest_first([bet(i) for i in range(3)]))
+    store = ManifoldStore()
+    client = ManifoldClient(transport=stub_transport, store=store)
+    store.sync_markets(client)
+    store.sync_bets(client)
+    assert [m.id for m in store.fresh_markets(60, before="m2")] == ["m1", "m0"]  # type: ignore[union-attr]
+    assert [b.id for b in store.fresh_bets(60, before="b1")] == ["b0"]  # type: ignore[union-attr]
+    assert store.fresh_markets(60, before="missing") is None
+    assert store.fresh_bets(60, before="missing") is None
+
+    # A market created since the last sync isn't mirrored yet, so the page after it comes from the API
+    markets.append(market(3))
+    del stub_server.requests[:]
+    assert [m.id for m in client.get_markets(before="m3")] == ["m2", "m1", "m0"]
+    assert [r.query for r in stub_server.requests] == [{"before": ["m3"]}]
+
+
+def test_bet_queries(stub_server: StubServer, stub_transport: Transport) -> None:
+    bets = [bet(i, contract="m%d" % (i % 2), username="u%d" % (i % 3)) for i in range(12)]
+    stub_server.route("GET", "/bets", newest_first(bets))
+    store = ManifoldStore()
+    assert store.sync_bets(ManifoldClient(transport=stub_transport)) == 12
+    assert [b.id for b in store.bets(contract_id="m1", since=3, until=9)] == ["b7", "b5", "b3"]
+    assert [b.id for b in store.bets(username="u0", limit=2)] == ["b9", "b6"]
+    assert [b.id for b in store.bets(user_id="u2-id", before="b8")] == ["b5", "b2"]
+    frame = store.bet_frame(contract_id="m0")
+    assert list(frame["id"]) == ["b10", "b8", "b6", "b4", "b2", "b0"]
+
+
+def test_client_answers_from_fresh_store(stub_server: StubServer, stub_transport: Transport) -> None:
+    stub_server.route("GET", "/markets", newest_first([market(i) for i in range(3)]))
+    stub_server.route("GET", "/bets", newest_first([bet(i) for i in range(3)]))
+    stub_server.route("GET", "/user/v", (200, USER))
+    store = ManifoldStore()
+    client = ManifoldClient(transport=stub_transport, store=store)
+    store.sync_markets(client)
+    store.sync_bets(client, username="u")
+    store.sync_user(client, "v")
+    del stub_server.requests[:]
+
+    assert [m.id for m in client.get_markets()] == ["m2", "m1", "m0"]
+    assert [b.id for b in client.get_bets(username="u", limit=2)] == ["b2", "b1"]
+    assert client.get_market_by_slug("slug-1", lite=True).id == "m1"
+    assert client.get_user("v").name == "Velocity"
+    assert stub_server.requests == []
+
+    # Scopes that were never synced, or went stale, still go to the API
+    assert [b.id for b in client.get_bets()] == ["b2", "b1", "b0"]
+    client.max_staleness = -1
+    assert len(list(client.get_markets())) == 3
+    assert len(stub_server.requests) == 2
+
+
+def test_refresh_markets(stub_server: StubServer, stub_transport: Transport) -> None:
+    markets = {"m%d" % i: market(i) for i in range(3)}
+    stub_server.route("GET", "/markets", newest_first(list(markets.values())))
+    for id_ in markets:
+        stub_server.route("GET", "/market/" + id_, lambda request: (200, markets[request.path.split("/")[-1]]))
+    client = ManifoldClient(transport=stub_transport)
+    store = ManifoldStore()
+    store.sync_markets(client)
+    markets["m1"] = dict(markets["m1"], lastUpdatedTime=99, question="Changed?")
+    stub_server.route("GET", "/markets", newest_first(list(markets.values())))
+    del stub_server.requests[:]
+    assert store.refresh_markets(client, max_workers=2) == ["m1"]
+    assert store.market(id_="m1").question == "Changed?"  # type: ignore[union-attr]
+    # Only the listing and the market that changed in it were fetched
+    assert [r.path for r in stub_server.requests] == ["/api/v0/markets", "/api/v0/market/m1"]
+    assert store.refresh_markets(client, ids=["m1", "m2"]) == []
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pymanifold import ManifoldClient
+from pymanifold.transport import Transport
+
+from .payloads import USER
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Tuple
+
+    from .conftest import StubRequest, StubServer
+
+def test_connections_are_reused(stub_server: StubServer, stub_transport: Transport) -> None:
+    stub_server.route("GET", "/user/v", (200, USER))
+    client = ManifoldClient(transport=stub_transport)
+    for _ in range(5):
+        assert client.get_user("v").username == "v"
+    assert len(stub_server.requests) == 5
+    assert len({r.port for r in stub_server.requests}) == 1
+
+
+def test_clients_share_default_transport() -> None:
+    assert ManifoldClient().transport is ManifoldClient().transport
+
+
+def test_timeout_for() -> None:
+    transport = Transport(timeout=5, timeouts={"/market": 20, "/market/": 30, "/bet": None})
+    assert transport.timeout_for("/user/v") == 5
+    assert transport.timeout_for("/markets") == 20
+    assert transport.timeout_for("/market/abc") == 30
+    assert transport.timeout_for("/bet") is None
+
+
+def test_get_is_retried(stub_server: StubServer) -> None:
+    calls = []
+
+    def flaky(request: StubRequest) -> Tuple[int, Any]:
+        calls.append(request)
+        if len(calls) < 3:
+            return 503, {"message": "try again"}
+        return 200, USER
+
+    stub_server.route("GET", "/user/v", flaky)
+    with Transport(base_uri=stub_server.base_uri, retries=3, backoff_factor=0) as transport:
+        assert ManifoldClient(transport=transport).get_user("v").id == USER["id"]
+    assert len(calls) == 3
+
+
+def test_post_is_not_retried(stub_server: StubServer) -> None:
+    stub_server.route("POST", "/bet", (503, {"message": "try again"}))
+    with Transport(base_uri=stub_server.base_uri, retries=3, backoff_factor=0) as transport:
+        response = transport.post("/bet", json={})
+    assert response.status_code == 503
+    assert len(stub_server.requests) == 1
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from copy import copy
+from dataclasses import replace
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from pymanifold import ManifoldClient, ManifoldStore
+from pymanifold.types import Bet, BetFrame, LiteMarket, Market, _init_parameters
+
+from .payloads import bet_payload, market_payload
+
+if TYPE_CHECKING:  # pragma: no cover
+    from pymanifold.transport import Transport
+
+    from .conftest import StubServer
+
+
+def test_from_dict_ignores_unknown_keys() -> None:
+    bet = Bet.from_dict(bet_payload(3))
+    assert bet.id == "bet0000003"
+    assert bet.probBefore is not None
+    assert not hasattr(bet, "shares")
+
+
+def test_init_parameters_are_per_class() -> None:
+    assert "bets" in _init_parameters(Market)
+    assert "bets" not in _init_parameters(LiteMarket)
+    assert _init_parameters(Bet) is _init_parameters(Bet)
+
+
+def test_market_bets_are_decoded_lazily() -> None:
+    market = Market.from_dict(market_payload(0, bets=3, comments=2))
+    assert "bets" not in vars(market)
+    assert "comments" not in vars(market)
+    assert market.bets is market.bets
+    assert "bets" in vars(market)
+    assert "comments" not in vars(market)
+    assert market == Market.from_dict(market_payload(0, bets=3, comments=2))
+    assert replace(market, question="changed").comments == market.comments
+
+
+def test_market_copies_decode_independently() -> None:
+    market = Market.from_dict(market_payload(0, bets=3, comments=2))
+    shallow = copy(market)
+    assert [bet.id for bet in market.bets] == [bet.id for bet in shallow.bets]
+    assert shallow.comments == market.comments
+    assert copy(shallow).bets == market.bets
+
+
+def test_lite_market_lookup(stub_server: StubServer, stub_transport: Transport) -> None:
+    stub_server.route("GET", "/market/contract0", (200, market_payload(0, bets=3)))
+    client = ManifoldClient(transport=stub_transport)
+    lite = client.get_market_by_id("contract0", lite=True)
+    assert type(lite) is LiteMarket
+    assert len(client.get_market_by_id("contract0").bets) == 3
+
+
+def test_resolve_fetches_metadata_once(stub_server: StubServer, stub_transport: Transport) -> None:
+    env = dict(market_payload(0, bets=50), outcomeType="PSEUDO_NUMERIC", min=0, max=100, isLogScale=False)
+    stub_server.route("GET", "/market/contract0", (200, env))
+    stub_server.route("POST", "/market/contract0/resolve", (200, {}))
+    client = ManifoldClient("key", transport=stub_transport)
+    for _ in range(3):
+        client.resolve_market("contract0", 25)
+    assert [r.method for r in stub_server.requests] == ["GET", "POST", "POST", "POST"]
+    assert stub_server.requests[-1].body == {"outcome": "MKT", "value": 25, "probabilityInt": 25}
+
+    # A mirrored copy is good enough however old it is, since none of these attributes ever change
+    store = ManifoldStore()
+    store.add_markets([dict(env, id="contract1")])
+    stub_server.route("POST", "/market/contract1/resolve", (200, {}))
+    ManifoldClient("key", transport=stub_transport, store=store, max_staleness=0).resolve_market("contract1", 25)
+    assert stub_server.requests[-1].path.endswith("/contract1/resolve")
+    assert len(stub_server.requests) == 5
+
+
+def test_market_from_dict_decodes_nested() -> None:
+    market = Market.from_dict(market_payload(0, bets=3, comments=2))
+    assert [b.id for b in market.bets] == ["bet0000000", "bet0000001", "bet0000002"]
+    assert all(isinstance(b, Bet) for b in market.bets)
+    assert len(market.comments) == 2
+
+
+def test_bet_frame_columns() -> None:
+    payloads = [bet_payload(i, "c%d" % (i % 3)) for i in range(10)]
+    payloads[4]["probBefore"] = None
+    del payloads[5]["userId"]
+    frame = BetFrame.from_pages([payloads[:6], payloads[6:]])
+
+    assert len(frame) == 10
+    assert frame["amount"].dtype == np.float64
+    assert frame["createdTime"].tolist() == [p["createdTime"] for p in payloads]
+    assert np.isnan(frame["probBefore"][4])
+    assert frame.codes("userId")[5] == -1
+    assert frame["userId"][5] is None
+    assert frame["contractId"].tolist() == [p["contractId"] for p in payloads]
+    assert list(frame.categories("contractId")) == ["c0", "c1", "c2"]
+
+
+def test_bet_frame_views_match_bets() -> None:
+    payloads = [bet_payload(i) for i in range(5)]
+    payloads[2]["loanAmount"] = None
+    frame = BetFrame.from_dicts(payloads)
+    for view, payload in zip(frame, payloads):
+        assert view == replace(Bet.from_dict(payload), fills=None, fees=None)
+    assert frame[-1].id == payloads[-1]["id"]
+
+
+def test_bet_frame_filtering() -> None:
+    frame = BetFrame.from_dicts(bet_payload(i, "c%d" % (i % 3)) for i in range(30))
+    big = frame[frame["amount"] > 50]
+    assert len(big) == int((frame["amount"] > 50).sum())
+    assert (big["amount"] > 50).all()
+
+    subset = frame[frame.isin("contractId", ["c1", "missing"])]
+    assert set(subset["contractId"]) == {"c1"}
+    assert len(subset[2:5]) == 3
+    assert frame[::-1].sort()["createdTime"].tolist() == sorted(frame["createdTime"].tolist())
+    assert BetFrame.from_bets(frame[:3].to_bets())["id"].tolist() == frame["id"][:3].tolist()
+
+
+def test_get_bet_frame(stub_server: StubServer, stub_transport: Transport) -> None:
+    stub_server.route("GET", "/bets", (200, [bet_payload(i) for i in range(3)]))
+    frame = ManifoldClient(transport=stub_transport).get_bet_frame(market="contract0")
+    assert frame["id"].tolist() == ["bet0000000", "bet0000001", "bet0000002"]
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from pymanifold import ManifoldClient, MarketChange, MarketWatcher
+
+from .payloads import bet, market, newest_first
+
+if TYPE_CHECKING:  # pragma: no cover
+    from typing import Any, Dict, List
+
+    from pymanifold.transport import Transport
+
+    from .conftest import StubServer
+
+
+def serve_markets(stub_server: StubServer, markets: Dict[str, Dict[str, Any]]) -> None:
+    for market_id in markets:
+        stub_server.route("GET", "/market/" + market_id, lambda request, i=market_id: (200, markets[i]))
+
+
+def market_requests(stub_server: StubServer) -> List[str]:
+    return sorted(r.path.rsplit("/", 1)[-1] for r in stub_server.requests if "/market/" in r.path)
+
+
+def test_only_active_markets_are_fetched(stub_server: StubServer, stub_transport: Transport) -> None:
+    markets = {"m%d" % i: market(i) for i in range(50)}
+    bets = [bet(100, "m1")]
+    serve_markets(stub_server, markets)
+    stub_server.route("GET", "/bets", newest_first(bets))
+    watcher = MarketWatcher(ManifoldClient(transport=stub_transport), markets)
+    seen: List[MarketChange] = []
+    watcher.on_change(seen.append)
+
+    assert watcher.poll() == []
+    assert len(market_requests(stub_server)) == 50
+
+    # Nothing happened, so only the feed is read
+    del stub_server.requests[:]
+    assert watcher.poll() == []
+    assert [r.path for r in stub_server.requests] == ["/api/v0/bets"]
+
+    # Bets on two watched markets and one unwatched one; only one watched market actually moved
+    bets += [bet(101, "m2"), bet(102, "m3"), bet(103, "elsewhere")]
+    markets["m3"] = dict(markets["m3"], probability=0.9, lastUpdatedTime=102)
+    del stub_server.requests[:]
+    (change,) = watcher.poll()
+    assert market_requests(stub_server) == ["m2", "m3"]
+    assert seen == [change]
+    assert change.market_id == "m3"
+    assert change.changes == {"probability": (markets["m0"]["probability"], 0.9), "lastUpdatedTime": (3, 102)}
+    assert change.probability_change == 0.9 - markets["m0"]["probability"]
+    assert [b.id for b in change.bets] == ["b102"]
+    assert watcher.snapshots["m3"].probability == 0.9
+
+
+def test_bets_at_the_watermark_time_are_not_missed(stub_server: StubServer, stub_transport: Transport) -> None:
+    markets = {"m1": market(1)}
+    bets = [dict(bet(5, "m1"), id="first")]
+    serve_markets(stub_server, markets)
+    stub_server.route("GET", "/bets", newest_first(bets))
+    watcher = MarketWatcher(ManifoldClient(transport=stub_transport), markets)
+    watcher.poll()
+
+    bets.append(dict(bet(5, "m1"), id="second"))
+    markets["m1"] = dict(markets["m1"], lastUpdatedTime=5)
+    (change,) = watcher.poll()
+    assert [b.id for b in change.bets] == ["second"]
+    assert watcher.poll() == []
+
+
+def test_sweeps(stub_server: StubServer, stub_transport: Transport) -> None:
+    markets = {"m%d" % i: market(i) for i in range(5)}
+    bets = [bet(100, "m1")]
+    serve_markets(stub_server, markets)
+    stub_server.route("GET", "/bets", newest_first(bets))
+    now = [0.0]
+    watcher = MarketWatcher(
+        ManifoldClient(transport=stub_transport), markets, sweep_interval=60, max_feed_bets=3, page_size=2,
+        clock=lambda: now[0],
+    )
+    watcher.poll()
+
+    # A resolution comes with no bet, so waits for the next sweep
+    markets["m4"] = dict(markets["m4"], isResolved=True, resolution="YES")
+    now[0] = 30
+    assert watcher.poll() == []
+    now[0] = 60
+    (change,) = watcher.poll()
+    assert change.changes == {"isResolved": (False, True), "resolution": (None, "YES")}
+
+    # Too many bets to read back to the last one seen means sweeping instead
+    bets += [bet(200 + i, "elsewhere") for i in range(10)]
+    markets["m0"] = dict(markets["m0"], probability=0.1)
+    now[0] = 61
+    del stub_server.requests[:]
+    (change,) = watcher.poll()
+    assert change.market_id == "m0"
+    assert len(market_requests(stub_server)) == 5
+    assert watcher.poll() == []
+
+
+def test_run_stops(stub_server: StubServer, stub_transport: Transport) -> None:
+    stub_server.route("GET", "/bets", newest_first([]))
+    watcher = MarketWatcher(ManifoldClient(transport=stub_transport), interval=0)
+    watcher.on_change(lambda change: None)
+    watcher.run(max_polls=3)
+    assert len(stub_server.requests) == 3
+
+
+def test_failed_fetches_are_retried(stub_server: StubServer, stub_transport: Transport) -> None:
+    markets = {"m1": market(1), "m2": market(2)}
+    bets = [bet(100, "m1")]
+    serve_markets(stub_server, markets)
+    stub_server.route("GET", "/bets", newest_first(bets))
+    watcher = MarketWatcher(ManifoldClient(transport=stub_transport), markets)
+    seen: List[MarketChange] = []
+    watcher.on_change(seen.append)
+    watcher.poll()
+
+    # Both markets move, but fetching m2 fails: m1's change is still reported, and m2 keeps its old snapshot
+    bets += [bet(101, "m1"), bet(102, "m2")]
+    markets["m1"] = dict(markets["m1"], probability=0.8, lastUpdatedTime=101)
+    markets["m2"] = dict(markets["m2"], probability=0.9, lastUpdatedTime=102)
+    stub_server.route("GET", "/market/m2", (500, {"message": "oops"}))
+    (change,) = watcher.poll()
+    assert change.market_id == "m1"
+    assert set(watcher.errors) == {"m2"}
+    assert watcher.snapshots["m2"].probability == market(2)["probability"]
+
+    # m2 is fetched again on the next poll, though no new bet was made on it, and its change comes with its bet
+    stub_server.route("GET", "/market/m2", lambda request: (200, markets["m2"]))
+    del stub_server.requests[:]
+    (change,) = watcher.poll()
+    assert market_requests(stub_server) == ["m2"]
+    assert change.market_id == "m2"
+    assert change.changes["probability"] == (market(2)["probability"], 0.9)
+    assert [b.id for b in change.bets] == ["b102"]
+    assert watcher.errors == {}
+    assert seen[-1] is change
+
+
+def test_run_survives_errors(stub_server: StubServer, stub_transport: Transport) -> None:
+    stub_server.route("GET", "/bets", (503, {"message": "down"}))
+    watcher = MarketWatcher(ManifoldClient(transport=stub_transport), interval=0)
+    watcher.run(max_polls=2)
+    assert len(stub_server.requests) == 2